@@ -0,0 +1,370 @@
+"""
+Almacén SQLite opcional para usuarios y puntuaciones.
+
+SalonDeLaFama y ListaUsuarios lo usan si se les pasa en `almacen`; sus
+métodos no cambian. Además de la mejor puntuación por usuario responde
+los tops por nivel y por laberinto, el percentil de una puntuación y el
+historial de un usuario entre dos fechas, todo con índices.
+
+Las consultas paginadas devuelven filas ordenadas; para pedir la página
+siguiente se pasa la última fila recibida en `despues` (paginación por
+clave: el costo no crece con el número de página).
+
+Uso:
+    python almacen_sqlite.py maze_run.db --puntuaciones puntuaciones.json --usuarios usuarios.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from salon_de_la_fama import leer_puntuaciones
+
+# Nivel reservado en el histograma para el conjunto de todos los niveles
+TODOS_LOS_NIVELES = 0
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE,
+    registrado INTEGER NOT NULL DEFAULT 0,
+    mejor INTEGER
+);
+CREATE INDEX IF NOT EXISTS usuarios_mejor ON usuarios (mejor DESC, nombre) WHERE mejor IS NOT NULL;
+CREATE INDEX IF NOT EXISTS usuarios_registrados ON usuarios (nombre) WHERE registrado;
+CREATE TABLE IF NOT EXISTS partidas (
+    id INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios (id),
+    puntuacion INTEGER NOT NULL,
+    nivel INTEGER NOT NULL,
+    laberinto TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    tiempo REAL
+);
+CREATE INDEX IF NOT EXISTS partidas_nivel ON partidas (nivel, puntuacion DESC);
+CREATE INDEX IF NOT EXISTS partidas_laberinto ON partidas (laberinto, puntuacion DESC);
+CREATE INDEX IF NOT EXISTS partidas_usuario ON partidas (usuario_id, fecha);
+CREATE TABLE IF NOT EXISTS histograma (
+    nivel INTEGER NOT NULL,
+    puntuacion INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (nivel, puntuacion)
+) WITHOUT ROWID;
+"""
+
+_TOP = """
+SELECT p.id, u.nombre, p.puntuacion, p.nivel, p.laberinto, p.fecha, p.tiempo
+FROM partidas p JOIN usuarios u ON u.id = p.usuario_id
+WHERE p.{columna} = ? {cursor}
+ORDER BY p.puntuacion DESC, p.id
+LIMIT ?
+"""
+_CURSOR_TOP = "AND p.puntuacion <= ? AND (p.puntuacion < ? OR p.id > ?)"
+
+
+def _fila_partida(fila):
+    id_partida, usuario, puntuacion, nivel, laberinto, fecha, tiempo = fila
+    partida = {
+        "id": id_partida,
+        "usuario": usuario,
+        "puntuacion": puntuacion,
+        "nivel": nivel,
+        "laberinto": laberinto,
+        "fecha": fecha,
+    }
+    if tiempo is not None:
+        partida["tiempo"] = tiempo
+    return partida
+
+
+class AlmacenSQLite:
+    """
+    Una conexión para escribir y otra para leer: en modo WAL las lecturas
+    del bucle de cuadros no esperan a una escritura en curso (que el salón
+    hace desde el hilo del escritor).
+    """
+
+    def __init__(self, ruta="maze_run.db"):
+        self.ruta = ruta
+        self._escritura = self._conectar()
+        self._escritura.executescript(ESQUEMA)
+        self._bloqueo_escritura = threading.Lock()
+        if ruta == ":memory:":
+            # Cada conexión a :memory: es otra base: se comparte la única
+            self._lectura, self._bloqueo_lectura = self._escritura, self._bloqueo_escritura
+        else:
+            self._lectura = self._conectar()
+            self._bloqueo_lectura = threading.Lock()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode = WAL")
+        # Con WAL, NORMAL solo sincroniza en los checkpoints
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        return conexion
+
+    def _consultar(self, sql, parametros=()):
+        with self._bloqueo_lectura:
+            return self._lectura.execute(sql, parametros).fetchall()
+
+    def cerrar(self):
+        with self._bloqueo_escritura:
+            self._escritura.close()
+        if self._lectura is not self._escritura:
+            with self._bloqueo_lectura:
+                self._lectura.close()
+
+    # --- Usuarios ---
+
+    def _id_usuario(self, cursor, nombre):
+        cursor.execute("INSERT INTO usuarios (nombre) VALUES (?) ON CONFLICT (nombre) DO NOTHING", (nombre,))
+        return cursor.execute("SELECT id FROM usuarios WHERE nombre = ?", (nombre,)).fetchone()[0]
+
+    def crear_usuario(self, nombre):
+        """Marca al usuario como registrado; False si ya lo estaba."""
+        with self._bloqueo_escritura, self._escritura as conexion:
+            cursor = conexion.execute(
+                "INSERT INTO usuarios (nombre, registrado) VALUES (?, 1) "
+                "ON CONFLICT (nombre) DO UPDATE SET registrado = 1 WHERE NOT registrado",
+                (nombre,),
+            )
+            return cursor.rowcount > 0
+
+    def eliminar_usuario(self, nombre):
+        # Sus partidas se conservan, igual que con usuarios.json
+        with self._bloqueo_escritura, self._escritura as conexion:
+            cursor = conexion.execute(
+                "UPDATE usuarios SET registrado = 0 WHERE nombre = ? AND registrado", (nombre,)
+            )
+            return cursor.rowcount > 0
+
+    def usuario_registrado(self, nombre):
+        return bool(self._consultar(
+            "SELECT 1 FROM usuarios WHERE nombre = ? AND registrado", (nombre,)
+        ))
+
+    def usuarios_registrados(self, limite=None, despues=None):
+        sql = "SELECT nombre FROM usuarios WHERE registrado"
+        parametros = []
+        if despues is not None:
+            sql += " AND nombre > ?"
+            parametros.append(despues)
+        sql += " ORDER BY nombre LIMIT ?"
+        parametros.append(-1 if limite is None else limite)
+        return [nombre for (nombre,) in self._consultar(sql, parametros)]
+
+    # --- Partidas ---
+
+    def registrar_partida(self, usuario, partida):
+        puntuacion, nivel = partida["puntuacion"], partida["nivel"]
+        with self._bloqueo_escritura, self._escritura as conexion:
+            cursor = conexion.cursor()
+            id_usuario = self._id_usuario(cursor, usuario)
+            cursor.execute(
+                "INSERT INTO partidas (usuario_id, puntuacion, nivel, laberinto, fecha, tiempo) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (id_usuario, puntuacion, nivel, partida["laberinto"], partida["fecha"], partida.get("tiempo")),
+            )
+            cursor.execute(
+                "UPDATE usuarios SET mejor = ? WHERE id = ? AND (mejor IS NULL OR mejor < ?)",
+                (puntuacion, id_usuario, puntuacion),
+            )
+            cursor.executemany(
+                "INSERT INTO histograma VALUES (?, ?, 1) "
+                "ON CONFLICT (nivel, puntuacion) DO UPDATE SET cantidad = cantidad + 1",
+                ((nivel, puntuacion), (TODOS_LOS_NIVELES, puntuacion)),
+            )
+
+    def eliminar_partidas(self, usuario):
+        with self._bloqueo_escritura, self._escritura as conexion:
+            fila = conexion.execute("SELECT id FROM usuarios WHERE nombre = ?", (usuario,)).fetchone()
+            if fila is None:
+                return False
+            conteos = conexion.execute(
+                "SELECT nivel, puntuacion, COUNT(*) FROM partidas WHERE usuario_id = ? "
+                "GROUP BY nivel, puntuacion",
+                fila,
+            ).fetchall()
+            descuentos = {}
+            for nivel, puntuacion, cantidad in conteos:
+                for clave in ((nivel, puntuacion), (TODOS_LOS_NIVELES, puntuacion)):
+                    descuentos[clave] = descuentos.get(clave, 0) + cantidad
+            conexion.executemany(
+                "UPDATE histograma SET cantidad = cantidad - ? WHERE nivel = ? AND puntuacion = ?",
+                ((cantidad, nivel, puntuacion) for (nivel, puntuacion), cantidad in descuentos.items()),
+            )
+            conexion.execute("DELETE FROM histograma WHERE cantidad <= 0")
+            conexion.execute("DELETE FROM partidas WHERE usuario_id = ?", fila)
+            conexion.execute("UPDATE usuarios SET mejor = NULL WHERE id = ?", fila)
+            return bool(conteos)
+
+    # --- Consultas ---
+
+    def ranking_global(self, limite=10, despues=None):
+        """Mejor puntuación de cada usuario, de mayor a menor."""
+        sql = "SELECT nombre, mejor FROM usuarios WHERE mejor IS NOT NULL"
+        parametros = []
+        if despues is not None:
+            sql += " AND mejor <= ? AND (mejor < ? OR nombre > ?)"
+            parametros += [despues["puntuacion"], despues["puntuacion"], despues["usuario"]]
+        sql += " ORDER BY mejor DESC, nombre LIMIT ?"
+        parametros.append(-1 if limite is None else limite)
+        return [
+            {"usuario": usuario, "puntuacion": puntuacion}
+            for usuario, puntuacion in self._consultar(sql, parametros)
+        ]
+
+    def _top(self, columna, valor, limite, despues):
+        parametros = [valor]
+        cursor = ""
+        if despues is not None:
+            cursor = _CURSOR_TOP
+            parametros += [despues["puntuacion"], despues["puntuacion"], despues["id"]]
+        parametros.append(limite)
+        sql = _TOP.format(columna=columna, cursor=cursor)
+        return [_fila_partida(fila) for fila in self._consultar(sql, parametros)]
+
+    def top_nivel(self, nivel, limite=10, despues=None):
+        return self._top("nivel", nivel, limite, despues)
+
+    def top_laberinto(self, laberinto, limite=10, despues=None):
+        return self._top("laberinto", laberinto, limite, despues)
+
+    def percentil(self, puntuacion, nivel=TODOS_LOS_NIVELES):
+        """
+        Porcentaje de partidas (del nivel, o de todos) por debajo de la
+        puntuación; los empates cuentan la mitad. None si no hay partidas.
+        """
+        menores, iguales, total = self._consultar(
+            "SELECT SUM(CASE WHEN puntuacion < ? THEN cantidad ELSE 0 END), "
+            "SUM(CASE WHEN puntuacion = ? THEN cantidad ELSE 0 END), SUM(cantidad) "
+            "FROM histograma WHERE nivel = ?",
+            (puntuacion, puntuacion, nivel),
+        )[0]
+        if not total:
+            return None
+        return 100.0 * (menores + iguales / 2) / total
+
+    def historial(self, usuario, desde=None, hasta=None, limite=50, despues=None):
+        """
+        Partidas del usuario en orden cronológico. `desde` y `hasta` son
+        fechas "AAAA-MM-DD" (o con hora) e incluyen el día completo.
+        """
+        sql = (
+            "SELECT p.id, u.nombre, p.puntuacion, p.nivel, p.laberinto, p.fecha, p.tiempo "
+            "FROM usuarios u JOIN partidas p ON p.usuario_id = u.id WHERE u.nombre = ?"
+        )
+        parametros = [usuario]
+        if desde is not None:
+            sql += " AND p.fecha >= ?"
+            parametros.append(desde)
+        if hasta is not None:
+            sql += " AND p.fecha <= ?"
+            parametros.append(hasta + " 23:59:59" if len(hasta) == 10 else hasta)
+        if despues is not None:
+            sql += " AND (p.fecha, p.id) > (?, ?)"
+            parametros += [despues["fecha"], despues["id"]]
+        sql += " ORDER BY p.fecha, p.id LIMIT ?"
+        parametros.append(limite)
+        return [_fila_partida(fila) for fila in self._consultar(sql, parametros)]
+
+    # --- Importación ---
+
+    def importar(self, puntuaciones=None, usuarios=()):
+        """
+        Carga un dict usuario -> partidas (el de puntuaciones.json) y una
+        lista de usuarios registrados en una sola transacción. Devuelve la
+        cantidad de partidas importadas.
+        """
+        importadas = 0
+        with self._bloqueo_escritura, self._escritura as conexion:
+            conexion.executemany(
+                "INSERT INTO usuarios (nombre, registrado) VALUES (?, 1) "
+                "ON CONFLICT (nombre) DO UPDATE SET registrado = 1",
+                ((nombre.upper(),) for nombre in usuarios),
+            )
+            cursor = conexion.cursor()
+            for usuario, partidas in (puntuaciones or {}).items():
+                if not isinstance(partidas, list):
+                    continue
+                id_usuario = self._id_usuario(cursor, usuario)
+                filas = [
+                    (
+                        id_usuario, p.get("puntuacion", 0), p.get("nivel", 1),
+                        p.get("laberinto", ""), p.get("fecha", ""), p.get("tiempo"),
+                    )
+                    for p in partidas if isinstance(p, dict)
+                ]
+                cursor.executemany(
+                    "INSERT INTO partidas (usuario_id, puntuacion, nivel, laberinto, fecha, tiempo) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    filas,
+                )
+                importadas += len(filas)
+        self.reconstruir_agregados()
+        return importadas
+
+    def reconstruir_agregados(self):
+        """Recalcula mejores e histograma de una vez, tras una carga masiva."""
+        with self._bloqueo_escritura, self._escritura as conexion:
+            conexion.execute(
+                "UPDATE usuarios SET mejor = "
+                "(SELECT MAX(puntuacion) FROM partidas WHERE usuario_id = usuarios.id)"
+            )
+            conexion.execute("DELETE FROM histograma")
+            conexion.execute(
+                "INSERT INTO histograma SELECT nivel, puntuacion, COUNT(*) FROM partidas "
+                "GROUP BY nivel, puntuacion"
+            )
+            conexion.execute(
+                "INSERT INTO histograma SELECT ?, puntuacion, COUNT(*) FROM partidas GROUP BY puntuacion",
+                (TODOS_LOS_NIVELES,),
+            )
+        with self._bloqueo_escritura:
+            self._escritura.execute("ANALYZE")
+
+
+def importar_json(almacen, ruta_puntuaciones=None, ruta_usuarios=None):
+    """
+    Importa puntuaciones.json (con su diario, si lo hay) y usuarios.json.
+    Solo lee los archivos: si alguno está dañado lanza ValueError y no
+    importa nada.
+    """
+    puntuaciones = {}
+    if ruta_puntuaciones:
+        puntuaciones = leer_puntuaciones(ruta_puntuaciones, f"{ruta_puntuaciones}.diario")
+    usuarios = []
+    if ruta_usuarios and os.path.exists(ruta_usuarios):
+        with open(ruta_usuarios, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        if not isinstance(datos, list):
+            raise ValueError(f"{ruta_usuarios}: se esperaba una lista JSON y hay {type(datos).__name__}")
+        usuarios = [nombre for nombre in datos if isinstance(nombre, str)]
+    return almacen.importar(puntuaciones, usuarios), len(usuarios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa los JSON de usuarios y puntuaciones a SQLite")
+    parser.add_argument("base", help="archivo .db nuevo (importar dos veces duplica las partidas)")
+    parser.add_argument("--puntuaciones", default="puntuaciones.json")
+    parser.add_argument("--usuarios", default="usuarios.json")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    almacen = AlmacenSQLite(args.base)
+    try:
+        partidas, usuarios = importar_json(almacen, args.puntuaciones, args.usuarios)
+    except (OSError, ValueError) as excepcion:
+        almacen.cerrar()
+        parser.exit(1, f"No se importó nada: {excepcion}\n")
+    almacen.cerrar()
+    print(
+        f"{partidas} partidas y {usuarios} usuarios importados a {args.base} "
+        f"en {time.perf_counter() - inicio:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Analizador de dificultad de niveles.
+
+Juega muchas partidas sembradas por nivel con un bot scripteado sobre el
+motor sin pantalla (IA de enemigos y colisiones reales) y reparte las
+partidas entre varios procesos.
+
+Uso:
+    python analizador.py [niveles.json] --partidas 200 --procesos 8
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+from motor import TASA_LOGICA, MotorJuego
+from pathfinding import CampoDistancias, INALCANZABLE, VECINOS
+
+DIRECCION_DESPLAZAMIENTO = {
+    (0, -1): "arriba",
+    (0, 1): "abajo",
+    (-1, 0): "izquierda",
+    (1, 0): "derecha",
+}
+
+_niveles_trabajador = None
+
+
+class BotEstrellas:
+    """Va a la estrella alcanzable más cercana evitando pisar junto a un enemigo."""
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.campos = {}
+
+    def _campo(self, estrella):
+        campo = self.campos.get(estrella)
+        if campo is None or campo.laberinto is not self.motor.LABERINTO:
+            campo = CampoDistancias(self.motor.LABERINTO)
+            campo.actualizar_objetivo(estrella)
+            self.campos[estrella] = campo
+        return campo
+
+    def decidir(self):
+        m = self.motor
+        jugador = (m.posicion_x, m.posicion_y)
+        mejor = None
+        for estrella in m.estrellas:
+            campo = self._campo(estrella)
+            distancia = campo.distancia(jugador)
+            if distancia != INALCANZABLE and (mejor is None or distancia < mejor[0]):
+                mejor = (distancia, campo)
+        if mejor is None:
+            return ()
+        campo = mejor[1]
+        enemigos = {tuple(e) for e in m.enemigos}
+        candidatos = []
+        for dx, dy in VECINOS:
+            celda = (jugador[0] + dx, jugador[1] + dy)
+            distancia = campo.distancia(celda)
+            if distancia == INALCANZABLE:
+                continue
+            peligro = any(
+                abs(celda[0] - ex) + abs(celda[1] - ey) <= 1 for ex, ey in enemigos
+            )
+            candidatos.append((peligro, distancia, (dx, dy)))
+        if not candidatos:
+            return ()
+        candidatos.sort()
+        return (DIRECCION_DESPLAZAMIENTO[candidatos[0][2]],)
+
+
+def _iniciar_trabajador(niveles):
+    global _niveles_trabajador
+    _niveles_trabajador = niveles
+
+
+def jugar_partida(tarea):
+    indice, semilla, max_ticks = tarea
+    motor = MotorJuego(niveles=[_niveles_trabajador[indice]], semilla=semilla)
+    entrada = motor._obtener_celda_libre_jugador()
+    campo_entrada = CampoDistancias(motor.LABERINTO)
+    campo_entrada.actualizar_objetivo(entrada)
+    # Fracción de las celdas libres alcanzables desde la entrada: una zona
+    # aislada del nivel la baja (las estrellas solo aparecen en las alcanzables)
+    libres = motor.LABERINTO.celdas_libres()
+    alcanzables = sum(1 for celda in libres if campo_entrada.distancia(celda) != INALCANZABLE)
+    bot = BotEstrellas(motor)
+    while motor.estado == "JUEGO" and motor.ticks < max_ticks:
+        motor.paso(bot.decidir())
+    return {
+        "nivel": indice,
+        "ganada": not motor.estrellas,
+        "ticks": motor.ticks,
+        "vidas_perdidas": 3 - motor.vidas,
+        "celdas_libres": len(libres),
+        "celdas_alcanzables": alcanzables,
+    }
+
+
+def resumir(niveles, resultados):
+    resumen = []
+    for indice, nivel in enumerate(niveles):
+        partidas = [r for r in resultados if r["nivel"] == indice]
+        if not partidas:
+            continue
+        ganadas = [r for r in partidas if r["ganada"]]
+        total_libres = sum(r["celdas_libres"] for r in partidas)
+        resumen.append({
+            "nivel": indice + 1,
+            "nombre": nivel.get("nombre", f"Nivel {indice + 1}"),
+            "partidas": len(partidas),
+            "tasa_victoria": len(ganadas) / len(partidas),
+            "segundos_para_limpiar": (
+                sum(r["ticks"] for r in ganadas) / len(ganadas) / TASA_LOGICA
+                if ganadas else None
+            ),
+            "vidas_perdidas": sum(r["vidas_perdidas"] for r in partidas) / len(partidas),
+            "alcanzabilidad_celdas": (
+                sum(r["celdas_alcanzables"] for r in partidas) / total_libres
+                if total_libres else 1.0
+            ),
+        })
+    return resumen
+
+
+def analizar(niveles, partidas=200, procesos=None, semilla=0, max_ticks=6000):
+    tareas = [
+        (indice, semilla + indice * partidas + n, max_ticks)
+        for indice in range(len(niveles))
+        for n in range(partidas)
+    ]
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        _iniciar_trabajador(niveles)
+        resultados = [jugar_partida(t) for t in tareas]
+    else:
+        with Pool(procesos, initializer=_iniciar_trabajador, initargs=(niveles,)) as pool:
+            resultados = list(pool.imap_unordered(
+                jugar_partida, tareas, chunksize=max(1, len(tareas) // (procesos * 8))
+            ))
+    return resumir(niveles, resultados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analiza la dificultad de niveles.json con bots")
+    parser.add_argument("ruta", nargs="?", default="niveles.json")
+    parser.add_argument("--partidas", type=int, default=200, help="partidas por nivel")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=6000)
+    parser.add_argument("--json", dest="salida_json", help="guardar el resumen en este archivo")
+    args = parser.parse_args()
+
+    motor = MotorJuego(ruta_niveles=args.ruta)
+    if motor.sin_niveles_cargados:
+        print("No se encontraron laberintos válidos")
+        return
+    inicio = time.perf_counter()
+    resumen = analizar(
+        list(motor.niveles), args.partidas, args.procesos, args.semilla, args.max_ticks
+    )
+    duracion = time.perf_counter() - inicio
+
+    print(f"{'Nivel':<28}{'Victoria':>10}{'Limpiar(s)':>12}{'Vidas-':>8}{'Celdas':>9}")
+    for fila in resumen:
+        limpiar = fila["segundos_para_limpiar"]
+        print(
+            f"{fila['nombre'][:27]:<28}{fila['tasa_victoria']:>10.1%}"
+            f"{(f'{limpiar:.1f}' if limpiar is not None else '-'):>12}"
+            f"{fila['vidas_perdidas']:>8.2f}{fila['alcanzabilidad_celdas']:>9.1%}"
+        )
+    total = sum(f["partidas"] for f in resumen)
+    print(f"{total} partidas en {duracion:.2f}s")
+    if args.salida_json:
+        with open(args.salida_json, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from bisect import bisect_left
+from pathfinding import CampoDistancias, INALCANZABLE
+
+
+class IndiceAparicion:
+    """
+    Celdas libres de un nivel alcanzables desde la entrada, ordenadas por
+    distancia a ella. Se construye una vez por nivel y permite elegir
+    posiciones de aparición sin reemplazo en O(k).
+    """
+
+    def __init__(self, grilla, entrada):
+        campo = CampoDistancias(grilla)
+        campo.actualizar_objetivo(entrada)
+        self.libres = grilla.celdas_libres()
+        alcanzables = sorted(
+            (campo.distancia(celda), celda)
+            for celda in self.libres
+            if campo.distancia(celda) != INALCANZABLE
+        )
+        if not alcanzables:
+            # Entrada inválida o encerrada: se recurre a todas las celdas libres
+            alcanzables = [(0, celda) for celda in self.libres]
+        self.distancias = [distancia for distancia, _ in alcanzables]
+        self.celdas = [celda for _, celda in alcanzables]
+        self.distancia = dict((celda, distancia) for distancia, celda in alcanzables)
+
+    def __len__(self):
+        return len(self.celdas)
+
+    def muestrear(self, rng, cantidad, exclusiones=(), distancia_minima=0):
+        """
+        Elige `cantidad` celdas distintas fuera de `exclusiones` y a
+        `distancia_minima` o más de la entrada. Si no alcanzan las celdas
+        lejanas se completan con las más cercanas.
+        """
+        excluidas = set(exclusiones)
+        inicio = bisect_left(self.distancias, distancia_minima)
+        elegidas = self._fisher_yates(rng, cantidad, excluidas, inicio)
+        if len(elegidas) < cantidad and inicio > 0:
+            excluidas.update(elegidas)
+            elegidas += self._fisher_yates(rng, cantidad - len(elegidas), excluidas, 0)
+        return elegidas
+
+    def _fisher_yates(self, rng, cantidad, excluidas, inicio):
+        # Fisher-Yates parcial sobre celdas[inicio:] con intercambios dispersos
+        total = len(self.celdas)
+        intercambios = {}
+        elegidas = []
+        i = inicio
+        while len(elegidas) < cantidad and i < total:
+            j = rng.randint(i, total - 1)
+            valor_j = intercambios.get(j, j)
+            intercambios[j] = intercambios.get(i, i)
+            i += 1
+            celda = self.celdas[valor_j]
+            if celda not in excluidas:
+                elegidas.append(celda)
+        return elegidas
@@ -0,0 +1,417 @@
+"""
+Banco de pruebas de rendimiento.
+
+Mide pathfinding (bfs_siguiente_paso y la IA de enemigos del motor),
+Vista.dibujar_laberinto, AdministradorDeEventos.publicar y el salón de
+la fama sobre laberintos generados de 15x20 hasta 1000x1000, de 1 a 500
+enemigos y de 10 a 100.000 puntuaciones guardadas. Corre sin ventana
+con el driver de video "dummy" de SDL.
+
+Uso:
+    python benchmark.py --salida base.json
+    python benchmark.py --comparar base.json --umbral 0.15
+    python benchmark.py --rapido --filtro ia
+
+El grupo "sqlite" carga 100.000 usuarios y 2.000.000 de partidas (con
+--rapido, 10.000 y 100.000) y mide las consultas de AlmacenSQLite.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from evento import AdministradorDeEventos, EventoMoverJugador
+from grilla import Grilla
+from motor import MotorJuego
+from pathfinding import bfs_siguiente_paso
+from salon_de_la_fama import SalonDeLaFama
+from almacen_sqlite import AlmacenSQLite
+
+TAMAÑOS = ((15, 20), (101, 101), (1001, 1001))
+TAMAÑOS_RAPIDOS = ((15, 20), (101, 101))
+ENEMIGOS = (1, 50, 500)
+PUNTUACIONES = (10, 1000, 100000)
+PUNTUACIONES_RAPIDAS = (10, 1000)
+# (usuarios, partidas) de la base SQLite
+BASES = ((100_000, 2_000_000),)
+BASES_RAPIDAS = ((10_000, 100_000),)
+# Tope de enemigos × celdas para las estrategias con búsqueda por enemigo
+LIMITE_BUSQUEDAS = {"astar": 5_000_000, "hpa": 50_000_000}
+
+
+def generar_laberinto(filas, columnas, semilla=0, ciclos=0.05):
+    """Backtracker iterativo sobre celdas impares más un `ciclos` de paredes abiertas."""
+    rng = random.Random(semilla)
+    laberinto = [[1] * columnas for _ in range(filas)]
+    pila = [(1, 1)]
+    laberinto[1][1] = 0
+    while pila:
+        x, y = pila[-1]
+        opciones = [
+            (x + dx, y + dy, x + dx // 2, y + dy // 2)
+            for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+            if 0 < x + dx < columnas - 1 and 0 < y + dy < filas - 1
+            and laberinto[y + dy][x + dx] == 1
+        ]
+        if not opciones:
+            pila.pop()
+            continue
+        nx, ny, mx, my = rng.choice(opciones)
+        laberinto[my][mx] = 0
+        laberinto[ny][nx] = 0
+        pila.append((nx, ny))
+    # Algunos ciclos para que haya más de un camino entre dos celdas
+    for _ in range(int(filas * columnas * ciclos)):
+        x, y = rng.randrange(1, columnas - 1), rng.randrange(1, filas - 1)
+        laberinto[y][x] = 0
+    return laberinto
+
+
+def medir(funcion, rondas=5, tiempo_ronda=0.05, preparar=None):
+    """
+    Tiempo por llamada en microsegundos. Cada ronda repite `funcion` las
+    veces necesarias para durar al menos `tiempo_ronda`; se informa la
+    mediana y el mínimo entre rondas. `preparar` se llama antes de cada
+    repetición y queda fuera de la medición.
+    """
+    repeticiones = 1
+    while True:
+        duracion = _ronda(funcion, repeticiones, preparar)
+        if duracion >= tiempo_ronda or repeticiones >= 1 << 20:
+            break
+        repeticiones *= 2 if duracion == 0 else max(2, min(10, int(tiempo_ronda / duracion) + 1))
+    tiempos = sorted(
+        [duracion] + [_ronda(funcion, repeticiones, preparar) for _ in range(rondas - 1)]
+    )
+    return {
+        "mediana_us": tiempos[len(tiempos) // 2] / repeticiones * 1e6,
+        "min_us": tiempos[0] / repeticiones * 1e6,
+        "repeticiones": repeticiones,
+    }
+
+
+def _ronda(funcion, repeticiones, preparar):
+    if preparar is None:
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        return time.perf_counter() - inicio
+    total = 0.0
+    for _ in range(repeticiones):
+        preparar()
+        inicio = time.perf_counter()
+        funcion()
+        total += time.perf_counter() - inicio
+    return total
+
+
+def _nivel(laberinto):
+    return {
+        "nombre": f"bench {len(laberinto)}x{len(laberinto[0])}",
+        "laberinto": laberinto,
+        "entrada": [1, 1],
+        "estrellas": 0,
+        "enemigos": 0,
+        "powerups": 0,
+        "vel_enemigos": 1,
+    }
+
+
+def bench_bfs(laberintos, resultados, rapido):
+    for (filas, columnas), laberinto in laberintos.items():
+        grilla = Grilla.desde_lista(laberinto)
+        libres = grilla.celdas_libres()
+        rng = random.Random(1)
+        pares = [(rng.choice(libres), rng.choice(libres)) for _ in range(32)]
+        indice = [0]
+
+        def buscar():
+            origen, destino = pares[indice[0] % len(pares)]
+            indice[0] += 1
+            bfs_siguiente_paso(grilla, origen, destino)
+
+        resultados[f"bfs/{filas}x{columnas}"] = medir(
+            buscar, rondas=3 if filas > 500 else 5
+        )
+
+
+def bench_ia(laberintos, resultados, rapido):
+    # Un tick de ControladorEnemigos con cada estrategia de búsqueda
+    for (filas, columnas), laberinto in laberintos.items():
+        for estrategia in ("campo", "astar", "hpa"):
+            prefijo = "ia" if estrategia == "campo" else f"ia_{estrategia}"
+            for cantidad in ENEMIGOS:
+                # La primera búsqueda de cada enemigo recorre buena parte del laberinto
+                if cantidad * filas * columnas > LIMITE_BUSQUEDAS.get(estrategia, cantidad * filas * columnas):
+                    continue
+                motor = MotorJuego(niveles=[_nivel(laberinto)], semilla=cantidad)
+                motor.VELOCIDAD_ENEMIGOS = 1
+                motor.ESTRATEGIA_IA = estrategia
+                # Invulnerable: las colisiones no reinician la partida durante la medición
+                motor.potenciador_activo = "invulnerable"
+                controlador = motor.controlador_enemigos
+                libres = motor.LABERINTO.celdas_libres()
+                iniciales = random.Random(cantidad).sample(libres, min(cantidad, len(libres)))
+                motor.enemigos = iniciales
+                controlador.actualizar()
+                # Jugador quieto: mapa o caminos ya calculados, solo pasos de enemigos.
+                # Cada repetición parte del mismo estado: posiciones tras el primer
+                # tick y, si hay, los caminos guardados a mitad de recorrido
+                posiciones = list(motor.enemigos)
+                caminos = controlador.caminos
+                guardados = dict(caminos._caminos) if caminos else None
+
+                def preparar():
+                    motor.enemigos = posiciones
+                    if caminos:
+                        caminos._caminos = {
+                            clave: (objetivo, posicion, list(pasos) if pasos else pasos)
+                            for clave, (objetivo, posicion, pasos) in guardados.items()
+                        }
+
+                resultados[f"{prefijo}/{filas}x{columnas}/{cantidad}"] = medir(
+                    controlador.actualizar, preparar=preparar
+                )
+
+            # Peor caso: objetivo nuevo lejos. El mapa de distancias se rehace
+            # entero; con caminos por enemigo se mide una sola búsqueda
+            def preparar_recalculo():
+                if estrategia == "campo":
+                    controlador.campo = None
+                    motor.enemigos = iniciales
+                else:
+                    controlador.caminos.olvidar()
+                    motor.enemigos = iniciales[:1]
+
+            resultados[f"{prefijo}_recalculo/{filas}x{columnas}"] = medir(
+                controlador.actualizar, preparar=preparar_recalculo,
+                rondas=3 if filas > 500 else 5,
+            )
+
+
+def bench_dibujo(laberintos, resultados, rapido):
+    try:
+        import pygame
+    except ImportError:
+        print("pygame no disponible: se omiten las mediciones de dibujo")
+        return
+    from vista import Vista
+
+    pygame.init()
+    vista = Vista(900, 700, "benchmark")
+    for (filas, columnas), laberinto in laberintos.items():
+        grilla = Grilla.desde_lista(laberinto)
+        # Celdas más chicas en laberintos grandes para que el fondo quepa en memoria
+        tamaño = max(2, min(32, 4000 // max(filas, columnas)))
+
+        def dibujar():
+            vista.dibujar_laberinto(grilla, tamaño)
+
+        resultados[f"dibujo_frio/{filas}x{columnas}"] = medir(
+            dibujar, preparar=vista.invalidar_fondo, rondas=3
+        )
+        resultados[f"dibujo_cache/{filas}x{columnas}"] = medir(dibujar)
+    pygame.quit()
+
+
+def bench_eventos(laberintos, resultados, rapido):
+    class Escucha:
+        def notificar(self, evento):
+            pass
+
+    for escuchas in (1, 10):
+        administrador = AdministradorDeEventos()
+        for _ in range(escuchas):
+            administrador.registrar(EventoMoverJugador, Escucha())
+        evento = EventoMoverJugador("arriba")
+
+        def publicar():
+            administrador.publicar(evento)
+
+        resultados[f"publicar/{escuchas}"] = medir(publicar)
+
+
+def bench_salon(laberintos, resultados, rapido):
+    for cantidad in PUNTUACIONES_RAPIDAS if rapido else PUNTUACIONES:
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "puntuaciones.json")
+            rng = random.Random(cantidad)
+            usuarios = max(1, cantidad // 10)
+            datos = {}
+            for i in range(cantidad):
+                datos.setdefault(f"U{i % usuarios}", []).append({
+                    "puntuacion": rng.randrange(10000),
+                    "nivel": 1,
+                    "laberinto": "bench",
+                    "fecha": "2025-01-01 00:00:00",
+                })
+            with open(ruta, "w") as f:
+                json.dump(datos, f)
+            for diario in (False, True):
+                salon = SalonDeLaFama(ruta, diario=diario)
+                modo = "diario" if diario else "completo"
+                contador = [0]
+
+                def registrar():
+                    contador[0] += 1
+                    salon.registrar_puntuacion(
+                        f"U{contador[0] % usuarios}", contador[0] % 10000, 1, "bench"
+                    )
+
+                def registrar_en_disco():
+                    registrar()
+                    salon.escritor.flush()
+
+                # Con la tabla recién cargada: cuenta también la escritura del hilo
+                # (serializar, anexar y fsync); la medición siguiente solo encola
+                # y agranda la tabla en miles de partidas
+                resultados[f"registrar_en_disco/{modo}/{cantidad}"] = medir(
+                    registrar_en_disco, rondas=3, tiempo_ronda=0.02
+                )
+                resultados[f"registrar/{modo}/{cantidad}"] = medir(
+                    registrar, rondas=3, tiempo_ronda=0.02 if not diario else 0.05
+                )
+                resultados[f"ranking/{modo}/{cantidad}"] = medir(
+                    lambda: salon.obtener_ranking_global(10)
+                )
+                # Las escrituras van al hilo del escritor: se vacía antes de borrar la carpeta
+                salon.cerrar()
+
+
+def bench_sqlite(laberintos, resultados, rapido):
+    for usuarios, partidas in BASES_RAPIDAS if rapido else BASES:
+        with tempfile.TemporaryDirectory() as carpeta:
+            almacen = AlmacenSQLite(os.path.join(carpeta, "bench.db"))
+            # Carga masiva en SQL: generar millones de filas en Python tardaría más que medir
+            with almacen._escritura as conexion:
+                conexion.execute(
+                    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+                    "INSERT INTO usuarios (nombre, registrado) SELECT printf('U%06d', i), 1 FROM n",
+                    (usuarios,),
+                )
+                conexion.execute(
+                    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+                    "INSERT INTO partidas (usuario_id, puntuacion, nivel, laberinto, fecha) "
+                    "SELECT abs(random()) % ? + 1, abs(random()) % 1000 * 10, i % 20 + 1, "
+                    "'Laberinto ' || (i % 20 + 1), "
+                    "datetime(1700000000 + i * 60, 'unixepoch') FROM n",
+                    (partidas, usuarios),
+                )
+            almacen.reconstruir_agregados()
+            sufijo = f"{usuarios // 1000}k/{partidas // 1000}k"
+            pagina = almacen.ranking_global(10)
+            for _ in range(99):
+                pagina = almacen.ranking_global(10, pagina[-1])
+            resultados[f"sqlite/ranking/{sufijo}"] = medir(lambda: almacen.ranking_global(10))
+            resultados[f"sqlite/ranking_pagina100/{sufijo}"] = medir(
+                lambda: almacen.ranking_global(10, pagina[-1])
+            )
+            resultados[f"sqlite/top_nivel/{sufijo}"] = medir(lambda: almacen.top_nivel(7, 10))
+            resultados[f"sqlite/top_laberinto/{sufijo}"] = medir(
+                lambda: almacen.top_laberinto("Laberinto 7", 10)
+            )
+            resultados[f"sqlite/percentil/{sufijo}"] = medir(lambda: almacen.percentil(5000, 7))
+            resultados[f"sqlite/historial/{sufijo}"] = medir(
+                lambda: almacen.historial("U000042", "2023-11-20", "2024-06-30", 20)
+            )
+            resultados[f"sqlite/usuario_existe/{sufijo}"] = medir(
+                lambda: almacen.usuario_registrado("U099999")
+            )
+            contador = [0]
+
+            def registrar():
+                contador[0] += 1
+                almacen.registrar_partida(f"U{contador[0] % usuarios:06d}", {
+                    "puntuacion": contador[0] % 10000, "nivel": 1,
+                    "laberinto": "bench", "fecha": "2025-01-01 00:00:00",
+                })
+
+            resultados[f"sqlite/registrar/{sufijo}"] = medir(registrar, rondas=3)
+            almacen.cerrar()
+
+
+GRUPOS = {
+    "bfs": bench_bfs,
+    "ia": bench_ia,
+    "dibujo": bench_dibujo,
+    "publicar": bench_eventos,
+    "salon": bench_salon,
+    "sqlite": bench_sqlite,
+}
+CON_LABERINTOS = ("bfs", "ia", "dibujo")
+
+
+def ejecutar(filtro=None, rapido=False):
+    tamaños = TAMAÑOS_RAPIDOS if rapido else TAMAÑOS
+    laberintos = {}
+    resultados = {}
+    for nombre, funcion in GRUPOS.items():
+        if filtro and filtro not in nombre:
+            continue
+        if nombre in CON_LABERINTOS and not laberintos:
+            laberintos = {
+                (filas, columnas): generar_laberinto(filas, columnas)
+                for filas, columnas in tamaños
+            }
+        funcion(laberintos, resultados, rapido)
+    return resultados
+
+
+def comparar(base, actual, umbral):
+    """Filas (nombre, base, actual, razón) y la lista de las que empeoraron más que `umbral`."""
+    filas = []
+    regresiones = []
+    for nombre, medida in actual.items():
+        previa = base.get(nombre)
+        if previa is None:
+            continue
+        razon = medida["mediana_us"] / previa["mediana_us"] if previa["mediana_us"] else 1.0
+        filas.append((nombre, previa["mediana_us"], medida["mediana_us"], razon))
+        if razon > 1 + umbral:
+            regresiones.append(nombre)
+    return filas, regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento de Maze-Run")
+    parser.add_argument("--salida", help="guardar los resultados en este JSON")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior usada como base")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="fracción de empeoramiento tolerada (0.10 = 10%%)")
+    parser.add_argument("--filtro", help="solo grupos cuyo nombre contenga este texto")
+    parser.add_argument("--rapido", action="store_true",
+                        help="sin el laberinto de 1000x1000 ni las 100.000 puntuaciones")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.filtro, args.rapido)
+    for nombre, medida in resultados.items():
+        print(f"{nombre:<32}{medida['mediana_us']:>14.2f} us{medida['min_us']:>14.2f} us (min)")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "resultados": resultados,
+            }, f, indent=4)
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)["resultados"]
+        filas, regresiones = comparar(base, resultados, args.umbral)
+        print(f"\n{'Medición':<32}{'Base(us)':>12}{'Actual(us)':>12}{'Razón':>8}")
+        for nombre, previa, actual, razon in filas:
+            marca = "  <-- más lento" if nombre in regresiones else ""
+            print(f"{nombre:<32}{previa:>12.2f}{actual:>12.2f}{razon:>8.2f}{marca}")
+        if regresiones:
+            print(f"{len(regresiones)} medición(es) empeoraron más de {args.umbral:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
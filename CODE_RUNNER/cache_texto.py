@@ -0,0 +1,39 @@
+import pygame
+from collections import OrderedDict
+
+
+class CacheTexto:
+    """
+    Caché de fuentes por tamaño y de superficies de texto ya renderizadas.
+    Las superficies viven en un LRU acotado con clave
+    (texto, tamaño, color, antialias).
+    """
+
+    def __init__(self, capacidad=256):
+        self.capacidad = capacidad
+        self.fuentes = {}
+        self.superficies = OrderedDict()
+
+    def fuente(self, tamaño):
+        fuente = self.fuentes.get(tamaño)
+        if fuente is None:
+            # Es lo mismo que SysFont(None, tamaño) sin recorrer antes las
+            # fuentes del sistema (fc-list), que tarda en el primer uso
+            fuente = pygame.font.Font(None, tamaño)
+            self.fuentes[tamaño] = fuente
+        return fuente
+
+    def renderizar(self, texto, tamaño, color=(255, 255, 255), antialias=True):
+        clave = (texto, tamaño, tuple(color), antialias)
+        superficie = self.superficies.get(clave)
+        if superficie is not None:
+            self.superficies.move_to_end(clave)
+            return superficie
+        superficie = self.fuente(tamaño).render(texto, antialias, color)
+        self.superficies[clave] = superficie
+        if len(self.superficies) > self.capacidad:
+            self.superficies.popitem(last=False)
+        return superficie
+
+    def limpiar(self):
+        self.superficies.clear()
@@ -0,0 +1,180 @@
+"""
+Cliente liviano del servidor de partidas: manda las teclas y dibuja con
+Vista el estado que llega en los deltas, sin correr el motor.
+
+Uso:
+    python cliente.py [--unix RUTA | --puerto 7777] [--tasa 50] [--nivel 0]
+"""
+import argparse
+import socket
+import sys
+
+import pygame
+
+from grabacion import BIT_DIRECCION
+from grilla import Grilla
+from servidor import (
+    ENTRADA,
+    HOLA,
+    PUERTO,
+    TASA_POR_DEFECTO,
+    TIPO_ENTRADA,
+    TIPO_HOLA,
+    TIPO_NIVEL,
+    EstadoRemoto,
+    mensaje,
+    separar_mensajes,
+)
+from vista import Vista
+
+TECLAS_DIRECCION = {
+    pygame.K_UP: "arriba",
+    pygame.K_DOWN: "abajo",
+    pygame.K_LEFT: "izquierda",
+    pygame.K_RIGHT: "derecha",
+}
+
+
+def conectar(unix=None, puerto=PUERTO):
+    if unix:
+        conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexion.connect(unix)
+    else:
+        conexion = socket.create_connection(("127.0.0.1", puerto))
+        conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conexion
+
+
+class Cliente:
+    def __init__(self, conexion, tasa=TASA_POR_DEFECTO, nivel=0, ancho=900, alto=700, fps=60):
+        self.conexion = conexion
+        self.tasa = tasa
+        self.nivel = nivel
+        self.FPS = fps
+        self.tamaño_celda = 32
+        self.remoto = EstadoRemoto()
+        self.bufer = bytearray()
+        self.laberinto = None
+        self.pulsadas = set()
+        self.mascara = 0
+        pygame.display.init()
+        pygame.font.init()
+        self.vista = Vista(ancho, alto, "Maze-Run (remoto)")
+        self.reloj = pygame.time.Clock()
+        self._enviar(TIPO_HOLA, HOLA.pack(tasa, nivel, 0))
+        # Las lecturas no bloquean: cada cuadro toma lo que haya llegado
+        conexion.setblocking(False)
+
+    def _enviar(self, tipo, carga=b""):
+        self.conexion.sendall(mensaje(tipo, carga))
+
+    def _recibir(self):
+        """Aplica los mensajes pendientes; devuelve False si el servidor cerró."""
+        while True:
+            try:
+                datos = self.conexion.recv(65536)
+            except BlockingIOError:
+                return True
+            if not datos:
+                return False
+            self.bufer += datos
+            for tipo, carga in separar_mensajes(self.bufer):
+                self.remoto.aplicar(tipo, carga)
+                if tipo == TIPO_NIVEL:
+                    self._configurar_tablero()
+
+    def _configurar_tablero(self):
+        remoto = self.remoto
+        self.laberinto = Grilla(remoto.filas, remoto.columnas, remoto.celdas)
+        ancho_tablero = self.tamaño_celda * remoto.columnas
+        alto_tablero = self.tamaño_celda * remoto.filas
+        if ancho_tablero <= self.vista.ancho and alto_tablero <= self.vista.alto - 40:
+            area = (0, 40, self.vista.ancho, self.vista.alto - 40)
+        else:
+            area = (0, 90, self.vista.ancho, self.vista.alto - 90)
+        self.vista.configurar_camara(ancho_tablero, alto_tablero, area)
+        self.vista.invalidar_fondo()
+
+    def _actualizar_entradas(self):
+        mascara = 0
+        for direccion in self.pulsadas:
+            mascara |= BIT_DIRECCION[direccion]
+        if mascara != self.mascara:
+            self.mascara = mascara
+            self._enviar(TIPO_ENTRADA, ENTRADA.pack(mascara))
+
+    def _dibujar(self):
+        remoto = self.remoto
+        vista = self.vista
+        tamaño = self.tamaño_celda
+        if remoto.estado == "GAME_OVER":
+            vista.limpiar_pantalla((30, 0, 0))
+            vista.dibujar_texto("GAME OVER", 220, 200, 72, (255, 80, 80))
+            vista.dibujar_texto(f"Puntaje final: {remoto.puntuacion}", 250, 300, 48, (255, 255, 255))
+            vista.dibujar_texto("ENTER para jugar otra vez, ESC para salir", 160, 400, 32, (200, 200, 200))
+            vista.actualizar()
+            return
+        vista.limpiar_pantalla((0, 0, 0))
+        if self.laberinto is None:
+            vista.dibujar_texto("Esperando al servidor...", 250, 300, 32, (200, 200, 200))
+            vista.actualizar()
+            return
+        color_pared, color_suelo, color_enemigo = remoto.colores
+        jugador_x, jugador_y = remoto.jugador
+        vista.seguir((jugador_x + 0.5) * tamaño, (jugador_y + 0.5) * tamaño)
+        vista.dibujar_laberinto(self.laberinto, tamaño, color_pared, color_suelo)
+        for x, y in remoto.enemigos:
+            vista.dibujar_enemigo(x * tamaño, y * tamaño, tamaño, color=color_enemigo)
+        for x, y in remoto.estrellas:
+            vista.dibujar_estrella(x * tamaño, y * tamaño, tamaño)
+        for x, y in remoto.potenciadores:
+            vista.dibujar_potenciador(x * tamaño, y * tamaño, tamaño)
+        vista.dibujar_jugador(jugador_x * tamaño, jugador_y * tamaño, tamaño)
+        vista.terminar_tablero()
+        vista.dibujar_texto(f"Estrellas restantes: {len(remoto.estrellas)}", 20, 20, 24, (255, 255, 0))
+        vista.dibujar_interfaz(remoto.vidas, remoto.puntuacion, x=20, y=48)
+        vista.actualizar()
+
+    def ejecutar(self):
+        try:
+            while True:
+                for evento in pygame.event.get():
+                    if evento.type == pygame.QUIT:
+                        return
+                    if evento.type == pygame.KEYDOWN:
+                        if evento.key == pygame.K_ESCAPE:
+                            return
+                        if evento.key in TECLAS_DIRECCION:
+                            self.pulsadas.add(TECLAS_DIRECCION[evento.key])
+                        elif evento.key == pygame.K_RETURN and self.remoto.estado == "GAME_OVER":
+                            self._enviar(TIPO_HOLA, HOLA.pack(self.tasa, self.nivel, 0))
+                    elif evento.type == pygame.KEYUP and evento.key in TECLAS_DIRECCION:
+                        self.pulsadas.discard(TECLAS_DIRECCION[evento.key])
+                self._actualizar_entradas()
+                if not self._recibir():
+                    print("El servidor cerró la conexión")
+                    return
+                self._dibujar()
+                self.reloj.tick(self.FPS)
+        finally:
+            self.conexion.close()
+            pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Juega una sesión del servidor de partidas")
+    parser.add_argument("--unix", help="ruta del socket Unix (por defecto, TCP local)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--tasa", type=int, default=TASA_POR_DEFECTO, help="ticks por segundo de la sesión")
+    parser.add_argument("--nivel", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        conexion = conectar(args.unix, args.puerto)
+    except OSError as error:
+        print(f"Sin conexión con el servidor: {error}")
+        sys.exit(1)
+    Cliente(conexion, args.tasa, args.nivel).ejecutar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,96 @@
 #Módulo de gestión de eventos para el juego
 class Evento:
-    pass
+    __slots__ = ()
 
 
 class EventoMoverJugador(Evento):
+    __slots__ = ("direccion",)
+
     def __init__(self,direccion):
         self.direccion=direccion
 
 class EventoRecogerEstrella(Evento):
+    __slots__ = ("posicion",)
+
     def __init__(self,posicion):
         self.posicion=posicion
 
 class EventoColisionEnemigo(Evento):
+    __slots__ = ("posicion_jugador", "posicion_enemigo")
+
     def __init__(self, posicion_jugador,posicion_enemigo):
         self.posicion_jugador=posicion_jugador
         self.posicion_enemigo=posicion_enemigo
 
 class EventoSeleccionMenu(Evento):
+    __slots__ = ("opcion",)
+
     def __init__(self,opcion):
         self.opcion=opcion
 
 
 class EventoPowerUpAgarrado(Evento):
+    __slots__ = ("tipo",)
+
     def __init__(self,tipo):
         self.tipo=tipo  # 'invulnerable', 'congelar', 'invisible'
 
 
 class AdministradorDeEventos:
+    """
+    Bus de eventos. Un escucha registrado para una clase recibe también los
+    eventos de sus subclases. Para cada tipo concreto se guarda una tupla
+    con sus escuchas que solo se recalcula cuando se registra uno nuevo,
+    así publicar no copia listas ni recorre la jerarquía.
+
+    publicar() despacha en el acto; encolar() difiere el evento hasta el
+    próximo procesar_cola(), que el motor llama una vez por tick.
+    """
+
+    # Rondas máximas por procesar_cola: lo encolado después queda para el próximo tick
+    MAX_LOTES = 8
+
     def __init__(self):
+        # tipo -> dict usado como conjunto ordenado (pertenencia en O(1))
         self.escuchas={}
+        self._despacho={}
+        self._cola=[]
 
     def registrar(self,tipo_evento,escucha):
-        if tipo_evento not in self.escuchas:
-            self.escuchas[tipo_evento]=[]
-        if escucha not in self.escuchas[tipo_evento]:
-            self.escuchas[tipo_evento].append(escucha)
+        suscritos=self.escuchas.setdefault(tipo_evento, {})
+        if escucha not in suscritos:
+            suscritos[escucha]=None
+            self._despacho.clear()
+
+    def _resolver(self, tipo):
+        # Escuchas de la clase más específica primero, sin repetir
+        escuchas={}
+        for clase in tipo.__mro__:
+            for escucha in self.escuchas.get(clase, ()):
+                escuchas.setdefault(escucha, None)
+        resultado=tuple(escuchas)
+        self._despacho[tipo]=resultado
+        return resultado
 
     def publicar(self, evento):
         tipo=type(evento)
-        if tipo in self.escuchas:
-            for escucha in list(self.escuchas[tipo]):
-                escucha.notificar(evento)
+        escuchas=self._despacho.get(tipo)
+        if escuchas is None:
+            escuchas=self._resolver(tipo)
+        for escucha in escuchas:
+            escucha.notificar(evento)
+
+    def encolar(self, evento):
+        self._cola.append(evento)
+
+    def procesar_cola(self):
+        """Despacha los eventos encolados por lotes; devuelve cuántos se procesaron."""
+        procesados=0
+        lotes=0
+        while self._cola and lotes < self.MAX_LOTES:
+            lote, self._cola=self._cola, []
+            for evento in lote:
+                self.publicar(evento)
+            procesados+=len(lote)
+            lotes+=1
+        return procesados
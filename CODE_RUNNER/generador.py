@@ -0,0 +1,301 @@
+"""
+Generador de niveles a partir de una semilla.
+
+Produce niveles con el mismo esquema que niveles.json (laberinto, entrada,
+salida, enemigos, estrellas, powerups, vel_enemigos, colores). La misma
+semilla y los mismos parámetros dan siempre el mismo nivel, sin importar
+cuántos procesos se usen: el nivel i se genera con la semilla base + i.
+
+Algoritmos:
+    backtracker    recorrido en profundidad: pasillos largos y sinuosos
+    prim           Prim aleatorio: muchas ramas cortas
+    trenzado       backtracker sin parte de los callejones sin salida (ciclos)
+    arbol_binario  cada celda abre al norte o al oeste; sin dependencias entre celdas
+    mezcla         rota entre los anteriores según el índice del nivel
+
+Con NumPy instalado los laberintos grandes se tallan con una sola
+asignación vectorizada; sin él se usa la versión en Python puro.
+
+Uso:
+    python generador.py niveles_generados.json --cantidad 5000 --semilla 7
+    python generador.py grandes.json --filas 501 --columnas 501 --procesos 8 --paquete
+    python generador.py --comprobar --semilla 7
+"""
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se talla celda por celda
+    np = None
+
+from pathfinding import CampoDistancias, INALCANZABLE
+
+ALGORITMOS = ("backtracker", "prim", "trenzado", "arbol_binario")
+PALETAS = (
+    {"pared": [60, 60, 60], "suelo": [220, 220, 220], "enemigo": [220, 50, 50]},
+    {"pared": [80, 80, 80], "suelo": [210, 230, 245], "enemigo": [220, 50, 50]},
+    {"pared": [255, 255, 255], "suelo": [180, 40, 40], "enemigo": [40, 40, 220]},
+    {"pared": [30, 60, 40], "suelo": [200, 230, 190], "enemigo": [150, 40, 160]},
+    {"pared": [70, 50, 30], "suelo": [240, 220, 180], "enemigo": [30, 120, 200]},
+)
+# Por debajo de este área armar los arreglos de NumPy cuesta más que tallar a mano
+AREA_VECTORIZADA = 4096
+
+
+def _vecinas(celda, ancho, alto):
+    # Celdas del grafo (no de la grilla) contiguas a `celda`
+    cx, cy = celda % ancho, celda // ancho
+    if cy > 0:
+        yield celda - ancho
+    if cy < alto - 1:
+        yield celda + ancho
+    if cx > 0:
+        yield celda - 1
+    if cx < ancho - 1:
+        yield celda + 1
+
+
+def _backtracker(rng, ancho, alto):
+    visitadas = bytearray(ancho * alto)
+    visitadas[0] = 1
+    pila = [0]
+    pasajes = []
+    while pila:
+        actual = pila[-1]
+        opciones = [v for v in _vecinas(actual, ancho, alto) if not visitadas[v]]
+        if not opciones:
+            pila.pop()
+            continue
+        siguiente = opciones[rng.randrange(len(opciones))]
+        visitadas[siguiente] = 1
+        pasajes.append((actual, siguiente))
+        pila.append(siguiente)
+    return pasajes
+
+
+def _prim(rng, ancho, alto):
+    visitadas = bytearray(ancho * alto)
+    visitadas[0] = 1
+    frontera = [(0, v) for v in _vecinas(0, ancho, alto)]
+    pasajes = []
+    while frontera:
+        # Quitar un elemento al azar en O(1): se cambia por el último
+        i = rng.randrange(len(frontera))
+        frontera[i], frontera[-1] = frontera[-1], frontera[i]
+        desde, hacia = frontera.pop()
+        if visitadas[hacia]:
+            continue
+        visitadas[hacia] = 1
+        pasajes.append((desde, hacia))
+        frontera.extend((hacia, v) for v in _vecinas(hacia, ancho, alto) if not visitadas[v])
+    return pasajes
+
+
+def _trenzar(rng, pasajes, ancho, alto, proporcion):
+    # Cada callejón sin salida se une a otra vecina con probabilidad `proporcion`
+    grado = [0] * (ancho * alto)
+    unidas = set()
+    for a, b in pasajes:
+        grado[a] += 1
+        grado[b] += 1
+        unidas.add((min(a, b), max(a, b)))
+    extra = []
+    for celda in range(ancho * alto):
+        if grado[celda] != 1 or rng.random() >= proporcion:
+            continue
+        opciones = [
+            v for v in _vecinas(celda, ancho, alto) if (min(celda, v), max(celda, v)) not in unidas
+        ]
+        if opciones:
+            otra = opciones[rng.randrange(len(opciones))]
+            unidas.add((min(celda, otra), max(celda, otra)))
+            grado[celda] += 1
+            grado[otra] += 1
+            extra.append((celda, otra))
+    return pasajes + extra
+
+
+def _arbol_binario(rng, ancho, alto):
+    # Un único sorteo de un bit por celda (el bit i decide la celda i), igual
+    # con o sin NumPy: la misma semilla da el mismo laberinto en cualquier máquina
+    total = ancho * alto
+    bits = rng.getrandbits(total).to_bytes((total + 7) // 8, "little")
+    if np is not None and 4 * total >= AREA_VECTORIZADA:
+        celdas = np.arange(1, total)
+        cx, cy = celdas % ancho, celdas // ancho
+        al_norte = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), bitorder="little")[1:total] == 1
+        # En la primera fila solo se puede ir al oeste; en la primera columna, al norte
+        al_norte = np.where(cy == 0, False, np.where(cx == 0, True, al_norte))
+        return celdas, np.where(al_norte, celdas - ancho, celdas - 1)
+    pasajes = []
+    for celda in range(1, total):
+        cx, cy = celda % ancho, celda // ancho
+        al_norte = cy > 0 and (cx == 0 or bits[celda >> 3] >> (celda & 7) & 1)
+        pasajes.append((celda, celda - ancho if al_norte else celda - 1))
+    return pasajes
+
+
+def _tallar(pasajes, ancho, alto, filas, columnas):
+    """Laberinto (lista de filas) con las celdas del grafo y sus pasajes abiertos."""
+    if np is not None and (isinstance(pasajes, tuple) or filas * columnas >= AREA_VECTORIZADA):
+        grilla = np.ones((filas, columnas), dtype=np.uint8)
+        grilla[1:2 * alto:2, 1:2 * ancho:2] = 0
+        if isinstance(pasajes, tuple):
+            desde, hacia = pasajes
+        else:
+            arreglo = np.array(pasajes, dtype=np.int64).reshape(-1, 2)
+            desde, hacia = arreglo[:, 0], arreglo[:, 1]
+        # La pared entre dos celdas vecinas está en el promedio de sus coordenadas
+        grilla[desde // ancho + hacia // ancho + 1, desde % ancho + hacia % ancho + 1] = 0
+        return grilla.tolist()
+    laberinto = [[1] * columnas for _ in range(filas)]
+    for cy in range(alto):
+        fila = laberinto[2 * cy + 1]
+        for cx in range(ancho):
+            fila[2 * cx + 1] = 0
+    for a, b in pasajes:
+        laberinto[a // ancho + b // ancho + 1][a % ancho + b % ancho + 1] = 0
+    return laberinto
+
+
+def generar_laberinto(rng, filas, columnas, algoritmo="backtracker", trenzado=0.3):
+    # Celdas en coordenadas impares; con lados pares sobra una fila/columna de pared
+    ancho, alto = (columnas - 1) // 2, (filas - 1) // 2
+    if ancho < 1 or alto < 1:
+        raise ValueError("el laberinto necesita al menos 3x3 celdas")
+    if algoritmo == "prim":
+        pasajes = _prim(rng, ancho, alto)
+    elif algoritmo == "arbol_binario":
+        pasajes = _arbol_binario(rng, ancho, alto)
+    else:
+        pasajes = _backtracker(rng, ancho, alto)
+        if algoritmo == "trenzado":
+            pasajes = _trenzar(rng, pasajes, ancho, alto, trenzado)
+        elif algoritmo != "backtracker":
+            raise ValueError(f"algoritmo desconocido: {algoritmo}")
+    return _tallar(pasajes, ancho, alto, filas, columnas)
+
+
+def generar_nivel(semilla, filas=15, columnas=21, algoritmo="backtracker", dificultad=0.5, nombre=None):
+    """
+    Nivel jugable en el esquema de niveles.json. La salida es la celda más
+    lejana a la entrada; se comprueba que todas las celdas sean alcanzables.
+    """
+    rng = random.Random(semilla)
+    laberinto = generar_laberinto(rng, filas, columnas, algoritmo)
+    entrada = (1, 1)
+    campo = CampoDistancias(laberinto)
+    campo.actualizar_objetivo(entrada)
+    salida, distancia = entrada, 0
+    for y in range(1, filas - 1, 2):
+        for x in range(1, columnas - 1, 2):
+            d = campo.distancia((x, y))
+            if d == INALCANZABLE:
+                raise RuntimeError(f"semilla {semilla}: la celda {(x, y)} quedó aislada")
+            if d > distancia:
+                salida, distancia = (x, y), d
+    area = filas * columnas
+    return {
+        "nombre": nombre or f"{algoritmo.capitalize()} {semilla}",
+        "laberinto": laberinto,
+        "vel_enemigos": max(10, round(18 - 6 * dificultad)),
+        "estrellas": 3 + round(dificultad * 2 * max(1, area // 300) ** 0.5),
+        "enemigos": 1 + round(dificultad * max(2, area // 150) ** 0.5),
+        "powerups": 1 + rng.randrange(2),
+        "entrada": list(entrada),
+        "salida": list(salida),
+        "colores": PALETAS[rng.randrange(len(PALETAS))],
+    }
+
+
+def _generar_tarea(tarea):
+    semilla, filas, columnas, algoritmo, dificultad = tarea
+    return generar_nivel(semilla, filas, columnas, algoritmo, dificultad)
+
+
+def generar_niveles(cantidad, semilla=0, filas=15, columnas=21, algoritmo="mezcla", procesos=1):
+    tareas = []
+    for i in range(cantidad):
+        elegido = ALGORITMOS[i % len(ALGORITMOS)] if algoritmo == "mezcla" else algoritmo
+        # La dificultad sube a lo largo del paquete
+        tareas.append((semilla + i, filas, columnas, elegido, i / max(1, cantidad - 1)))
+    if procesos == 1:
+        return [_generar_tarea(t) for t in tareas]
+    with Pool(procesos) as pool:
+        return pool.map(_generar_tarea, tareas, chunksize=max(1, cantidad // (procesos * 8)))
+
+
+def comprobar(semilla=0, filas=81, columnas=81):
+    """
+    Genera un nivel por algoritmo con y sin NumPy y devuelve los algoritmos
+    cuyo resultado difiere (None si NumPy no está instalado).
+    """
+    global np
+    con_numpy = np
+    if con_numpy is None:
+        return None
+    distintos = []
+    for algoritmo in ALGORITMOS:
+        try:
+            vectorizado = generar_nivel(semilla, filas, columnas, algoritmo)
+            np = None
+            puro = generar_nivel(semilla, filas, columnas, algoritmo)
+        finally:
+            np = con_numpy
+        if vectorizado != puro:
+            distintos.append(algoritmo)
+    return distintos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera niveles con semilla en el formato de niveles.json")
+    parser.add_argument("salida", nargs="?", help="archivo JSON a escribir")
+    parser.add_argument("--cantidad", type=int, default=100)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--filas", type=int, default=15)
+    parser.add_argument("--columnas", type=int, default=21)
+    parser.add_argument("--algoritmo", default="mezcla", choices=ALGORITMOS + ("mezcla",))
+    parser.add_argument("--procesos", type=int, default=1, help="0 = todos los núcleos")
+    parser.add_argument("--paquete", action="store_true", help="compilar también el .mrlp")
+    parser.add_argument(
+        "--comprobar", action="store_true",
+        help="verificar que con y sin NumPy la misma semilla da el mismo nivel",
+    )
+    args = parser.parse_args()
+
+    if args.comprobar:
+        distintos = comprobar(args.semilla)
+        if distintos is None:
+            print("NumPy no está instalado: solo existe la versión en Python puro")
+        elif distintos:
+            print(f"Con y sin NumPy difieren: {', '.join(distintos)}")
+            raise SystemExit(1)
+        else:
+            print("Con y sin NumPy se generan los mismos niveles")
+        return
+    if args.salida is None:
+        parser.error("falta el archivo de salida")
+
+    inicio = time.perf_counter()
+    niveles = generar_niveles(
+        args.cantidad, args.semilla, args.filas, args.columnas, args.algoritmo,
+        args.procesos or os.cpu_count() or 1,
+    )
+    temporal = f"{args.salida}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"niveles": niveles}, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(temporal, args.salida)
+    duracion = time.perf_counter() - inicio
+    print(f"{len(niveles)} niveles en {duracion:.2f}s ({len(niveles) / duracion:.0f}/s) -> {args.salida}")
+    if args.paquete:
+        from paquete_niveles import compilar
+        print(f"Paquete escrito en {compilar(args.salida)}")
+
+
+if __name__ == "__main__":
+    main()
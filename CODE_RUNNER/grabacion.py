@@ -0,0 +1,358 @@
+"""
+Grabación determinista de partidas (.mrrp) y reproductor sin ventana.
+
+Una partida queda definida por la semilla del motor, los niveles y las
+direcciones pulsadas en cada tick. Solo se guardan los cambios de entrada;
+cada cambio es un varint con los ticks desde el anterior y la máscara de
+direcciones (4 bits). Cada `intervalo` ticks se guarda además una huella
+del estado para detectar en qué punto diverge una reproducción.
+
+Formato (little-endian):
+    cabecera   "MRRP", versión u16, nivel inicial u16, semilla u64, ticks u32,
+               tasa lógica u16, intervalo u16, bytes de entradas u32,
+               puntos de control u32, huella de los niveles (sha1, 20 bytes)
+    textos     ruta de niveles y estrategia de IA (u16 + utf-8 cada uno)
+    entradas   varints (ticks desde el cambio anterior << 4 | máscara)
+    controles  puntos de control × (tick u32, huella del estado 8 bytes)
+
+Uso:
+    python grabacion.py grabaciones/*.mrrp [--niveles niveles.json] [--perfilar]
+    python grabacion.py --comprobar 3   (motor sin ventana y frontend, cortando con ESC)
+"""
+import argparse
+import hashlib
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from motor import DIRECCIONES, TASA_LOGICA, MotorJuego
+from perfilador import Perfilador
+
+MAGIA = b"MRRP"
+VERSION = 1
+CABECERA = struct.Struct("<4sHHQIHHII20s")
+LONGITUD = struct.Struct("<H")
+CONTROL = struct.Struct("<I8s")
+INTERVALO_CONTROL = 250
+
+BIT_DIRECCION = {direccion: 1 << i for i, direccion in enumerate(DIRECCIONES)}
+# Máscara -> direcciones pulsadas, en el orden de prioridad del motor
+ENTRADAS_MASCARA = [
+    tuple(d for d in DIRECCIONES if mascara & BIT_DIRECCION[d]) for mascara in range(16)
+]
+
+
+def huella_niveles(huellas):
+    return hashlib.sha1("".join(huellas).encode("ascii")).digest()
+
+
+def huella_estado(motor):
+    """Huella de 8 bytes de todo lo que decide los ticks siguientes."""
+    datos = (
+        motor.ticks, motor.estado, motor.nivel_actual, motor.posicion_x, motor.posicion_y,
+        tuple(motor.enemigos), tuple(motor.estrellas), tuple(motor.potenciadores),
+        motor.vidas, motor.puntuacion, motor.potenciador_activo,
+        motor.temporizador_potenciador, motor.controlador_enemigos.planificador.tick,
+        tuple(motor.controlador_enemigos.planificador.pendientes),
+        motor.temporizador_paso_jugador, motor.rng.getstate(),
+    )
+    return hashlib.blake2b(repr(datos).encode("utf-8"), digest_size=8).digest()
+
+
+def _escribir_varint(destino, valor):
+    while valor >= 0x80:
+        destino.append(valor & 0x7F | 0x80)
+        valor >>= 7
+    destino.append(valor)
+
+
+def _leer_varints(datos):
+    valor = desplazamiento = 0
+    for byte in datos:
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte & 0x80:
+            desplazamiento += 7
+        else:
+            yield valor
+            valor = desplazamiento = 0
+
+
+class Grabacion:
+    """
+    Entradas y puntos de control de una partida. Se crea con nueva() justo
+    después de MotorJuego.reiniciar(); el frontend llama a registrar()
+    antes de cada paso y a punto_control() después.
+    """
+
+    def __init__(self, semilla, nivel, huella, ruta_niveles, estrategia, tasa=TASA_LOGICA, intervalo=INTERVALO_CONTROL):
+        self.semilla = semilla
+        self.nivel = nivel
+        self.huella = huella
+        self.ruta_niveles = ruta_niveles
+        self.estrategia = estrategia
+        self.tasa = tasa
+        self.intervalo = intervalo
+        self.ticks = 0
+        self.cambios = bytearray()
+        self.controles = []
+        self._mascara = 0
+        self._tick_cambio = 0
+
+    @classmethod
+    def nueva(cls, motor, semilla, tasa=TASA_LOGICA, intervalo=INTERVALO_CONTROL):
+        grabacion = cls(
+            semilla, motor.nivel_actual, huella_niveles(motor.huellas_niveles()),
+            motor.ruta_niveles, motor.ESTRATEGIA_IA, tasa, intervalo,
+        )
+        grabacion.controles.append((motor.ticks, huella_estado(motor)))
+        return grabacion
+
+    def registrar(self, entradas):
+        mascara = 0
+        for direccion in entradas:
+            mascara |= BIT_DIRECCION[direccion]
+        if mascara != self._mascara:
+            _escribir_varint(self.cambios, (self.ticks - self._tick_cambio) << 4 | mascara)
+            self._mascara = mascara
+            self._tick_cambio = self.ticks
+        self.ticks += 1
+
+    def punto_control(self, motor):
+        if motor.ticks % self.intervalo == 0:
+            self.controles.append((motor.ticks, huella_estado(motor)))
+
+    def terminar(self, motor):
+        # El estado final siempre queda verificado
+        if self.controles[-1][0] != motor.ticks:
+            self.controles.append((motor.ticks, huella_estado(motor)))
+
+    def entradas(self):
+        """Direcciones pulsadas en cada tick grabado."""
+        tick = 0
+        entradas = ()
+        for valor in _leer_varints(self.cambios):
+            hasta = tick + (valor >> 4)
+            while tick < hasta:
+                yield entradas
+                tick += 1
+            entradas = ENTRADAS_MASCARA[valor & 0xF]
+        while tick < self.ticks:
+            yield entradas
+            tick += 1
+
+    def guardar(self, ruta):
+        ruta_niveles = self.ruta_niveles.encode("utf-8")
+        estrategia = self.estrategia.encode("utf-8")
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(CABECERA.pack(
+                MAGIA, VERSION, self.nivel, self.semilla, self.ticks, self.tasa,
+                self.intervalo, len(self.cambios), len(self.controles), self.huella,
+            ))
+            archivo.write(LONGITUD.pack(len(ruta_niveles)) + ruta_niveles)
+            archivo.write(LONGITUD.pack(len(estrategia)) + estrategia)
+            archivo.write(self.cambios)
+            for tick, huella in self.controles:
+                archivo.write(CONTROL.pack(tick, huella))
+        os.replace(temporal, ruta)
+        return ruta
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "rb") as archivo:
+            datos = archivo.read()
+        (
+            magia, version, nivel, semilla, ticks, tasa, intervalo, largo_cambios,
+            cantidad_controles, huella,
+        ) = CABECERA.unpack_from(datos)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{ruta}: no es una grabación compatible")
+        posicion = CABECERA.size
+        textos = []
+        for _ in range(2):
+            (largo,) = LONGITUD.unpack_from(datos, posicion)
+            posicion += LONGITUD.size
+            textos.append(datos[posicion:posicion + largo].decode("utf-8"))
+            posicion += largo
+        grabacion = cls(semilla, nivel, huella, textos[0], textos[1], tasa, intervalo)
+        grabacion.ticks = ticks
+        grabacion.cambios = bytearray(datos[posicion:posicion + largo_cambios])
+        posicion += largo_cambios
+        grabacion.controles = [
+            CONTROL.unpack_from(datos, posicion + i * CONTROL.size)
+            for i in range(cantidad_controles)
+        ]
+        return grabacion
+
+
+def reproducir(grabacion, niveles=None, perfilar=False):
+    """
+    Vuelve a ejecutar la partida sin ventana ni límite de cuadros y compara
+    la huella del estado en cada punto de control. Devuelve un resumen;
+    `divergencia` es el primer tick cuya huella no coincide (o None).
+    """
+    motor = MotorJuego(niveles=niveles, ruta_niveles=grabacion.ruta_niveles)
+    if huella_niveles(motor.huellas_niveles()) != grabacion.huella:
+        raise ValueError("los niveles no son los mismos con los que se grabó la partida")
+    motor.ESTRATEGIA_IA = grabacion.estrategia
+    if perfilar:
+        motor.perfilador = Perfilador(capacidad=max(1, grabacion.ticks))
+    motor.reiniciar(grabacion.nivel, grabacion.semilla)
+    controles = iter(grabacion.controles)
+    control = next(controles, None)
+    divergencia = None
+    verificados = 0
+    paso = motor.paso
+    inicio = time.perf_counter()
+    for entradas in grabacion.entradas():
+        if control is not None and control[0] == motor.ticks:
+            if huella_estado(motor) != control[1]:
+                divergencia = motor.ticks
+                break
+            verificados += 1
+            control = next(controles, None)
+        paso(entradas)
+        motor.perfilador.cerrar_cuadro()
+    else:
+        if control is not None and control[0] == motor.ticks:
+            if huella_estado(motor) != control[1]:
+                divergencia = motor.ticks
+            else:
+                verificados += 1
+    duracion = time.perf_counter() - inicio
+    resultado = {
+        "ticks": motor.ticks,
+        "duracion_s": duracion,
+        "aceleracion": motor.ticks / grabacion.tasa / duracion if duracion else 0.0,
+        "controles": verificados,
+        "divergencia": divergencia,
+        "estado": motor.estado,
+        "puntuacion": motor.puntuacion,
+    }
+    if perfilar:
+        resultado["perfil_ms"] = motor.perfilador.resumen()
+    return resultado
+
+
+def comprobar(partidas=2, ticks=3000, semilla=0):
+    """
+    Graba varias partidas seguidas con entradas al azar sobre el mismo
+    motor, como hace el juego, y las reproduce. Devuelve los índices de
+    las partidas que divergen.
+    """
+    rng = random.Random(semilla)
+    motor = MotorJuego()
+    fallidas = []
+    for partida in range(partidas):
+        semilla_partida = rng.getrandbits(32)
+        motor.reiniciar(0, semilla_partida)
+        grabacion = Grabacion.nueva(motor, semilla_partida)
+        for _ in range(ticks):
+            entradas = (rng.choice(DIRECCIONES),) if rng.random() < 0.7 else ()
+            grabacion.registrar(entradas)
+            motor.paso(entradas)
+            grabacion.punto_control(motor)
+            if motor.estado != "JUEGO":
+                break
+        grabacion.terminar(motor)
+        if reproducir(grabacion)["divergencia"] is not None:
+            fallidas.append(partida)
+    return fallidas
+
+
+def comprobar_juego(partidas=2, ticks=120, semilla=0):
+    """
+    Como comprobar(), pero a través del frontend: cada partida se corta con
+    ESC como lo haría el jugador y se reproduce el .mrrp que escribió el
+    juego. Necesita pygame; corre sin ventana con el driver "dummy".
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from juego import Juego
+    from persistencia import escritor_por_defecto
+
+    rng = random.Random(semilla)
+    fallidas = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        juego = Juego(grabar=True, carpeta_grabaciones=carpeta)
+        try:
+            for partida in range(partidas):
+                juego.empezar_partida()
+                # Partidas cortas, para cortarlas vivas y fuera de los puntos de control
+                for _ in range(rng.randrange(ticks // 4, ticks)):
+                    juego.paso((rng.choice(DIRECCIONES),) if rng.random() < 0.7 else ())
+                    if juego.estado != "JUEGO":
+                        break
+                if juego.estado == "JUEGO":
+                    juego._manejar_evento(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+                else:
+                    juego._terminar_grabacion()
+                escritor_por_defecto().flush()
+                rutas = sorted(os.listdir(carpeta))
+                if len(rutas) != 1:
+                    fallidas.append(partida)
+                    continue
+                ruta = os.path.join(carpeta, rutas[0])
+                if reproducir(Grabacion.cargar(ruta))["divergencia"] is not None:
+                    fallidas.append(partida)
+                os.remove(ruta)
+        finally:
+            pygame.quit()
+    return fallidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce partidas grabadas y verifica que no diverjan")
+    parser.add_argument("grabaciones", nargs="*")
+    parser.add_argument("--niveles", help="archivo de niveles (por defecto, el de la grabación)")
+    parser.add_argument("--perfilar", action="store_true", help="percentiles por tick de la IA")
+    parser.add_argument(
+        "--comprobar", type=int, metavar="N",
+        help="grabar N partidas seguidas en un mismo motor y verificar que se reproducen",
+    )
+    args = parser.parse_args()
+
+    if args.comprobar:
+        fallos = 0
+        for nombre, funcion in (("motor", comprobar), ("juego", comprobar_juego)):
+            fallidas = funcion(args.comprobar)
+            if fallidas:
+                fallos += 1
+                print(f"{nombre}: divergen las partidas {fallidas} de {args.comprobar}")
+            else:
+                print(f"{nombre}: {args.comprobar} partidas seguidas se reproducen sin divergir")
+        sys.exit(1 if fallos else 0)
+    if not args.grabaciones:
+        parser.error("indicar grabaciones o --comprobar")
+    fallos = 0
+    for ruta in args.grabaciones:
+        grabacion = Grabacion.cargar(ruta)
+        niveles = None
+        if args.niveles:
+            niveles = MotorJuego(ruta_niveles=args.niveles).niveles
+        try:
+            resultado = reproducir(grabacion, niveles, args.perfilar)
+        except ValueError as error:
+            print(f"{ruta}: {error}")
+            fallos += 1
+            continue
+        if resultado["divergencia"] is not None:
+            fallos += 1
+            veredicto = f"DIVERGE en el tick {resultado['divergencia']}"
+        else:
+            veredicto = f"OK ({resultado['controles']} controles)"
+        print(
+            f"{ruta}: {resultado['ticks']} ticks en {resultado['duracion_s'] * 1000:.1f} ms "
+            f"(x{resultado['aceleracion']:.0f} tiempo real), {veredicto}"
+        )
+        for fase, valores in resultado.get("perfil_ms", {}).items():
+            print(f"    {fase:<8} p50 {valores['p50']:.3f} ms  p95 {valores['p95']:.3f} ms  p99 {valores['p99']:.3f} ms")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan las rutas en Python puro
+    np = None
+
+PARED = 1
+# Tabla para bytes.translate: pared -> 0, cualquier otra celda -> 1
+_TABLA_LIBRE = bytes(0 if valor == PARED else 1 for valor in range(256))
+
+
+class Grilla:
+    """
+    Laberinto guardado en un único bytearray contiguo (un byte por celda,
+    fila por fila). Con NumPy disponible `matriz` es una vista uint8 de
+    (filas, columnas) sobre el mismo buffer.
+    """
+
+    def __init__(self, filas, columnas, celdas=None):
+        self.filas = filas
+        self.columnas = columnas
+        self.celdas = bytearray(celdas) if celdas is not None else bytearray(filas * columnas)
+        self._memoria = memoryview(self.celdas)
+        self.matriz = (
+            np.frombuffer(self.celdas, dtype=np.uint8).reshape(filas, columnas)
+            if np is not None
+            else None
+        )
+
+    @classmethod
+    def desde_lista(cls, laberinto, limpiar_especiales=False):
+        # Las celdas 2 y 3 (entrada/salida) se vuelven suelo si se pide
+        filas, columnas = len(laberinto), len(laberinto[0])
+        celdas = bytearray(filas * columnas)
+        for y, fila in enumerate(laberinto):
+            for x, celda in enumerate(fila):
+                celdas[y * columnas + x] = 0 if limpiar_especiales and celda in (2, 3) else celda
+        return cls(filas, columnas, celdas)
+
+    @classmethod
+    def desde(cls, laberinto):
+        return laberinto if isinstance(laberinto, cls) else cls.desde_lista(laberinto)
+
+    def __len__(self):
+        return self.filas
+
+    def __getitem__(self, y):
+        # Compatibilidad con laberinto[y][x]: la fila es una vista sin copia
+        # del buffer, pero cada acceso crea una; en código nuevo, valor(x, y)
+        if not 0 <= y < self.filas:
+            raise IndexError(y)
+        return self._memoria[y * self.columnas:(y + 1) * self.columnas]
+
+    def __iter__(self):
+        for y in range(self.filas):
+            yield self[y]
+
+    def indice(self, x, y):
+        return y * self.columnas + x
+
+    def valor(self, x, y):
+        return self.celdas[y * self.columnas + x]
+
+    def es_transitable(self, x, y):
+        return (
+            0 <= x < self.columnas
+            and 0 <= y < self.filas
+            and self.celdas[y * self.columnas + x] != PARED
+        )
+
+    def mascara_libre(self):
+        """bytearray con 1 en cada celda transitable y 0 en las paredes."""
+        return bytearray(self.celdas.translate(_TABLA_LIBRE))
+
+    def celdas_libres(self):
+        columnas = self.columnas
+        return [
+            (indice % columnas, indice // columnas)
+            for indice, libre in enumerate(self.mascara_libre())
+            if libre
+        ]
+
+    def contar_vecinos(self):
+        """Cantidad de vecinos 4-conexos transitables de cada celda (fila por fila)."""
+        if np is not None:
+            libre = self.matriz != PARED
+            conteo = np.zeros((self.filas, self.columnas), dtype=np.uint8)
+            conteo[1:, :] += libre[:-1, :]
+            conteo[:-1, :] += libre[1:, :]
+            conteo[:, 1:] += libre[:, :-1]
+            conteo[:, :-1] += libre[:, 1:]
+            return bytearray(conteo.tobytes())
+        libre = self.mascara_libre()
+        filas, columnas = self.filas, self.columnas
+        conteo = bytearray(filas * columnas)
+        for indice in range(filas * columnas):
+            x, y = indice % columnas, indice // columnas
+            conteo[indice] = (
+                (y > 0 and libre[indice - columnas])
+                + (y < filas - 1 and libre[indice + columnas])
+                + (x > 0 and libre[indice - 1])
+                + (x < columnas - 1 and libre[indice + 1])
+            )
+        return conteo
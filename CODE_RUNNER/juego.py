@@ -1,364 +1,331 @@
 import pygame
-import json
+import logging
 import os
-import random
-from evento import (
-    EventoMoverJugador,
-    EventoSeleccionMenu,
-    EventoColisionEnemigo,
-    EventoRecogerEstrella,
-    EventoPowerUpAgarrado,
-    AdministradorDeEventos,
-)
+import time
+from evento import EventoSeleccionMenu
 from vista import Vista
 from menu import MenuPrincipal
 from salon_de_la_fama import SalonDeLaFama
-from pathfinding import bfs_siguiente_paso
-
-class Juego:
-    def __init__(self, ancho=900, alto=700, fps=50, ruta_niveles="niveles.json"):
+from perfilador import Perfilador, PERFILADOR_NULO
+from grabacion import Grabacion
+from persistencia import CargaPerezosa, escritor_por_defecto
+from motor import MotorJuego, ESTRATEGIAS_IA, TASA_LOGICA
+
+# Mensajes de diagnóstico (tiempo de arranque, grabaciones, trazas de
+# perfil): main.py los muestra con --verbose
+registro = logging.getLogger(__name__)
+
+TECLAS_DIRECCION = {
+    pygame.K_UP: "arriba",
+    pygame.K_DOWN: "abajo",
+    pygame.K_LEFT: "izquierda",
+    pygame.K_RIGHT: "derecha",
+}
+
+
+class Juego(MotorJuego):
+    """Frontend pygame: lee el teclado, avanza el motor y dibuja el estado."""
+
+    def __init__(self, ancho=900, alto=700, fps=50, ruta_niveles="niveles.json", recarga_en_caliente=False, tasa_logica=TASA_LOGICA, perfilar=False, ruta_perfil="perfil.csv", grabar=False, carpeta_grabaciones="grabaciones", ruta_base_datos=None, inicio_rapido=True, inicio_arranque=None, presupuesto_ia_us=2000, estrategia_ia="campo"):
+        if estrategia_ia not in ESTRATEGIAS_IA:
+            raise ValueError(f"estrategia_ia debe ser una de {ESTRATEGIAS_IA}, no {estrategia_ia!r}")
+        # El tiempo al primer cuadro se mide desde aquí o desde el arranque del proceso
+        self.inicio_arranque = time.perf_counter() if inicio_arranque is None else inicio_arranque
+        self.tiempo_primer_cuadro = None
         self.ANCHO, self.ALTO = ancho, alto
+        # FPS limita el dibujado; la simulación avanza a TASA_LOGICA ticks por segundo
         self.FPS = fps
-        self.DURACION_POTENCIADOR = 300
-        self.ruta_niveles = ruta_niveles
-        self.niveles = self._cargar_niveles()
-        self.nivel_actual = 0
-        if not self.niveles or len(self.niveles) == 0:
-            self.niveles = [self._crear_nivel_emergencia()]
-            self.sin_niveles_cargados = True
-        else:
-            self.sin_niveles_cargados = False
-        self.LABERINTO = self.niveles[0]["laberinto"]
-        self.LABERINTO = [
-            [0 if c in (2, 3) else c for c in fila] for fila in self.LABERINTO
-        ]
-        self.VELOCIDAD_ENEMIGOS = max(10, self.niveles[0].get("vel_enemigos", 14))
+        self.TASA_LOGICA = tasa_logica
+        self.MAX_PASOS_POR_CUADRO = 5
+        self.acumulador = 0.0
+        self.alfa = 1.0
+        self.posiciones_previas = None
+        # Vigila niveles.json una vez por segundo y aplica los niveles editados
+        self.recarga_en_caliente = recarga_en_caliente
+        self.cuadros_recarga = 0
         self.tamaño_celda = 32
-        self.posicion_x = 1
-        self.posicion_y = 1
-        self.estrellas = []
-        self.enemigos = []
-        self.potenciadores = []
-        self.vidas = 3
-        self.puntuacion = 0
-        self.contador_cuadros = 0
-        self.temporizador_potenciador = 0
-        self.potenciador_activo = None
-        self.puntuacion_final = 0
-        self.estado = "MENU"
-        self.mensaje_texto = ""
-        self.cuadros_mensaje = 0
-        self.RETRASO_PASO_JUGADOR = 7
-        self.temporizador_paso_jugador = 0
-        self.direcciones_presionadas = set()
-        pygame.init()
+        self.entradas = set()
+        # Sin perfilar se usa el perfilador nulo; F3 lo activa en caliente
+        self.perfilador = Perfilador() if perfilar else PERFILADOR_NULO
+        self.ruta_perfil = ruta_perfil
+        # Cada partida se guarda como .mrrp para reproducirla con grabacion.py
+        self.grabar = grabar
+        self.carpeta_grabaciones = carpeta_grabaciones
+        self.grabacion = None
+        if inicio_rapido:
+            # Solo lo que el juego usa: sin audio ni joystick
+            pygame.display.init()
+            pygame.font.init()
+        else:
+            pygame.init()
         self.reloj = pygame.time.Clock()
-        self.vista = Vista(
-            self.ANCHO, self.ALTO, f"Maze-Run - Nivel {self.nivel_actual + 1}"
-        )
-        self.administrador_eventos = AdministradorDeEventos()
+        self.vista = Vista(self.ANCHO, self.ALTO, "Maze-Run - Nivel 1")
+        self.vista.perfilador = self.perfilador
+        # Con ruta_base_datos el salón usa SQLite en vez de puntuaciones.json
+        if ruta_base_datos:
+            from almacen_sqlite import AlmacenSQLite
+
+            def crear_salon():
+                return SalonDeLaFama(almacen=AlmacenSQLite(ruta_base_datos))
+        else:
+            def crear_salon():
+                return SalonDeLaFama(diario=True)
+        # Inicio rápido: el salón se carga al usarlo y el primer nivel se
+        # prepara con el menú ya en pantalla
+        self._arranque_diferido = inicio_rapido
+        salon = CargaPerezosa(crear_salon) if inicio_rapido else crear_salon()
+        super().__init__(ruta_niveles=ruta_niveles, salon=salon)
+        self._arranque_diferido = False
+        # Tope de tiempo de IA por tick, no por cuadro: un cuadro que recupera
+        # atraso corre hasta MAX_PASOS_POR_CUADRO ticks y gasta otras tantas
+        # veces el tope. Al grabar se desactiva para que la partida no
+        # dependa de la velocidad de la máquina
+        self.PRESUPUESTO_IA_US = None if grabar else presupuesto_ia_us
+        # "astar" o "hpa" para laberintos muy grandes; la grabación la guarda
+        self.ESTRATEGIA_IA = estrategia_ia
+        self._tareas_diferidas = [self._preparar_nivel_inicial, salon.cargar] if inicio_rapido else []
+        self.estado = "MENU"
         self.menu = MenuPrincipal(self.vista, self.administrador_eventos)
-        self.salon = SalonDeLaFama()
-        self.usuario_actual = None
-        self._registrar_manejadores()
+        # El menú comparte el mismo índice de ranking en memoria
+        self.menu.salon = self.salon
+        ManejadorMenu(self, self.administrador_eventos)
         self._configurar_tablero()
-        self._reiniciar_juego()
-
-    def _crear_nivel_emergencia(self):
-        return {
-            "nombre": "Emergencia",
-            "laberinto": [
-                [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-                [1, 0, 1, 1, 1, 1, 1, 0, 0, 1],
-                [1, 0, 0, 0, 0, 0, 0, 0, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            ],
-            "vel_enemigos": 14,
-            "estrellas": 3,
-            "enemigos": 1,
-            "powerups": 0,
-            "entrada": [1, 1],
-            "salida": [1, 1],
-            "colores": {
-                "pared": [100, 100, 100],
-                "suelo": [200, 200, 200],
-                "enemigo": [220, 50, 50],
-            },
-        }
-
-    def _cargar_niveles(self):
-        try:
-            ruta_completa = os.path.join("CODE_RUNNER", self.ruta_niveles)
-            if not os.path.exists(ruta_completa):
-                ruta_completa = self.ruta_niveles
-            with open(ruta_completa, "r", encoding="utf-8") as archivo:
-                datos = json.load(archivo)
-            return (
-                datos["niveles"]
-                if "niveles" in datos and isinstance(datos["niveles"], list)
-                else []
-            )
-        except Exception as excepcion:
-            print(f"Error cargando niveles: {excepcion}")
-            return []
 
     def _recargar_niveles(self):
-        nuevos_niveles = self._cargar_niveles()
-        if nuevos_niveles:
-            self.niveles = nuevos_niveles
-            self.sin_niveles_cargados = False
-            self.nivel_actual = 0
-            self.LABERINTO = [
-                [0 if c in (2, 3) else c for c in fila]
-                for fila in self.niveles[0]["laberinto"]
-            ]
+        if super()._recargar_niveles():
             self._configurar_tablero()
-            self._reiniciar_juego()
-            self.vista.titulo = "Maze-Run - Nivel 1 (nuevos niveles cargados)"
-            self.mensaje_texto = f"¡{len(nuevos_niveles)} laberinto(s) cargado(s)!"
-            self.cuadros_mensaje = 180
-        else:
-            self.mensaje_texto = "No se encontraron laberintos válidos"
+            self.vista.titulo = f"Maze-Run - Nivel {self.nivel_actual + 1} (niveles recargados)"
+
+    def _comprobar_recarga(self):
+        self.cuadros_recarga += 1
+        if self.cuadros_recarga < self.FPS:
+            return
+        self.cuadros_recarga = 0
+        cambiados = self.recargar_en_caliente()
+        if cambiados:
+            # Con otros niveles la grabación ya no se podría reproducir
+            self._terminar_grabacion()
+            self._configurar_tablero()
+            self.mensaje_texto = f"¡{len(cambiados)} laberinto(s) actualizado(s)!"
             self.cuadros_mensaje = 120
 
+    def _aplicar_metadatos_nivel(self):
+        super()._aplicar_metadatos_nivel()
+        self._cargar_colores_nivel(self.niveles[self.nivel_actual])
+
     def _configurar_tablero(self):
-        filas, columnas = len(self.LABERINTO), len(self.LABERINTO[0])
+        filas, columnas = self.LABERINTO.filas, self.LABERINTO.columnas
         ancho_tablero = self.tamaño_celda * columnas
         alto_tablero = self.tamaño_celda * filas
-        self.vista.desplazamiento_x = (self.vista.ancho - ancho_tablero) // 2
-        self.vista.desplazamiento_y = (self.vista.alto - alto_tablero) // 2 + 20
-
-    def _generar_posiciones_validas(self, laberinto, cantidad, exclusiones):
-        posiciones = []
-        filas, columnas = len(laberinto), len(laberinto[0])
-        intentos = 0
-        while len(posiciones) < cantidad and intentos < 1000:
-            x, y = random.randint(0, columnas - 1), random.randint(0, filas - 1)
-            if (
-                laberinto[y][x] == 0
-                and [x, y] not in exclusiones
-                and [x, y] not in posiciones
-            ):
-                posiciones.append([x, y])
-            intentos += 1
-        return posiciones
-
-    def _obtener_celda_libre_jugador(self):
-        entrada = self.niveles[self.nivel_actual].get("entrada", [1, 1])
-        return (
-            tuple(entrada)
-            if isinstance(entrada, list) and len(entrada) == 2
-            else (1, 1)
+        if ancho_tablero <= self.vista.ancho and alto_tablero <= self.vista.alto - 40:
+            # Cabe entero: centrado como siempre
+            area = (0, 40, self.vista.ancho, self.vista.alto - 40)
+        else:
+            # Más grande que la ventana: la cámara sigue al jugador debajo del HUD
+            area = (0, 90, self.vista.ancho, self.vista.alto - 90)
+        self.vista.configurar_camara(ancho_tablero, alto_tablero, area)
+        self.vista.seguir(
+            (self.posicion_x + 0.5) * self.tamaño_celda, (self.posicion_y + 0.5) * self.tamaño_celda
         )
 
-    def _recolocar_enemigos_si_vacio(self, nivel_actual):
-        if not self.enemigos:
-            self.enemigos = self._generar_posiciones_validas(
-                self.LABERINTO,
-                max(1, nivel_actual.get("enemigos", 1)),
-                [[self.posicion_x, self.posicion_y]] + self.estrellas,
-            )
-
-    def _cambiar_a_fin_de_juego(self):
-        self.puntuacion_final = self.puntuacion
-        self.estado = "GAME_OVER"
-
-        # Registrar puntuación en el Salón de la Fama
-        if self.usuario_actual:
-            nombre_nivel = self.niveles[self.nivel_actual].get(
-                "nombre", f"Nivel {self.nivel_actual + 1}"
-            )
-            self.salon.registrar_puntuacion(
-                usuario=self.usuario_actual,
-                puntuacion=self.puntuacion_final,
-                nivel=self.nivel_actual + 1,
-                nombre_laberinto=nombre_nivel,
-            )
+    def _preparar_nivel_inicial(self):
+        # Índice de aparición del primer nivel (un BFS), listo antes de elegir JUEGO
+        if self.estado == "MENU":
+            self._indice_aparicion()
 
     def _reiniciar_juego(self):
-        if self.nivel_actual >= len(self.niveles):
-            self.nivel_actual = 0
-        nivel_actual = self.niveles[self.nivel_actual]
-        self.LABERINTO = [
-            [0 if c in (2, 3) else c for c in fila]
-            for fila in nivel_actual["laberinto"]
-        ]
-        self.posicion_x, self.posicion_y = self._obtener_celda_libre_jugador()
-        exclusiones = [self.posicion_x, self.posicion_y]
-        objetivo_estrellas = 3
-        self.estrellas = self._generar_posiciones_validas(
-            self.LABERINTO, objetivo_estrellas, exclusiones
-        )
-        self.enemigos = self._generar_posiciones_validas(
-            self.LABERINTO,
-            max(1, nivel_actual.get("enemigos", 1)),
-            exclusiones + self.estrellas,
-        )
-        self.potenciadores = self._generar_posiciones_validas(
-            self.LABERINTO,
-            nivel_actual.get("powerups", 1),
-            exclusiones + self.estrellas + self.enemigos,
-        )
-        self._recolocar_enemigos_si_vacio(nivel_actual)
-        self.desplazamiento_interfaz_x = 20
-        self.desplazamiento_interfaz_y = 48
-        self.vidas = 3
-        self.contador_cuadros = 0
-        self.potenciador_activo = None
-        self.temporizador_potenciador = 0
-        self.mensaje_texto = ""
-        self.cuadros_mensaje = 0
+        if self._arranque_diferido:
+            # Desde MotorJuego.__init__: el tablero se arma al empezar la partida
+            return
+        super()._reiniciar_juego()
+        self._cargar_colores_nivel(self.niveles[self.nivel_actual])
+        self.vista.invalidar_fondo()
+        # Cada nivel puede tener otro tamaño: se recoloca el tablero y la cámara
+        self._configurar_tablero()
+
+    def _cargar_colores_nivel(self, nivel):
+        colores = nivel.get("colores", {})
+        self.color_pared = tuple(colores.get("pared", (80, 80, 80)))
+        self.color_suelo = tuple(colores.get("suelo", (220, 230, 245)))
+        self.color_enemigo = tuple(colores.get("enemigo", (220, 50, 50)))
 
     def _avanzar_nivel(self):
-        if len(self.estrellas) > 0:
-            self.mensaje_texto = f"Faltan {len(self.estrellas)} estrella(s)"
-            self.cuadros_mensaje = 60
-            return
-        if self.nivel_actual < len(self.niveles) - 1:
-            self.nivel_actual += 1
-            self._reiniciar_juego()
+        nivel_previo = self.nivel_actual
+        super()._avanzar_nivel()
+        if self.nivel_actual != nivel_previo:
             self.vista.titulo = f"Maze-Run - Nivel {self.nivel_actual + 1}"
-        else:
-            self._cambiar_a_fin_de_juego()
 
-    def _registrar_manejadores(self):
-        self.controlador_enemigos = ControladorEnemigos(
-            self, self.administrador_eventos
+    def empezar_partida(self):
+        # Semilla nueva por partida: es lo único, junto a las entradas, que la grabación necesita
+        semilla = int.from_bytes(os.urandom(4), "little")
+        self.reiniciar(0, semilla)
+        if self.grabar:
+            self.grabacion = Grabacion.nueva(self, semilla, self.TASA_LOGICA)
+
+    def paso(self, entradas=()):
+        if self.grabacion is None or self.estado != "JUEGO":
+            return super().paso(entradas)
+        self.grabacion.registrar(entradas)
+        estado = super().paso(entradas)
+        self.grabacion.punto_control(self)
+        return estado
+
+    def _terminar_grabacion(self):
+        if self.grabacion is None:
+            return
+        grabacion, self.grabacion = self.grabacion, None
+        grabacion.terminar(self)
+        os.makedirs(self.carpeta_grabaciones, exist_ok=True)
+        ruta = os.path.join(
+            self.carpeta_grabaciones,
+            f"partida-{time.strftime('%Y%m%d-%H%M%S')}-{grabacion.semilla}.mrrp",
+        )
+        # Se escribe fuera del bucle de cuadros, igual que las puntuaciones
+        escritor_por_defecto().ejecutar(lambda: registro.info("Partida grabada en %s", grabacion.guardar(ruta)))
+
+    def _avanzar_simulacion(self, transcurrido):
+        duracion_tick = 1.0 / self.TASA_LOGICA
+        self.acumulador += transcurrido
+        pasos = 0
+        while self.acumulador >= duracion_tick and pasos < self.MAX_PASOS_POR_CUADRO:
+            self.posiciones_previas = ((self.posicion_x, self.posicion_y), list(self.enemigos))
+            self.paso(self.entradas)
+            self.acumulador -= duracion_tick
+            pasos += 1
+            if self.estado != "JUEGO":
+                self.acumulador = 0.0
+                break
+        if pasos == self.MAX_PASOS_POR_CUADRO:
+            # Tope de recuperación: se descarta el atraso en vez de acumularlo
+            self.acumulador = min(self.acumulador, duracion_tick)
+        self.alfa = min(1.0, self.acumulador / duracion_tick)
+
+    def _interpolar(self, previa, actual):
+        # Solo se interpola un paso de una celda; las reapariciones saltan directo
+        if previa is None or abs(previa[0] - actual[0]) + abs(previa[1] - actual[1]) != 1:
+            return actual[0] * self.tamaño_celda, actual[1] * self.tamaño_celda
+        return (
+            (previa[0] + (actual[0] - previa[0]) * self.alfa) * self.tamaño_celda,
+            (previa[1] + (actual[1] - previa[1]) * self.alfa) * self.tamaño_celda,
         )
-        ControladorJugador(self, self.administrador_eventos)
-        ManejadorPotenciadores(self, self.administrador_eventos)
-        ManejadorColisiones(self, self.administrador_eventos)
-        ManejadorEstrellas(self, self.administrador_eventos)
-        ManejadorMenu(self, self.administrador_eventos)
+
+    def _alternar_perfil(self):
+        if not self.perfilador.activo:
+            self.perfilador = Perfilador()
+            self.vista.perfilador = self.perfilador
+        self.vista.mostrar_perfil = not self.vista.mostrar_perfil
+
+    def _salir(self):
+        self._terminar_grabacion()
+        self.salon.cerrar()
+        # Nada pendiente en la cola de escritura se pierde al cerrar
+        escritor_por_defecto().flush()
+        if self.perfilador.activo and self.ruta_perfil:
+            registro.info("Traza de perfil escrita en %s", self.perfilador.exportar(self.ruta_perfil))
+        pygame.quit()
+        exit()
+
+    def _volver_al_menu(self):
+        # La grabación se cierra antes de cambiar el estado: su último punto
+        # de control tiene que coincidir con el del motor sin ventana
+        self._terminar_grabacion()
+        self.estado = "MENU"
+
+    def _manejar_evento(self, evento):
+        if evento.type == pygame.QUIT:
+            self._salir()
+        if evento.type == pygame.KEYDOWN and evento.key == pygame.K_F3:
+            self._alternar_perfil()
+            return
+        if self.estado == "MENU":
+            self.menu.manejar_eventos(evento)
+        elif self.estado == "JUEGO":
+            if evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    self._volver_al_menu()
+                elif evento.key in TECLAS_DIRECCION:
+                    self.entradas.add(TECLAS_DIRECCION[evento.key])
+            elif evento.type == pygame.KEYUP:
+                if evento.key in TECLAS_DIRECCION:
+                    self.entradas.discard(TECLAS_DIRECCION[evento.key])
+        elif self.estado == "GAME_OVER":
+            if evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    self.estado = "MENU"
+                elif (
+                    evento.key == pygame.K_RETURN
+                    and not self.sin_niveles_cargados
+                ):
+                    self.empezar_partida()
+        elif self.estado == "SALÓN_DE_LA_FAMA":
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE:
+                self.estado = "MENU"
 
     def ejecutar(self):
+        instante_previo = time.perf_counter()
         while True:
+            ahora = time.perf_counter()
+            transcurrido = min(ahora - instante_previo, 0.25)
+            instante_previo = ahora
+            if self.recarga_en_caliente:
+                self._comprobar_recarga()
+            inicio = self.perfilador.reloj()
             for evento in pygame.event.get():
-                if evento.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                if self.estado == "MENU":
-                    self.menu.manejar_eventos(evento)
-                elif self.estado == "JUEGO":
-                    if evento.type == pygame.KEYDOWN:
-                        if evento.key == pygame.K_ESCAPE:
-                            self.estado = "MENU"
-                        elif evento.key == pygame.K_UP:
-                            self.direcciones_presionadas.add("arriba")
-                            self.temporizador_paso_jugador = 0
-                        elif evento.key == pygame.K_DOWN:
-                            self.direcciones_presionadas.add("abajo")
-                            self.temporizador_paso_jugador = 0
-                        elif evento.key == pygame.K_LEFT:
-                            self.direcciones_presionadas.add("izquierda")
-                            self.temporizador_paso_jugador = 0
-                        elif evento.key == pygame.K_RIGHT:
-                            self.direcciones_presionadas.add("derecha")
-                            self.temporizador_paso_jugador = 0
-                    elif evento.type == pygame.KEYUP:
-                        if evento.key == pygame.K_UP:
-                            self.direcciones_presionadas.discard("arriba")
-                        elif evento.key == pygame.K_DOWN:
-                            self.direcciones_presionadas.discard("abajo")
-                        elif evento.key == pygame.K_LEFT:
-                            self.direcciones_presionadas.discard("izquierda")
-                        elif evento.key == pygame.K_RIGHT:
-                            self.direcciones_presionadas.discard("derecha")
-                elif self.estado == "GAME_OVER":
-                    if evento.type == pygame.KEYDOWN:
-                        if evento.key == pygame.K_ESCAPE:
-                            self.estado = "MENU"
-                        elif (
-                            evento.key == pygame.K_RETURN
-                            and not self.sin_niveles_cargados
-                        ):
-                            self.nivel_actual = 0
-                            self._reiniciar_juego()
-                            self.estado = "JUEGO"
-                elif self.estado == "SALÓN_DE_LA_FAMA":
-                    if evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE:
-                        self.estado = "MENU"
+                self._manejar_evento(evento)
+            self.perfilador.registrar("eventos", inicio)
             # SOLO actualizar y dibujar si el estado es JUEGO
             if self.estado == "JUEGO":
-                if self.direcciones_presionadas:
-                    self.temporizador_paso_jugador -= 1
-                    if self.temporizador_paso_jugador <= 0:
-                        if "arriba" in self.direcciones_presionadas:
-                            self.administrador_eventos.publicar(
-                                EventoMoverJugador("arriba")
-                            )
-                        elif "abajo" in self.direcciones_presionadas:
-                            self.administrador_eventos.publicar(
-                                EventoMoverJugador("abajo")
-                            )
-                        elif "izquierda" in self.direcciones_presionadas:
-                            self.administrador_eventos.publicar(
-                                EventoMoverJugador("izquierda")
-                            )
-                        elif "derecha" in self.direcciones_presionadas:
-                            self.administrador_eventos.publicar(
-                                EventoMoverJugador("derecha")
-                            )
-                        self.temporizador_paso_jugador = self.RETRASO_PASO_JUGADOR
-                if (
-                    self.vidas > 0
-                    and (self.posicion_x, self.posicion_y) in self.estrellas
-                ):
-                    self.administrador_eventos.publicar(
-                        EventoRecogerEstrella((self.posicion_x, self.posicion_y))
-                    )
-                if (
-                    self.vidas > 0
-                    and (self.posicion_x, self.posicion_y) in self.potenciadores
-                ):
-                    self.potenciadores.remove((self.posicion_x, self.posicion_y))
-                    self.administrador_eventos.publicar(
-                        EventoPowerUpAgarrado(
-                            random.choice(["invulnerable", "congelar", "invisible"])
-                        )
-                    )
-                if self.cuadros_mensaje > 0:
-                    self.cuadros_mensaje -= 1
-                self.controlador_enemigos.actualizar()
-                self.vista.limpiar_pantalla((0, 0, 0))
-                nivel_actual = self.niveles[self.nivel_actual]
-                color_pared = tuple(
-                    nivel_actual.get("colores", {}).get("pared", (80, 80, 80))
-                )
-                color_suelo = tuple(
-                    nivel_actual.get("colores", {}).get("suelo", (220, 230, 245))
+                inicio = self.perfilador.reloj()
+                self._avanzar_simulacion(transcurrido)
+                self.perfilador.registrar("logica", inicio)
+            else:
+                self.acumulador = 0.0
+                self.posiciones_previas = None
+            if self.grabacion is not None and self.estado != "JUEGO":
+                self._terminar_grabacion()
+            if self.estado == "JUEGO":
+                jugador_previo, enemigos_previos = self.posiciones_previas or (None, [])
+                jugador_x, jugador_y = self._interpolar(
+                    jugador_previo, (self.posicion_x, self.posicion_y)
                 )
-                color_enemigo = tuple(
-                    nivel_actual.get("colores", {}).get("enemigo", (220, 50, 50))
+                self.vista.seguir(
+                    jugador_x + self.tamaño_celda // 2, jugador_y + self.tamaño_celda // 2
                 )
+                self.vista.limpiar_pantalla((0, 0, 0))
                 self.vista.dibujar_laberinto(
-                    self.LABERINTO, self.tamaño_celda, color_pared, color_suelo
+                    self.LABERINTO, self.tamaño_celda, self.color_pared, self.color_suelo
                 )
-                for enemigo_x, enemigo_y in self.enemigos:
+                inicio = self.perfilador.reloj()
+                # Solo las entidades dentro de la cámara: el costo no crece con
+                # las que hay en el resto de un laberinto grande
+                x0, y0, x1, y1 = self.vista.celdas_visibles(self.tamaño_celda)
+                if len(enemigos_previos) != len(self.enemigos):
+                    enemigos_previos = [None] * len(self.enemigos)
+                for previa, enemigo in zip(enemigos_previos, self.enemigos):
+                    if not (x0 <= enemigo[0] < x1 and y0 <= enemigo[1] < y1):
+                        continue
+                    enemigo_x, enemigo_y = self._interpolar(previa, enemigo)
                     self.vista.dibujar_enemigo(
-                        enemigo_x * self.tamaño_celda,
-                        enemigo_y * self.tamaño_celda,
+                        enemigo_x,
+                        enemigo_y,
                         self.tamaño_celda,
-                        color=color_enemigo,
+                        color=self.color_enemigo,
                     )
-                for estrella_x, estrella_y in self.estrellas:
+                for estrella_x, estrella_y in self.estrellas.en_rectangulo(x0, y0, x1, y1):
                     self.vista.dibujar_estrella(
                         estrella_x * self.tamaño_celda,
                         estrella_y * self.tamaño_celda,
                         self.tamaño_celda,
                     )
-                for potenciador_x, potenciador_y in self.potenciadores:
+                for potenciador_x, potenciador_y in self.potenciadores.en_rectangulo(x0, y0, x1, y1):
                     self.vista.dibujar_potenciador(
                         potenciador_x * self.tamaño_celda,
                         potenciador_y * self.tamaño_celda,
                         self.tamaño_celda,
                     )
-                self.vista.dibujar_jugador(
-                    self.posicion_x * self.tamaño_celda,
-                    self.posicion_y * self.tamaño_celda,
-                    self.tamaño_celda,
-                )
+                self.vista.dibujar_jugador(jugador_x, jugador_y, self.tamaño_celda)
+                self.vista.terminar_tablero()
+                self.perfilador.registrar("entidades", inicio)
                 self.vista.dibujar_texto(
                     f"Estrellas restantes: {len(self.estrellas)}", 20, 20, 24, (255, 255, 0)
                 )
@@ -367,6 +334,7 @@ class Juego:
                 )
                 if self.mensaje_texto and self.cuadros_mensaje > 0:
                     self.vista.dibujar_texto(self.mensaje_texto, 120, 60, 32, (255, 64, 64))
+                self.vista.dibujar_perfil(len(self.enemigos), self.controlador_enemigos.planificador)
                 self.vista.actualizar()
             elif self.estado == "MENU":
                 self.vista.limpiar_pantalla((0, 0, 0))
@@ -391,150 +359,26 @@ class Juego:
                 self.vista.dibujar_texto(
                     "Salón de la Fama", 150, 200, 48, (255, 255, 0)
                 )
-                puntuaciones = self._cargar_json("puntuaciones.json", {})
                 y_posicion = 270
-                if isinstance(puntuaciones, dict):
-                    for usuario, scores in list(puntuaciones.items())[:10]:
-                        if scores and isinstance(scores, list):
-                            mejor_score = max(
-                                [
-                                    s.get("puntuacion", 0)
-                                    for s in scores
-                                    if isinstance(s, dict)
-                                ],
-                                default=0,
-                            )
-                            self.vista.dibujar_texto(
-                                f"{usuario}: {mejor_score}",
-                                120,
-                                y_posicion,
-                                24,
-                                (255, 255, 255),
-                            )
-                            y_posicion += 30
+                for fila in self.salon.obtener_ranking_global(10):
+                    self.vista.dibujar_texto(
+                        f"{fila['usuario']}: {fila['puntuacion']}",
+                        120,
+                        y_posicion,
+                        24,
+                        (255, 255, 255),
+                    )
+                    y_posicion += 30
                 self.vista.dibujar_texto("ESC: Volver", 120, 550, 32, (200, 200, 200))
                 self.vista.actualizar()
+            if self.tiempo_primer_cuadro is None:
+                self.tiempo_primer_cuadro = time.perf_counter() - self.inicio_arranque
+                registro.info("Primer cuadro a los %.0f ms del arranque", self.tiempo_primer_cuadro * 1000)
+            elif self._tareas_diferidas and self.estado == "MENU":
+                # Una tarea diferida por cuadro mientras se muestra el menú
+                self._tareas_diferidas.pop(0)()
             self.reloj.tick(self.FPS)
-
-    def _cargar_json(self, ruta, por_defecto=None):
-        if not os.path.exists(ruta):
-            return por_defecto if por_defecto is not None else {}
-        try:
-            with open(ruta, "r", encoding="utf-8") as archivo:
-                texto = archivo.read().strip()
-                return (
-                    json.loads(texto)
-                    if texto
-                    else (por_defecto if por_defecto is not None else {})
-                )
-        except json.JSONDecodeError:
-            return por_defecto if por_defecto is not None else {}
-
-
-class ControladorJugador:
-    def __init__(self, juego, administrador):
-        self.juego = juego
-        administrador.registrar(EventoMoverJugador, self)
-
-    def notificar(self, evento):
-        j = self.juego
-        nueva_x, nueva_y = j.posicion_x, j.posicion_y
-        if evento.direccion == "arriba":
-            nueva_y -= 1
-        elif evento.direccion == "abajo":
-            nueva_y += 1
-        elif evento.direccion == "izquierda":
-            nueva_x -= 1
-        elif evento.direccion == "derecha":
-            nueva_x += 1
-        if (
-            0 <= nueva_x < len(j.LABERINTO[0])
-            and 0 <= nueva_y < len(j.LABERINTO)
-            and j.LABERINTO[nueva_y][nueva_x] == 0
-        ):
-            j.posicion_x, j.posicion_y = nueva_x, nueva_y
-            # Verificar colisión inmediata después del movimiento
-            for enemigo in j.enemigos:
-                if (nueva_x, nueva_y) == tuple(enemigo):
-                    j.administrador_eventos.publicar(
-                        EventoColisionEnemigo((j.posicion_x, j.posicion_y), tuple(enemigo))
-                    )
-                    break
-
-
-class ControladorEnemigos:
-    def __init__(self, juego, administrador):
-        self.juego = juego
-        self.administrador = administrador
-        administrador.registrar(EventoMoverJugador, self)
-
-    def notificar(self, evento):
-        pass
-
-    def actualizar(self):
-        j = self.juego
-        if j.potenciador_activo == "congelar":
-            return
-        j.contador_cuadros += 1
-        if j.contador_cuadros < j.VELOCIDAD_ENEMIGOS:
-            return
-        j.contador_cuadros = 0
-        for i in range(len(j.enemigos)):
-            enemigo_x, enemigo_y = j.enemigos[i]
-            siguiente = bfs_siguiente_paso(
-                j.LABERINTO, (enemigo_x, enemigo_y), (j.posicion_x, j.posicion_y)
-            )
-            if siguiente:
-                j.enemigos[i] = siguiente
-                # Verificar colisión después de que el enemigo se mueva
-                if tuple(siguiente) == (j.posicion_x, j.posicion_y):
-                    j.administrador_eventos.publicar(
-                        EventoColisionEnemigo((j.posicion_x, j.posicion_y), tuple(siguiente))
-                    )
-
-
-class ManejadorPotenciadores:
-    def __init__(self, juego, administrador):
-        self.juego = juego
-        administrador.registrar(EventoPowerUpAgarrado, self)
-
-    def notificar(self, evento):
-        j = self.juego
-        j.potenciador_activo = evento.tipo
-        j.temporizador_potenciador = j.DURACION_POTENCIADOR
-
-
-class ManejadorColisiones:
-    def __init__(self, juego, administrador):
-        self.juego = juego
-        administrador.registrar(EventoColisionEnemigo, self)
-
-    def notificar(self, evento):
-        j = self.juego
-        if j.potenciador_activo == "invulnerable":
-            return
-        # Solo procesar si realmente hay colisión
-        if evento.posicion_jugador == evento.posicion_enemigo:
-            j.vidas -= 1
-            if j.vidas > 0:
-                j.posicion_x, j.posicion_y = j._obtener_celda_libre_jugador()
-                j._recolocar_enemigos_si_vacio(j.niveles[j.nivel_actual])
-            else:
-                j._cambiar_a_fin_de_juego()
-
-
-class ManejadorEstrellas:
-    def __init__(self, juego, administrador):
-        self.juego = juego
-        administrador.registrar(EventoRecogerEstrella, self)
-
-    def notificar(self, evento):
-        j = self.juego
-        if evento.posicion in j.estrellas:
-            j.estrellas.remove(evento.posicion)
-            j.puntuacion += 10
-            if not j.estrellas:
-                j._avanzar_nivel()
+            self.perfilador.cerrar_cuadro()
 
 
 class ManejadorMenu:
@@ -551,15 +395,12 @@ class ManejadorMenu:
                     j.usuario_actual = j.menu.usuarios[
                         0
                     ].upper()  # Usar el primer usuario
-                j.nivel_actual = 0
-                j._reiniciar_juego()
-                j.estado = "JUEGO"
+                j.empezar_partida()
             else:
                 j.mensaje_texto = "Debe cargar laberintos desde Administración primero"
                 j.cuadros_mensaje = 120
         elif evento.opcion == "SALIR":
-            pygame.quit()
-            exit()
+            j._salir()
         elif evento.opcion == "ADMINISTRACION":
             j._recargar_niveles()
             j.estado = "MENU"
@@ -0,0 +1,71 @@
+from bisect import bisect_left, insort
+from itertools import chain, islice
+
+
+class ListaOrdenada:
+    """
+    Lista ordenada partida en tramos de a lo sumo 2 * CARGA elementos, con
+    el máximo de cada tramo aparte. agregar() y quitar() eligen el tramo
+    con una búsqueda binaria sobre los máximos (O(log n)) y solo desplazan
+    los elementos de ese tramo, no los de toda la lista como insort/del.
+    """
+
+    CARGA = 512
+
+    def __init__(self, elementos=()):
+        ordenados = sorted(elementos)
+        carga = self.CARGA
+        self._tramos = [ordenados[i:i + carga] for i in range(0, len(ordenados), carga)]
+        self._maximos = [tramo[-1] for tramo in self._tramos]
+        self._largo = len(ordenados)
+
+    def __len__(self):
+        return self._largo
+
+    def __iter__(self):
+        return chain.from_iterable(self._tramos)
+
+    def __repr__(self):
+        return f"ListaOrdenada({list(self)})"
+
+    def primeros(self, cantidad):
+        return list(islice(self, cantidad))
+
+    def agregar(self, elemento):
+        tramos, maximos = self._tramos, self._maximos
+        self._largo += 1
+        if not tramos:
+            tramos.append([elemento])
+            maximos.append(elemento)
+            return
+        i = bisect_left(maximos, elemento)
+        if i == len(tramos):
+            # Mayor que todos: va al final del último tramo
+            i -= 1
+        tramo = tramos[i]
+        insort(tramo, elemento)
+        maximos[i] = tramo[-1]
+        if len(tramo) > 2 * self.CARGA:
+            # Se parte en dos; pasa una vez cada CARGA inserciones en el tramo
+            mitad = tramo[self.CARGA:]
+            del tramo[self.CARGA:]
+            tramos.insert(i + 1, mitad)
+            maximos[i] = tramo[-1]
+            maximos.insert(i + 1, mitad[-1])
+
+    def quitar(self, elemento):
+        tramos, maximos = self._tramos, self._maximos
+        i = bisect_left(maximos, elemento)
+        if i < len(tramos):
+            tramo = tramos[i]
+            j = bisect_left(tramo, elemento)
+            if j < len(tramo) and tramo[j] == elemento:
+                del tramo[j]
+                self._largo -= 1
+                if tramo:
+                    maximos[i] = tramo[-1]
+                else:
+                    del tramos[i]
+                    del maximos[i]
+                return
+        raise ValueError(f"{elemento!r} no está en la lista")
@@ -1,10 +1,21 @@
 import json
 import os
+from persistencia import escritor_por_defecto
 
 class ListaUsuarios:
-    def __init__(self, archivo="usuarios.json"):
+    def __init__(self, archivo="usuarios.json", escritor=None, almacen=None):
         self.archivo = archivo
-        self.usuarios = self._cargar_usuarios()
+        self.escritor = escritor or escritor_por_defecto()
+        # Con un AlmacenSQLite la lista vive en la base (búsquedas por índice)
+        self.almacen = almacen
+        # El archivo se lee en el primer uso, no al crear la lista
+        self._usuarios = None
+    
+    @property
+    def usuarios(self):
+        if self._usuarios is None and self.almacen is None:
+            self._usuarios = self._cargar_usuarios()
+        return self._usuarios
     
     def _cargar_usuarios(self):
         if os.path.exists(self.archivo):
@@ -16,11 +27,13 @@ class ListaUsuarios:
         return []
     
     def _guardar_usuarios(self):
-        with open(self.archivo, 'w') as f:
-            json.dump(self.usuarios, f, indent=4)
+        # Copia de la lista: el escritor la vuelca en su hilo
+        self.escritor.guardar(self.archivo, list(self.usuarios), indent=4)
     
     def crear_usuario(self, nombre):
         nombre = nombre.upper()
+        if self.almacen is not None:
+            return self.almacen.crear_usuario(nombre)
         if nombre not in self.usuarios:
             self.usuarios.append(nombre)
             self._guardar_usuarios()
@@ -29,19 +42,29 @@ class ListaUsuarios:
     
     def eliminar_usuario(self, nombre):
         nombre = nombre.upper()
+        if self.almacen is not None:
+            return self.almacen.eliminar_usuario(nombre)
         if nombre in self.usuarios:
             self.usuarios.remove(nombre)
             self._guardar_usuarios()
             return True
         return False
     
+    def listar(self):
+        if self.almacen is not None:
+            return self.almacen.usuarios_registrados()
+        return list(self.usuarios)
+    
     def listar_todos(self):
-        if not self.usuarios:
+        usuarios = self.listar()
+        if not usuarios:
             print("No hay usuarios registrados.")
         else:
             print("\n=== USUARIOS REGISTRADOS ===")
-            for i, usuario in enumerate(self.usuarios, 1):
+            for i, usuario in enumerate(usuarios, 1):
                 print(f"{i}. {usuario}")
     
     def usuario_existe(self, nombre):
+        if self.almacen is not None:
+            return self.almacen.usuario_registrado(nombre.upper())
         return nombre.upper() in self.usuarios
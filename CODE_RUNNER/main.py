@@ -1,4 +1,22 @@
+import time
+
+# Antes de importar pygame: el tiempo al primer cuadro cuenta desde aquí
+INICIO = time.perf_counter()
+
+import argparse
+import logging
+
 from juego import Juego
 
 if __name__ == "__main__":
-    Juego().ejecutar()
+    parser = argparse.ArgumentParser(description="Laberinto con estrellas y enemigos")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="muestra los diagnósticos: tiempo de arranque, grabaciones y trazas de perfil",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(message)s",
+    )
+    Juego(inicio_arranque=INICIO).ejecutar()
@@ -0,0 +1,627 @@
+import hashlib
+import json
+import os
+import random
+from evento import (
+    EventoMoverJugador,
+    EventoColisionEnemigo,
+    EventoRecogerEstrella,
+    EventoPowerUpAgarrado,
+    AdministradorDeEventos,
+)
+from pathfinding import CampoDistancias, CacheCaminos
+from planificador_ia import PlanificadorIA
+from grilla import Grilla
+from aparicion import IndiceAparicion
+from ocupacion import MapaOcupacion
+from perfilador import PERFILADOR_NULO
+from paquete_niveles import PaqueteNiveles, abrir_si_vigente, huella_nivel, validar_nivel
+
+# Ticks lógicos por segundo del juego; los tiempos en ticks se traducen con ella
+TASA_LOGICA = 50
+# Prioridad al pulsar varias direcciones a la vez
+DIRECCIONES = ("arriba", "abajo", "izquierda", "derecha")
+TIPOS_POTENCIADOR = ["invulnerable", "congelar", "invisible"]
+# IA de enemigos: "campo" (mapa de distancias compartido), "astar" o "hpa"
+# (camino propio por enemigo, para laberintos muy grandes)
+ESTRATEGIAS_IA = ("campo", "astar", "hpa")
+# Los eventos de movimiento no cambian: uno por dirección, reutilizado en cada paso
+EVENTOS_MOVER = {direccion: EventoMoverJugador(direccion) for direccion in DIRECCIONES}
+
+
+def misma_geometria(nivel_a, nivel_b):
+    return (
+        nivel_a["laberinto"] == nivel_b["laberinto"]
+        and nivel_a.get("entrada") == nivel_b.get("entrada")
+    )
+
+
+class MotorJuego:
+    """
+    Estado y reglas del juego sin pygame: sin ventana, sin reloj y sin
+    dibujado. Cada llamada a paso() avanza un tick lógico con las
+    direcciones pulsadas y devuelve el estado resultante.
+    """
+
+    # Se reemplaza por un Perfilador para medir la IA de enemigos en cada tick
+    perfilador = PERFILADOR_NULO
+
+    def __init__(self, niveles=None, ruta_niveles="niveles.json", semilla=None, salon=None):
+        self.DURACION_POTENCIADOR = 300
+        self.RETRASO_PASO_JUGADOR = 7
+        self.DISTANCIA_MINIMA_ENEMIGOS = 4
+        # Una de ESTRATEGIAS_IA
+        self.ESTRATEGIA_IA = "campo"
+        # Microsegundos de IA por tick (None: sin tope, resultado determinista)
+        self.PRESUPUESTO_IA_US = None
+        self.ruta_niveles = ruta_niveles
+        self.rng = random.Random(semilla)
+        self.indices_aparicion = {}
+        self._firma_niveles = None
+        self._hash_archivo_niveles = None
+        self._huellas_niveles = None
+        # Índice en el JSON de cada nivel cargado (None: coinciden)
+        self._origen_niveles = None
+        self.niveles = niveles if niveles is not None else self._cargar_niveles()
+        self.nivel_actual = 0
+        if not self.niveles or len(self.niveles) == 0:
+            self.niveles = [self._crear_nivel_emergencia()]
+            self._origen_niveles = None
+            self.sin_niveles_cargados = True
+        else:
+            self.sin_niveles_cargados = False
+        self.LABERINTO = self._construir_laberinto(self.niveles[0])
+        self.ocupacion = MapaOcupacion(self.LABERINTO.columnas, self.LABERINTO.filas)
+        self.VELOCIDAD_ENEMIGOS = max(10, self.niveles[0].get("vel_enemigos", 14))
+        self.posicion_x = 1
+        self.posicion_y = 1
+        self.estrellas = []
+        self.enemigos = []
+        self.potenciadores = []
+        self.vidas = 3
+        self.puntuacion = 0
+        self.temporizador_potenciador = 0
+        self.potenciador_activo = None
+        self.puntuacion_final = 0
+        self.estado = "JUEGO"
+        self.mensaje_texto = ""
+        self.cuadros_mensaje = 0
+        self.temporizador_paso_jugador = 0
+        self.direcciones_presionadas = set()
+        self.ticks = 0
+        self.salon = salon
+        self.usuario_actual = None
+        self.administrador_eventos = AdministradorDeEventos()
+        self._registrar_manejadores()
+        self._reiniciar_juego()
+
+    # Las entidades viven en el mapa de ocupación del nivel; asignar una lista
+    # de posiciones reemplaza su contenido
+    @property
+    def estrellas(self):
+        return self.ocupacion.estrellas
+
+    @estrellas.setter
+    def estrellas(self, posiciones):
+        self.ocupacion.estrellas.reemplazar(posiciones)
+
+    @property
+    def potenciadores(self):
+        return self.ocupacion.potenciadores
+
+    @potenciadores.setter
+    def potenciadores(self, posiciones):
+        self.ocupacion.potenciadores.reemplazar(posiciones)
+
+    @property
+    def enemigos(self):
+        return self.ocupacion.enemigos
+
+    @enemigos.setter
+    def enemigos(self, posiciones):
+        self.ocupacion.enemigos.reemplazar(posiciones)
+
+    def _crear_nivel_emergencia(self):
+        return {
+            "nombre": "Emergencia",
+            "laberinto": [
+                [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+                [1, 0, 1, 1, 1, 1, 1, 0, 0, 1],
+                [1, 0, 0, 0, 0, 0, 0, 0, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+            ],
+            "vel_enemigos": 14,
+            "estrellas": 3,
+            "enemigos": 1,
+            "powerups": 0,
+            "entrada": [1, 1],
+            "salida": [1, 1],
+            "colores": {
+                "pared": [100, 100, 100],
+                "suelo": [200, 200, 200],
+                "enemigo": [220, 50, 50],
+            },
+        }
+
+    def _ruta_niveles_completa(self):
+        ruta_completa = os.path.join("CODE_RUNNER", self.ruta_niveles)
+        if not os.path.exists(ruta_completa):
+            ruta_completa = self.ruta_niveles
+        return ruta_completa
+
+    def _firmar_archivo(self, ruta):
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def _cargar_niveles(self):
+        try:
+            ruta_completa = self._ruta_niveles_completa()
+            self._firma_niveles = self._firmar_archivo(ruta_completa)
+            self._huellas_niveles = None
+            self._origen_niveles = None
+            # Paquete binario compilado: los niveles se decodifican al pedirlos
+            if ruta_completa.endswith(".mrlp"):
+                return PaqueteNiveles(ruta_completa)
+            paquete = abrir_si_vigente(ruta_completa)
+            if paquete is not None:
+                return paquete
+            with open(ruta_completa, "rb") as archivo:
+                contenido = archivo.read()
+            self._hash_archivo_niveles = hashlib.sha1(contenido).hexdigest()
+            datos = json.loads(contenido.decode("utf-8"))
+            if "niveles" not in datos or not isinstance(datos["niveles"], list):
+                return []
+            # La misma validación que la recarga en caliente: un nivel roto se
+            # omite al cargar en vez de fallar a mitad de partida. Los de un
+            # paquete ya se validaron al compilarlo
+            niveles, origen = [], []
+            for indice, nivel in enumerate(datos["niveles"]):
+                error = validar_nivel(nivel)
+                if error is None:
+                    niveles.append(nivel)
+                    origen.append(indice)
+                else:
+                    print(f"Nivel {indice + 1} inválido, se omite: {error}")
+            self._origen_niveles = origen
+            return niveles
+        except Exception as excepcion:
+            print(f"Error cargando niveles: {excepcion}")
+            return []
+
+    def _recargar_niveles(self):
+        if not self.sin_niveles_cargados:
+            # Con niveles ya cargados solo se aplican los que cambiaron
+            cambiados = self.recargar_en_caliente()
+            if cambiados:
+                self.mensaje_texto = f"¡{len(cambiados)} laberinto(s) actualizado(s)!"
+            else:
+                self.mensaje_texto = "Los laberintos no cambiaron"
+            self.cuadros_mensaje = 180
+            return True
+        nuevos_niveles = self._cargar_niveles()
+        if nuevos_niveles:
+            self.niveles = nuevos_niveles
+            self.indices_aparicion = {}
+            self.sin_niveles_cargados = False
+            self.nivel_actual = 0
+            self.LABERINTO = self._construir_laberinto(self.niveles[0])
+            self._reiniciar_juego()
+            self.mensaje_texto = f"¡{len(nuevos_niveles)} laberinto(s) cargado(s)!"
+            self.cuadros_mensaje = 180
+            return True
+        self.mensaje_texto = "No se encontraron laberintos válidos"
+        self.cuadros_mensaje = 120
+        return False
+
+    def recargar_en_caliente(self):
+        """
+        Relee niveles.json si cambió su mtime y su hash, revalida solo los
+        niveles cuya huella cambió y los aplica sin cortar la partida.
+        Devuelve los índices de los niveles actualizados.
+        """
+        ruta = self._ruta_niveles_completa()
+        if ruta.endswith(".mrlp"):
+            return []
+        firma = self._firmar_archivo(ruta)
+        if firma is None or firma == self._firma_niveles:
+            return []
+        self._firma_niveles = firma
+        try:
+            with open(ruta, "rb") as archivo:
+                contenido = archivo.read()
+            hash_archivo = hashlib.sha1(contenido).hexdigest()
+            if hash_archivo == self._hash_archivo_niveles:
+                return []
+            nuevos = json.loads(contenido.decode("utf-8"))["niveles"]
+            if not isinstance(nuevos, list):
+                raise ValueError("'niveles' no es una lista")
+        except (OSError, ValueError, KeyError, TypeError) as excepcion:
+            print(f"Error recargando niveles: {excepcion}")
+            return []
+        self._hash_archivo_niveles = hash_archivo
+        # Con un paquete las huellas salen de su índice y solo se decodifican
+        # los niveles antiguos que hagan falta; uno sin cambios se toma del
+        # JSON recién leído, que es idéntico
+        huellas_antiguas = self.huellas_niveles()
+        antiguos = self.niveles
+        # Cada nivel nuevo se compara con el que vino del mismo índice del
+        # JSON: los omitidos por inválidos no corren a los que les siguen
+        origen_antiguo = self._origen_niveles
+        posicion_antigua = (
+            None if origen_antiguo is None
+            else {origen: posicion for posicion, origen in enumerate(origen_antiguo)}
+        )
+        niveles, huellas, origen = [], [], []
+        for indice, nivel in enumerate(nuevos):
+            if posicion_antigua is None:
+                anterior = indice if indice < len(antiguos) else None
+            else:
+                anterior = posicion_antigua.get(indice)
+            huella = huella_nivel(nivel)
+            if anterior is None or huella != huellas_antiguas[anterior]:
+                error = validar_nivel(nivel)
+                if error is not None:
+                    if anterior is None:
+                        print(f"Nivel {indice + 1} inválido, se omite: {error}")
+                        continue
+                    print(f"Nivel {indice + 1} inválido, se conserva el anterior: {error}")
+                    nivel, huella = antiguos[anterior], huellas_antiguas[anterior]
+            niveles.append(nivel)
+            huellas.append(huella)
+            origen.append(indice)
+        # Cambió todo nivel que ocupa una posición con otro contenido
+        cambiados = [
+            posicion for posicion, huella in enumerate(huellas)
+            if posicion >= len(huellas_antiguas) or huella != huellas_antiguas[posicion]
+        ]
+        if not niveles:
+            return []
+        self.niveles = niveles
+        self._huellas_niveles = huellas
+        self._origen_niveles = origen
+        self.sin_niveles_cargados = False
+        for indice in list(self.indices_aparicion):
+            if indice in cambiados or indice >= len(niveles):
+                del self.indices_aparicion[indice]
+        if self.nivel_actual >= len(niveles):
+            self.nivel_actual = 0
+            self._reiniciar_juego()
+        elif self.nivel_actual in cambiados:
+            anterior = (
+                antiguos[self.nivel_actual] if self.nivel_actual < len(antiguos) else None
+            )
+            if anterior is not None and misma_geometria(anterior, niveles[self.nivel_actual]):
+                self._aplicar_metadatos_nivel()
+            else:
+                self._reiniciar_juego()
+        return cambiados
+
+    def huellas_niveles(self):
+        """Huella de cada nivel cargado; se calcula una vez por carga."""
+        if isinstance(self.niveles, PaqueteNiveles):
+            return self.niveles.huellas()
+        if self._huellas_niveles is None or len(self._huellas_niveles) != len(self.niveles):
+            self._huellas_niveles = [huella_nivel(nivel) for nivel in self.niveles]
+        return self._huellas_niveles
+
+    def _aplicar_metadatos_nivel(self):
+        # Cambios del nivel actual que no tocan la geometría: la partida sigue
+        nivel_actual = self.niveles[self.nivel_actual]
+        self.VELOCIDAD_ENEMIGOS = max(10, nivel_actual.get("vel_enemigos", 14))
+
+    def _construir_laberinto(self, nivel):
+        return Grilla.desde_lista(nivel["laberinto"], limpiar_especiales=True)
+
+    def _indice_aparicion(self):
+        indice = self.indices_aparicion.get(self.nivel_actual)
+        if indice is None:
+            indice = IndiceAparicion(self.LABERINTO, self._obtener_celda_libre_jugador())
+            self.indices_aparicion[self.nivel_actual] = indice
+        return indice
+
+    def _generar_posiciones_validas(self, cantidad, exclusiones, distancia_minima=0):
+        return self._indice_aparicion().muestrear(
+            self.rng, cantidad, exclusiones, distancia_minima
+        )
+
+    def _obtener_celda_libre_jugador(self):
+        entrada = self.niveles[self.nivel_actual].get("entrada", [1, 1])
+        return (
+            tuple(entrada)
+            if isinstance(entrada, list) and len(entrada) == 2
+            else (1, 1)
+        )
+
+    def _recolocar_enemigos_si_vacio(self, nivel_actual):
+        if not self.enemigos:
+            self.enemigos = self._generar_posiciones_validas(
+                max(1, nivel_actual.get("enemigos", 1)),
+                [(self.posicion_x, self.posicion_y), *self.estrellas],
+                self.DISTANCIA_MINIMA_ENEMIGOS,
+            )
+
+    def _cambiar_a_fin_de_juego(self):
+        self.puntuacion_final = self.puntuacion
+        self.estado = "GAME_OVER"
+
+        # Registrar puntuación en el Salón de la Fama
+        if self.usuario_actual and self.salon is not None:
+            nombre_nivel = self.niveles[self.nivel_actual].get(
+                "nombre", f"Nivel {self.nivel_actual + 1}"
+            )
+            self.salon.registrar_puntuacion(
+                usuario=self.usuario_actual,
+                puntuacion=self.puntuacion_final,
+                nivel=self.nivel_actual + 1,
+                nombre_laberinto=nombre_nivel,
+            )
+
+    def _reiniciar_juego(self):
+        if self.nivel_actual >= len(self.niveles):
+            self.nivel_actual = 0
+        nivel_actual = self.niveles[self.nivel_actual]
+        self.LABERINTO = self._construir_laberinto(nivel_actual)
+        self.ocupacion = MapaOcupacion(self.LABERINTO.columnas, self.LABERINTO.filas)
+        self.VELOCIDAD_ENEMIGOS = max(10, nivel_actual.get("vel_enemigos", 14))
+        self.posicion_x, self.posicion_y = self._obtener_celda_libre_jugador()
+        exclusiones = [(self.posicion_x, self.posicion_y)]
+        objetivo_estrellas = 3
+        self.estrellas = self._generar_posiciones_validas(
+            objetivo_estrellas, exclusiones
+        )
+        self.enemigos = self._generar_posiciones_validas(
+            max(1, nivel_actual.get("enemigos", 1)),
+            [*exclusiones, *self.estrellas],
+            self.DISTANCIA_MINIMA_ENEMIGOS,
+        )
+        self.potenciadores = self._generar_posiciones_validas(
+            nivel_actual.get("powerups", 1),
+            [*exclusiones, *self.estrellas, *self.enemigos],
+        )
+        self._recolocar_enemigos_si_vacio(nivel_actual)
+        self.desplazamiento_interfaz_x = 20
+        self.desplazamiento_interfaz_y = 48
+        self.vidas = 3
+        self.potenciador_activo = None
+        self.temporizador_potenciador = 0
+        self.mensaje_texto = ""
+        self.cuadros_mensaje = 0
+        # Nivel o partida nueva: las fases de la IA empiezan de cero
+        self.controlador_enemigos.planificador.reiniciar()
+
+    def _avanzar_nivel(self):
+        if len(self.estrellas) > 0:
+            self.mensaje_texto = f"Faltan {len(self.estrellas)} estrella(s)"
+            self.cuadros_mensaje = 60
+            return
+        if self.nivel_actual < len(self.niveles) - 1:
+            self.nivel_actual += 1
+            self._reiniciar_juego()
+        else:
+            self._cambiar_a_fin_de_juego()
+
+    def _registrar_manejadores(self):
+        self.controlador_enemigos = ControladorEnemigos(
+            self, self.administrador_eventos
+        )
+        ControladorJugador(self, self.administrador_eventos)
+        ManejadorPotenciadores(self, self.administrador_eventos)
+        ManejadorColisiones(self, self.administrador_eventos)
+        ManejadorEstrellas(self, self.administrador_eventos)
+
+    def reiniciar(self, nivel=0, semilla=None):
+        """Empieza una partida nueva en el nivel indicado."""
+        if semilla is not None:
+            self.rng.seed(semilla)
+        self.nivel_actual = nivel
+        self.puntuacion = 0
+        self.ticks = 0
+        self.direcciones_presionadas = set()
+        self.temporizador_paso_jugador = 0
+        self.controlador_enemigos.planificador.reiniciar()
+        self._reiniciar_juego()
+        self.estado = "JUEGO"
+        return self.obtener_estado()
+
+    def paso(self, entradas=()):
+        """
+        Avanza un tick lógico con las direcciones pulsadas en `entradas`.
+        Colisiones y recogidas se encolan durante el tick y se despachan
+        juntas al final, en el orden en que ocurrieron.
+        """
+        if self.estado != "JUEGO":
+            return self.obtener_estado()
+        entradas = set(entradas)
+        # Una dirección recién pulsada mueve al jugador en este mismo tick
+        if entradas - self.direcciones_presionadas:
+            self.temporizador_paso_jugador = 0
+        self.direcciones_presionadas = entradas
+        if entradas:
+            self.temporizador_paso_jugador -= 1
+            if self.temporizador_paso_jugador <= 0:
+                for direccion in DIRECCIONES:
+                    if direccion in entradas:
+                        self.administrador_eventos.publicar(EVENTOS_MOVER[direccion])
+                        break
+                self.temporizador_paso_jugador = self.RETRASO_PASO_JUGADOR
+        if (
+            self.vidas > 0
+            and (self.posicion_x, self.posicion_y) in self.estrellas
+        ):
+            self.administrador_eventos.encolar(
+                EventoRecogerEstrella((self.posicion_x, self.posicion_y))
+            )
+        if (
+            self.vidas > 0
+            and (self.posicion_x, self.posicion_y) in self.potenciadores
+        ):
+            self.potenciadores.remove((self.posicion_x, self.posicion_y))
+            self.administrador_eventos.encolar(
+                EventoPowerUpAgarrado(self.rng.choice(TIPOS_POTENCIADOR))
+            )
+        if self.cuadros_mensaje > 0:
+            self.cuadros_mensaje -= 1
+        if self.temporizador_potenciador > 0:
+            self.temporizador_potenciador -= 1
+            if self.temporizador_potenciador == 0:
+                self.potenciador_activo = None
+        inicio = self.perfilador.reloj()
+        self.controlador_enemigos.actualizar()
+        self.perfilador.registrar("ia", inicio)
+        self.administrador_eventos.procesar_cola()
+        self.ticks += 1
+        return self.obtener_estado()
+
+    def obtener_estado(self):
+        return {
+            "estado": self.estado,
+            "tick": self.ticks,
+            "nivel": self.nivel_actual,
+            "jugador": (self.posicion_x, self.posicion_y),
+            "enemigos": [tuple(e) for e in self.enemigos],
+            "estrellas": list(self.estrellas),
+            "potenciadores": list(self.potenciadores),
+            "vidas": self.vidas,
+            "puntuacion": self.puntuacion,
+            "potenciador_activo": self.potenciador_activo,
+        }
+
+
+class ControladorJugador:
+    def __init__(self, juego, administrador):
+        self.juego = juego
+        administrador.registrar(EventoMoverJugador, self)
+
+    def notificar(self, evento):
+        j = self.juego
+        nueva_x, nueva_y = j.posicion_x, j.posicion_y
+        if evento.direccion == "arriba":
+            nueva_y -= 1
+        elif evento.direccion == "abajo":
+            nueva_y += 1
+        elif evento.direccion == "izquierda":
+            nueva_x -= 1
+        elif evento.direccion == "derecha":
+            nueva_x += 1
+        if j.LABERINTO.es_transitable(nueva_x, nueva_y):
+            j.posicion_x, j.posicion_y = nueva_x, nueva_y
+            # Verificar colisión inmediata después del movimiento
+            if (nueva_x, nueva_y) in j.enemigos:
+                j.administrador_eventos.encolar(
+                    EventoColisionEnemigo((nueva_x, nueva_y), (nueva_x, nueva_y))
+                )
+
+
+class ControladorEnemigos:
+    def __init__(self, juego, administrador):
+        self.juego = juego
+        self.administrador = administrador
+        self.campo = None
+        self.caminos = None
+        # Cada enemigo se mueve cada VELOCIDAD_ENEMIGOS ticks con su propia fase
+        self.planificador = PlanificadorIA()
+        administrador.registrar(EventoMoverJugador, self)
+
+    def notificar(self, evento):
+        pass
+
+    def actualizar(self):
+        j = self.juego
+        if j.potenciador_activo == "congelar":
+            return
+        planificador = self.planificador
+        enemigos = j.enemigos
+        planificador.presupuesto_us = j.PRESUPUESTO_IA_US
+        planificador.preparar(len(enemigos), j.VELOCIDAD_ENEMIGOS)
+        objetivo = (j.posicion_x, j.posicion_y)
+        if j.ESTRATEGIA_IA == "campo":
+            # Un único mapa de distancias, compartido por todos los enemigos. Con
+            # presupuesto, su actualización (recálculo completo o corrección
+            # incremental) se reparte entre ticks y mientras tanto los enemigos
+            # siguen el mapa hacia la posición anterior
+            if self.campo is None or self.campo.laberinto is not j.LABERINTO:
+                self.campo = CampoDistancias(j.LABERINTO)
+            campo = self.campo
+            siguiente_paso = campo.siguiente_paso
+
+            def antes(limite_ns):
+                campo.actualizar_objetivo(objetivo, limite_ns)
+
+            def mover(indice):
+                enemigos[indice] = siguiente_paso(enemigos[indice])
+        else:
+            jerarquico = j.ESTRATEGIA_IA == "hpa"
+            if (
+                self.caminos is None
+                or self.caminos.laberinto is not j.LABERINTO
+                or self.caminos.jerarquico != jerarquico
+            ):
+                self.caminos = CacheCaminos(j.LABERINTO, jerarquico)
+            siguiente_paso = self.caminos.siguiente_paso
+            antes = None
+
+            def mover(indice):
+                enemigos[indice] = siguiente_paso(indice, enemigos[indice], objetivo)
+        if not planificador.ejecutar(enemigos, objetivo, mover, antes):
+            return
+        # Verificar colisión después de que los enemigos se muevan; el recorrido
+        # en orden solo hace falta si alguno quedó sobre el jugador
+        if (j.posicion_x, j.posicion_y) in j.enemigos:
+            for enemigo in j.enemigos:
+                if enemigo == (j.posicion_x, j.posicion_y):
+                    j.administrador_eventos.encolar(
+                        EventoColisionEnemigo((j.posicion_x, j.posicion_y), enemigo)
+                    )
+
+
+class ManejadorPotenciadores:
+    def __init__(self, juego, administrador):
+        self.juego = juego
+        administrador.registrar(EventoPowerUpAgarrado, self)
+
+    def notificar(self, evento):
+        j = self.juego
+        j.potenciador_activo = evento.tipo
+        j.temporizador_potenciador = j.DURACION_POTENCIADOR
+
+
+class ManejadorColisiones:
+    def __init__(self, juego, administrador):
+        self.juego = juego
+        administrador.registrar(EventoColisionEnemigo, self)
+
+    def notificar(self, evento):
+        j = self.juego
+        if j.potenciador_activo == "invulnerable" or j.estado != "JUEGO":
+            return
+        # Solo procesar si realmente hay colisión y el jugador sigue ahí: otra
+        # colisión del mismo tick pudo haberlo devuelto a la entrada
+        if (
+            evento.posicion_jugador == evento.posicion_enemigo
+            and evento.posicion_jugador == (j.posicion_x, j.posicion_y)
+        ):
+            j.vidas -= 1
+            if j.vidas > 0:
+                j.posicion_x, j.posicion_y = j._obtener_celda_libre_jugador()
+                j._recolocar_enemigos_si_vacio(j.niveles[j.nivel_actual])
+            else:
+                j._cambiar_a_fin_de_juego()
+
+
+class ManejadorEstrellas:
+    def __init__(self, juego, administrador):
+        self.juego = juego
+        administrador.registrar(EventoRecogerEstrella, self)
+
+    def notificar(self, evento):
+        j = self.juego
+        # Una colisión anterior en el mismo tick pudo terminar la partida
+        if j.estado == "JUEGO" and evento.posicion in j.estrellas:
+            j.estrellas.remove(evento.posicion)
+            j.puntuacion += 10
+            if not j.estrellas:
+                j._avanzar_nivel()
@@ -0,0 +1,151 @@
+class CeldasOcupadas:
+    """
+    Posiciones de un tipo de entidad sin repetición (estrellas, potenciadores).
+    Se comporta como la lista de (x, y) que reemplaza: se itera en orden de
+    inserción, tiene len() y remove(), pero pertenencia y borrado son O(1).
+    """
+
+    __slots__ = ("_mapa", "_claves")
+
+    def __init__(self, mapa):
+        self._mapa = mapa
+        self._claves = {}
+
+    def __contains__(self, posicion):
+        return self._mapa.clave(posicion) in self._claves
+
+    def __iter__(self):
+        columnas = self._mapa.columnas
+        for clave in self._claves:
+            yield clave % columnas, clave // columnas
+
+    def __len__(self):
+        return len(self._claves)
+
+    def __repr__(self):
+        return f"CeldasOcupadas({list(self)})"
+
+    def agregar(self, posicion):
+        self._claves[self._mapa.clave_valida(posicion)] = None
+
+    def en_rectangulo(self, x0, y0, x1, y1):
+        """
+        Posiciones dentro de [x0, x1) × [y0, y1). Recorre lo que sea menor:
+        las celdas del rectángulo o las entidades guardadas.
+        """
+        columnas = self._mapa.columnas
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, columnas), min(y1, self._mapa.filas)
+        if x0 >= x1 or y0 >= y1:
+            return []
+        claves = self._claves
+        if (x1 - x0) * (y1 - y0) < len(claves):
+            return [
+                (x, y)
+                for y in range(y0, y1)
+                for x in range(x0, x1)
+                if y * columnas + x in claves
+            ]
+        posiciones = []
+        for clave in claves:
+            x, y = clave % columnas, clave // columnas
+            if x0 <= x < x1 and y0 <= y < y1:
+                posiciones.append((x, y))
+        return posiciones
+
+    def remove(self, posicion):
+        clave = self._mapa.clave(posicion)
+        if clave not in self._claves:
+            raise ValueError(f"{posicion} no está ocupada")
+        del self._claves[clave]
+
+    def reemplazar(self, posiciones):
+        self._claves = dict.fromkeys(self._mapa.clave_valida(p) for p in posiciones)
+
+
+class Enemigos:
+    """
+    Lista de posiciones de enemigos (varios pueden compartir celda) con un
+    conteo por celda que se actualiza en cada asignación, así "¿hay un
+    enemigo en (x, y)?" es O(1).
+    """
+
+    __slots__ = ("_mapa", "_posiciones", "_conteo")
+
+    def __init__(self, mapa):
+        self._mapa = mapa
+        self._posiciones = []
+        self._conteo = {}
+
+    def __getitem__(self, indice):
+        return self._posiciones[indice]
+
+    def __setitem__(self, indice, posicion):
+        x, y = posicion
+        anterior_x, anterior_y = self._posiciones[indice]
+        columnas = self._mapa.columnas
+        if not (0 <= x < columnas and 0 <= y < self._mapa.filas):
+            raise ValueError(f"{posicion} está fuera del laberinto")
+        conteo = self._conteo
+        anterior = anterior_y * columnas + anterior_x
+        restantes = conteo[anterior] - 1
+        if restantes:
+            conteo[anterior] = restantes
+        else:
+            del conteo[anterior]
+        nueva = y * columnas + x
+        conteo[nueva] = conteo.get(nueva, 0) + 1
+        self._posiciones[indice] = (x, y)
+
+    def __contains__(self, posicion):
+        return self._mapa.clave(posicion) in self._conteo
+
+    def __iter__(self):
+        return iter(self._posiciones)
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def __repr__(self):
+        return f"Enemigos({self._posiciones})"
+
+    def reemplazar(self, posiciones):
+        # La IA mueve a todos los enemigos de una vez por aquí
+        columnas, filas = self._mapa.columnas, self._mapa.filas
+        nuevas = []
+        conteo = {}
+        for x, y in posiciones:
+            if not (0 <= x < columnas and 0 <= y < filas):
+                raise ValueError(f"{(x, y)} está fuera del laberinto")
+            clave = y * columnas + x
+            conteo[clave] = conteo.get(clave, 0) + 1
+            nuevas.append((x, y))
+        self._posiciones = nuevas
+        self._conteo = conteo
+
+
+class MapaOcupacion:
+    """
+    Qué entidades hay en cada celda de un nivel. Las posiciones se guardan
+    con la clave entera y * columnas + x, sin importar si llegan como
+    tupla o lista; una posición fuera del laberinto nunca está ocupada.
+    """
+
+    def __init__(self, columnas, filas):
+        self.columnas = columnas
+        self.filas = filas
+        self.estrellas = CeldasOcupadas(self)
+        self.potenciadores = CeldasOcupadas(self)
+        self.enemigos = Enemigos(self)
+
+    def clave(self, posicion):
+        x, y = posicion
+        if 0 <= x < self.columnas and 0 <= y < self.filas:
+            return y * self.columnas + x
+        return None
+
+    def clave_valida(self, posicion):
+        clave = self.clave(posicion)
+        if clave is None:
+            raise ValueError(f"{posicion} está fuera del laberinto")
+        return clave
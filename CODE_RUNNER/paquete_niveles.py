@@ -0,0 +1,338 @@
+"""
+Paquete binario de niveles (.mrlp) con acceso aleatorio por mmap.
+
+Formato (little-endian):
+    cabecera   "MRLP", versión u16, reservado u16, cantidad u32,
+               tamaño u64 y mtime_ns u64 del niveles.json de origen
+    índice     cantidad × (u64 desplazamiento del nivel, 20 bytes de su huella SHA-1)
+    nivel      filas, columnas u16; presentes u16 (bits de claves opcionales);
+               vel_enemigos, estrellas, enemigos, powerups u16;
+               entrada y salida (x, y) i16; colores pared/suelo/enemigo 9 × u8;
+               nombre (u16 + utf-8); celdas a 2 bits, 4 por byte
+
+El conversor rechaza los niveles injugables (validar_nivel) y los que el
+formato no puede reproducir tal cual (claves de más, valores que no son enteros o fuera de rango): un nivel
+decodificado es siempre igual a su origen y tiene la misma huella.
+
+Uso:
+    python paquete_niveles.py niveles.json [niveles.mrlp]
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+MAGIA = b"MRLP"
+VERSION = 2
+CABECERA = struct.Struct("<4sHHIQQ")
+ENTRADA_INDICE = struct.Struct("<Q20s")
+NIVEL = struct.Struct("<HHHHHHHhhhh9B")
+LONGITUD = struct.Struct("<H")
+
+CONTADORES = ("vel_enemigos", "estrellas", "enemigos", "powerups")
+COLORES = ("pared", "suelo", "enemigo")
+CLAVES = frozenset(("nombre", "laberinto", *CONTADORES, "entrada", "salida", "colores"))
+# Bits de `presentes`: solo se reconstruyen las claves que tenía el JSON
+BIT_CONTADOR = {clave: 1 << i for i, clave in enumerate(CONTADORES)}
+BIT_ENTRADA = 1 << 4
+BIT_SALIDA = 1 << 5
+BIT_COLOR = {clave: 1 << (6 + i) for i, clave in enumerate(COLORES)}
+BIT_NOMBRE = 1 << 9
+BIT_COLORES = 1 << 10
+
+# Byte empaquetado -> sus cuatro celdas de 2 bits
+_DESEMPAQUETAR = [bytes((b & 3, (b >> 2) & 3, (b >> 4) & 3, b >> 6)) for b in range(256)]
+
+
+def huella_nivel(nivel):
+    return hashlib.sha1(
+        json.dumps(nivel, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def validar_nivel(nivel):
+    """Devuelve un mensaje de error si el nivel no se puede jugar, o None."""
+    if not isinstance(nivel, dict):
+        return "el nivel no es un objeto"
+    laberinto = nivel.get("laberinto")
+    if not isinstance(laberinto, list) or not laberinto:
+        return "falta 'laberinto'"
+    if not all(isinstance(fila, list) for fila in laberinto):
+        return "'laberinto' debe ser una lista de filas"
+    columnas = len(laberinto[0])
+    if columnas == 0 or any(len(fila) != columnas for fila in laberinto):
+        return "las filas de 'laberinto' tienen distinto largo"
+    if not all(isinstance(c, int) and 0 <= c <= 255 for fila in laberinto for c in fila):
+        return "'laberinto' solo admite enteros 0..255"
+    entrada = nivel.get("entrada", [1, 1])
+    if not (
+        isinstance(entrada, list)
+        and len(entrada) == 2
+        and 0 <= entrada[0] < columnas
+        and 0 <= entrada[1] < len(laberinto)
+    ):
+        return "'entrada' fuera del laberinto"
+    return None
+
+
+def ruta_paquete_para(ruta_json):
+    return os.path.splitext(ruta_json)[0] + ".mrlp"
+
+
+def _entero(valor, minimo, maximo):
+    # bool es un int para Python pero en el JSON se escribe distinto
+    return isinstance(valor, int) and not isinstance(valor, bool) and minimo <= valor <= maximo
+
+
+def _comprobar_nivel(nivel):
+    """Mensaje de error si el nivel no cabe tal cual en el formato, o None."""
+    error = validar_nivel(nivel)
+    if error is not None:
+        return error
+    sobrantes = sorted(set(nivel) - CLAVES)
+    if sobrantes:
+        return f"claves que el paquete no guarda: {', '.join(sobrantes)}"
+    if "nombre" in nivel and not isinstance(nivel["nombre"], str):
+        return "'nombre' debe ser un texto"
+    laberinto = nivel["laberinto"]
+    if len(laberinto[0]) > 0xFFFF or len(laberinto) > 0xFFFF:
+        return "'laberinto' de más de 65535 filas o columnas"
+    if not all(_entero(celda, 0, 3) for fila in laberinto for celda in fila):
+        return "celda fuera de 0..3"
+    for clave in CONTADORES:
+        if clave in nivel and not _entero(nivel[clave], 0, 0xFFFF):
+            return f"'{clave}' debe ser un entero 0..65535"
+    for clave in ("entrada", "salida"):
+        if clave in nivel:
+            punto = nivel[clave]
+            if not (
+                isinstance(punto, list)
+                and len(punto) == 2
+                and all(_entero(v, -0x8000, 0x7FFF) for v in punto)
+            ):
+                return f"'{clave}' debe ser [x, y] con enteros de 16 bits"
+    if "colores" in nivel:
+        colores = nivel["colores"]
+        if not isinstance(colores, dict):
+            return "'colores' debe ser un objeto"
+        sobrantes = sorted(set(colores) - set(COLORES))
+        if sobrantes:
+            return f"colores que el paquete no guarda: {', '.join(sobrantes)}"
+        for clave, color in colores.items():
+            if not (
+                isinstance(color, list)
+                and len(color) == 3
+                and all(_entero(v, 0, 255) for v in color)
+            ):
+                return f"el color '{clave}' debe ser [r, g, b] con enteros 0..255"
+    return None
+
+
+def _codificar_nivel(nivel):
+    error = _comprobar_nivel(nivel)
+    if error is not None:
+        nombre = nivel.get("nombre") if isinstance(nivel, dict) else None
+        raise ValueError(f"Nivel {nombre!r}: {error}")
+    laberinto = nivel["laberinto"]
+    filas, columnas = len(laberinto), len(laberinto[0])
+    celdas = bytearray()
+    for fila in laberinto:
+        celdas.extend(fila)
+    celdas.extend(bytes(-len(celdas) % 4))
+    empaquetadas = bytes(
+        celdas[i] | celdas[i + 1] << 2 | celdas[i + 2] << 4 | celdas[i + 3] << 6
+        for i in range(0, len(celdas), 4)
+    )
+    presentes = 0
+    for clave in CONTADORES:
+        if clave in nivel:
+            presentes |= BIT_CONTADOR[clave]
+    entrada, salida = nivel.get("entrada"), nivel.get("salida")
+    if entrada is not None:
+        presentes |= BIT_ENTRADA
+    if salida is not None:
+        presentes |= BIT_SALIDA
+    colores = nivel.get("colores")
+    if colores is not None:
+        presentes |= BIT_COLORES
+        for clave in COLORES:
+            if clave in colores:
+                presentes |= BIT_COLOR[clave]
+    nombre = nivel.get("nombre")
+    if nombre is not None:
+        presentes |= BIT_NOMBRE
+    nombre = (nombre or "").encode("utf-8")
+    valores_color = []
+    for clave in COLORES:
+        valores_color.extend((colores or {}).get(clave, (0, 0, 0)))
+    return (
+        NIVEL.pack(
+            filas, columnas, presentes,
+            *(nivel.get(clave, 0) for clave in CONTADORES),
+            *(entrada or (0, 0)), *(salida or (0, 0)),
+            *valores_color,
+        )
+        + LONGITUD.pack(len(nombre)) + nombre
+        + empaquetadas
+    )
+
+
+def compilar(ruta_json, ruta_paquete=None):
+    """Convierte un niveles.json al formato binario; devuelve la ruta escrita."""
+    ruta_paquete = ruta_paquete or ruta_paquete_para(ruta_json)
+    with open(ruta_json, "r", encoding="utf-8") as archivo:
+        niveles = json.load(archivo)["niveles"]
+    registros = [_codificar_nivel(nivel) for nivel in niveles]
+    origen = os.stat(ruta_json)
+    desplazamiento = CABECERA.size + ENTRADA_INDICE.size * len(registros)
+    indice = bytearray()
+    for nivel, registro in zip(niveles, registros):
+        indice += ENTRADA_INDICE.pack(desplazamiento, bytes.fromhex(huella_nivel(nivel)))
+        desplazamiento += len(registro)
+    temporal = f"{ruta_paquete}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(CABECERA.pack(
+            MAGIA, VERSION, 0, len(registros), origen.st_size, origen.st_mtime_ns
+        ))
+        archivo.write(indice)
+        for registro in registros:
+            archivo.write(registro)
+    os.replace(temporal, ruta_paquete)
+    return ruta_paquete
+
+
+class PaqueteNiveles:
+    """
+    Secuencia de niveles respaldada por un .mrlp mapeado en memoria. Cada
+    nivel se decodifica al pedirlo y se guardan unos pocos ya decodificados.
+    """
+
+    def __init__(self, ruta, capacidad=8):
+        self.ruta = ruta
+        self.capacidad = capacidad
+        self._decodificados = OrderedDict()
+        self._huellas = None
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, _, self.cantidad, self.origen_tamaño, self.origen_mtime_ns = (
+            CABECERA.unpack_from(self._mapa, 0)
+        )
+        if magia != MAGIA or version != VERSION:
+            self._mapa.close()
+            raise ValueError(f"{ruta}: no es un paquete de niveles v{VERSION}")
+
+    def vigente(self, ruta_json):
+        """El paquete sigue valiendo si el JSON de origen no cambió desde la compilación."""
+        try:
+            origen = os.stat(ruta_json)
+        except OSError:
+            return True
+        return (
+            origen.st_size == self.origen_tamaño
+            and origen.st_mtime_ns == self.origen_mtime_ns
+        )
+
+    def __len__(self):
+        return self.cantidad
+
+    def huellas(self):
+        """Huella de cada nivel, leída del índice sin decodificar ninguno."""
+        if self._huellas is None:
+            self._huellas = [
+                ENTRADA_INDICE.unpack_from(self._mapa, CABECERA.size + ENTRADA_INDICE.size * i)[1].hex()
+                for i in range(self.cantidad)
+            ]
+        return self._huellas
+
+    def __iter__(self):
+        for indice in range(self.cantidad):
+            yield self[indice]
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self.cantidad
+        if not 0 <= indice < self.cantidad:
+            raise IndexError(indice)
+        nivel = self._decodificados.get(indice)
+        if nivel is None:
+            nivel = self._decodificar(indice)
+            self._decodificados[indice] = nivel
+            if len(self._decodificados) > self.capacidad:
+                self._decodificados.popitem(last=False)
+        else:
+            self._decodificados.move_to_end(indice)
+        return nivel
+
+    def _decodificar(self, indice):
+        mapa = self._mapa
+        desplazamiento, _ = ENTRADA_INDICE.unpack_from(
+            mapa, CABECERA.size + ENTRADA_INDICE.size * indice
+        )
+        valores = NIVEL.unpack_from(mapa, desplazamiento)
+        filas, columnas, presentes = valores[:3]
+        contadores = valores[3:7]
+        entrada, salida = list(valores[7:9]), list(valores[9:11])
+        colores = valores[11:20]
+        desplazamiento += NIVEL.size
+        (largo,) = LONGITUD.unpack_from(mapa, desplazamiento)
+        desplazamiento += LONGITUD.size
+        nombre = mapa[desplazamiento:desplazamiento + largo].decode("utf-8")
+        desplazamiento += largo
+        total = filas * columnas
+        empaquetadas = mapa[desplazamiento:desplazamiento + (total + 3) // 4]
+        celdas = b"".join(_DESEMPAQUETAR[b] for b in empaquetadas)
+        nivel = {}
+        if presentes & BIT_NOMBRE:
+            nivel["nombre"] = nombre
+        nivel["laberinto"] = [
+            list(celdas[y * columnas:(y + 1) * columnas]) for y in range(filas)
+        ]
+        for clave, valor in zip(CONTADORES, contadores):
+            if presentes & BIT_CONTADOR[clave]:
+                nivel[clave] = valor
+        if presentes & BIT_ENTRADA:
+            nivel["entrada"] = entrada
+        if presentes & BIT_SALIDA:
+            nivel["salida"] = salida
+        if presentes & BIT_COLORES:
+            nivel["colores"] = {
+                clave: list(colores[i * 3:i * 3 + 3])
+                for i, clave in enumerate(COLORES)
+                if presentes & BIT_COLOR[clave]
+            }
+        return nivel
+
+    def cerrar(self):
+        self._decodificados.clear()
+        self._mapa.close()
+
+
+def abrir_si_vigente(ruta_json):
+    """Abre el .mrlp junto a `ruta_json` si existe y no quedó desactualizado."""
+    ruta = ruta_paquete_para(ruta_json)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        paquete = PaqueteNiveles(ruta)
+    except (OSError, ValueError, struct.error) as excepcion:
+        print(f"Error abriendo paquete de niveles: {excepcion}")
+        return None
+    if not paquete.vigente(ruta_json):
+        paquete.cerrar()
+        return None
+    return paquete
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    try:
+        destino = compilar(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    except ValueError as excepcion:
+        print(f"No se escribió el paquete: {excepcion}")
+        sys.exit(1)
+    print(f"Paquete escrito en {destino}")
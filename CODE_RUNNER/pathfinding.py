@@ -1,35 +1,513 @@
+from collections import deque
+from heapq import heappop, heappush
+from time import perf_counter_ns
+from grilla import Grilla
+
+# Orden de exploración de vecinos (dx, dy); define el desempate entre caminos
+VECINOS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+INALCANZABLE = -1
+# Celdas del BFS entre consultas al reloj cuando el cálculo tiene tope de tiempo
+LOTE_RECALCULO = 64
+
+
 def bfs_siguiente_paso(laberinto, posicion_actual, destino):
     """
     Encuentra el siguiente paso hacia el destino usando BFS.
     Retorna la posición del siguiente paso.
     """
-    from collections import deque
-
+    posicion_actual, destino = tuple(posicion_actual), tuple(destino)
     if posicion_actual == destino:
         return posicion_actual
 
-    filas, cols = len(laberinto), len(laberinto[0])
-    visitados = set()
-    cola = deque([(posicion_actual, [posicion_actual])])
-    visitados.add(posicion_actual)
+    grilla = Grilla.desde(laberinto)
+    padres = {posicion_actual: None}
+    cola = deque([posicion_actual])
 
     while cola:
-        (x, y), camino = cola.popleft()
+        x, y = cola.popleft()
 
         # Explora las 4 direcciones
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+        for dx, dy in VECINOS:
             nx, ny = x + dx, y + dy
 
+            if (nx, ny) not in padres and grilla.es_transitable(nx, ny):
+                padres[(nx, ny)] = (x, y)
+                if (nx, ny) == destino:
+                    # Retrocede hasta la celda contigua al origen
+                    paso = (nx, ny)
+                    while padres[paso] != posicion_actual:
+                        paso = padres[paso]
+                    return paso
+                cola.append((nx, ny))
+
+    return posicion_actual
+
+
+class CampoDistancias:
+    """
+    Mapa de distancias (BFS inverso) desde la celda objetivo a todo el laberinto.
+    Se calcula una vez por posición del objetivo y cada enemigo lee su
+    siguiente paso en O(1). Si el objetivo avanza una sola celda el mapa se
+    corrige de forma incremental en lugar de recalcularse.
+
+    Con un límite de tiempo, tanto el recálculo completo como la corrección
+    incremental pueden repartirse entre varias llamadas: mientras no
+    terminan, el mapa sigue apuntando al objetivo anterior (`objetivo` es
+    siempre aquel al que apuntan las distancias).
+    """
+
+    def __init__(self, laberinto):
+        self.laberinto = laberinto
+        grilla = Grilla.desde(laberinto)
+        self.filas, self.columnas = grilla.filas, grilla.columnas
+        self.transitable = grilla.mascara_libre()
+        self.objetivo = None
+        # Distancia real = valor almacenado + desplazamiento (None: sin camino)
+        self._valores = [None] * (self.filas * self.columnas)
+        self._desplazamiento = 0
+        # (método que lo continúa, su estado) del cálculo a medias, o None
+        self._pendiente = None
+
+    def _indice(self, x, y):
+        return y * self.columnas + x
+
+    def distancia(self, posicion):
+        x, y = posicion
+        if not (0 <= x < self.columnas and 0 <= y < self.filas):
+            return INALCANZABLE
+        valor = self._valores[y * self.columnas + x]
+        if valor is None:
+            return INALCANZABLE
+        return valor + self._desplazamiento
+
+    def actualizar_objetivo(self, objetivo, limite_ns=None):
+        """
+        Apunta el mapa a `objetivo`. Con `limite_ns` (un perf_counter_ns) el
+        cálculo se corta al llegar a ese instante y sigue en la próxima
+        llamada. Devuelve True si el mapa quedó apuntando a `objetivo`.
+        """
+        objetivo = tuple(objetivo)
+        while True:
+            if self._pendiente is not None:
+                avanzar, estado = self._pendiente
+                if not avanzar(estado, limite_ns):
+                    return False
+            if objetivo == self.objetivo:
+                return True
+            anterior = self.objetivo
             if (
-                0 <= nx < filas
-                and 0 <= ny < cols
-                and (nx, ny) not in visitados
-                and laberinto[nx][ny] != 1
+                anterior is not None
+                and abs(anterior[0] - objetivo[0]) + abs(anterior[1] - objetivo[1]) == 1
+                and self.distancia(objetivo) == 1
             ):
-                if (nx, ny) == destino:
-                    return (nx, ny)
+                self._empezar_desplazamiento(objetivo)
+            else:
+                self._empezar_recalculo(objetivo)
 
-                visitados.add((nx, ny))
-                cola.append(((nx, ny), camino + [(nx, ny)]))
+    def _empezar_recalculo(self, objetivo):
+        valores = [None] * (self.filas * self.columnas)
+        cola = deque()
+        x, y = objetivo
+        if 0 <= x < self.columnas and 0 <= y < self.filas:
+            inicio = y * self.columnas + x
+            if self.transitable[inicio]:
+                valores[inicio] = 0
+                cola.append(inicio)
+        self._pendiente = (self._avanzar_recalculo, (objetivo, valores, cola))
 
-    return posicion_actual
+    def _avanzar_recalculo(self, estado, limite_ns=None):
+        objetivo, valores, cola = estado
+        columnas, filas = self.columnas, self.filas
+        transitable = self.transitable
+        # Sin límite el contador nunca llega a cero: no se consulta el reloj
+        lote = LOTE_RECALCULO if limite_ns is not None else len(valores) + 1
+        restantes = lote
+        while cola:
+            restantes -= 1
+            if not restantes:
+                if perf_counter_ns() >= limite_ns:
+                    return False
+                restantes = lote
+            actual = cola.popleft()
+            siguiente_valor = valores[actual] + 1
+            cx, cy = actual % columnas, actual // columnas
+            for dx, dy in VECINOS:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < columnas and 0 <= ny < filas:
+                    vecino = ny * columnas + nx
+                    if transitable[vecino] and valores[vecino] is None:
+                        valores[vecino] = siguiente_valor
+                        cola.append(vecino)
+        self._valores = valores
+        self._desplazamiento = 0
+        self.objetivo = objetivo
+        self._pendiente = None
+        return True
+
+    def _empezar_desplazamiento(self, nuevo):
+        inicio = self._indice(*nuevo)
+        self._pendiente = (
+            self._avanzar_desplazamiento, (nuevo, [inicio], {inicio}, deque([inicio]))
+        )
+
+    def _avanzar_desplazamiento(self, estado, limite_ns=None):
+        # La rejilla 4-conexa es bipartita: al mover el origen a una celda
+        # vecina cada distancia cambia exactamente en ±1. Bajan en 1 las
+        # celdas que descienden del nuevo origen en el árbol de caminos
+        # mínimos; las demás suben en 1 (se aplica con el desplazamiento).
+        # La búsqueda de descendientes solo lee el mapa, así que puede
+        # cortarse; la resta final es un único recorrido y no se corta.
+        nuevo, descendientes, vistos, cola = estado
+        columnas, filas = self.columnas, self.filas
+        valores = self._valores
+        lote = LOTE_RECALCULO if limite_ns is not None else len(valores) + 1
+        restantes = lote
+        while cola:
+            restantes -= 1
+            if not restantes:
+                if perf_counter_ns() >= limite_ns:
+                    return False
+                restantes = lote
+            actual = cola.popleft()
+            siguiente_valor = valores[actual] + 1
+            cx, cy = actual % columnas, actual // columnas
+            for dx, dy in VECINOS:
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < columnas and 0 <= ny < filas:
+                    vecino = ny * columnas + nx
+                    if valores[vecino] == siguiente_valor and vecino not in vistos:
+                        vistos.add(vecino)
+                        descendientes.append(vecino)
+                        cola.append(vecino)
+        self._desplazamiento += 1
+        for indice in descendientes:
+            valores[indice] -= 2
+        self.objetivo = nuevo
+        self._pendiente = None
+        return True
+
+    def siguiente_paso(self, posicion):
+        """Celda contigua que acerca al objetivo; la misma si no hay camino."""
+        posicion = tuple(posicion)
+        distancia = self.distancia(posicion)
+        if distancia <= 0:
+            return posicion
+        x, y = posicion
+        buscada = distancia - 1 - self._desplazamiento
+        columnas, filas = self.columnas, self.filas
+        for dx, dy in VECINOS:
+            nx, ny = x + dx, y + dy
+            if (
+                0 <= nx < columnas
+                and 0 <= ny < filas
+                and self._valores[ny * columnas + nx] == buscada
+            ):
+                return (nx, ny)
+        return posicion
+
+
+def _a_estrella(transitable, columnas, filas, inicio, fin, limites=None):
+    """
+    A* con distancia Manhattan entre índices de celda. `limites` (x0, y0,
+    x1, y1) restringe la búsqueda a un rectángulo. Devuelve los índices del
+    camino sin `inicio` y terminando en `fin`, o None si no hay camino.
+
+    La búsqueda va de `fin` hacia `inicio`; al sacar `inicio` de la cola ya
+    son exactas las distancias a `fin` de toda celda de un camino mínimo, y
+    el camino se arma desde `inicio` tomando en cada celda el primer vecino
+    de VECINOS que acerca. Entre caminos del mismo largo resulta el mismo
+    que recorre un enemigo guiado por BFS.
+    """
+    x0, y0, x1, y1 = limites or (0, 0, columnas, filas)
+    ix, iy = inicio % columnas, inicio // columnas
+    costos = {fin: 0}
+    abiertos = [(abs(fin % columnas - ix) + abs(fin // columnas - iy), 0, fin)]
+    while abiertos:
+        _, costo, actual = heappop(abiertos)
+        if actual == inicio:
+            break
+        if costo > costos[actual]:
+            continue
+        cx, cy = actual % columnas, actual // columnas
+        siguiente_costo = costo + 1
+        for dx, dy in VECINOS:
+            nx, ny = cx + dx, cy + dy
+            if x0 <= nx < x1 and y0 <= ny < y1:
+                vecino = ny * columnas + nx
+                if transitable[vecino] and siguiente_costo < costos.get(vecino, siguiente_costo + 1):
+                    costos[vecino] = siguiente_costo
+                    # A igual f sale antes el de menor costo: toda celda de un
+                    # camino mínimo se expande antes que `inicio`
+                    heappush(abiertos, (
+                        siguiente_costo + abs(nx - ix) + abs(ny - iy), siguiente_costo, vecino
+                    ))
+    else:
+        return None
+    camino = []
+    actual = inicio
+    for restante in range(costos[inicio] - 1, -1, -1):
+        cx, cy = actual % columnas, actual // columnas
+        for dx, dy in VECINOS:
+            nx, ny = cx + dx, cy + dy
+            if x0 <= nx < x1 and y0 <= ny < y1 and costos.get(ny * columnas + nx) == restante:
+                actual = ny * columnas + nx
+                break
+        camino.append(actual)
+    return camino
+
+
+def a_estrella_siguiente_paso(laberinto, posicion_actual, destino):
+    """Igual que bfs_siguiente_paso pero con A*: explora hacia el destino."""
+    posicion_actual, destino = tuple(posicion_actual), tuple(destino)
+    grilla = Grilla.desde(laberinto)
+    if posicion_actual == destino or not (
+        grilla.es_transitable(*posicion_actual) and grilla.es_transitable(*destino)
+    ):
+        return posicion_actual
+    camino = _a_estrella(
+        grilla.mascara_libre(), grilla.columnas, grilla.filas,
+        grilla.indice(*posicion_actual), grilla.indice(*destino),
+    )
+    if not camino:
+        return posicion_actual
+    return camino[0] % grilla.columnas, camino[0] // grilla.columnas
+
+
+class MapaJerarquico:
+    """
+    Grafo abstracto estilo HPA*: el laberinto se divide en bloques de
+    `tamaño_cluster` y en cada tramo de borde abierto entre dos bloques
+    vecinos se marca un par de celdas de entrada. Las distancias entre
+    entradas de un mismo bloque se calculan la primera vez que una
+    búsqueda pasa por él. El camino resultante es válido pero puede ser
+    algo más largo que el mínimo.
+    """
+
+    def __init__(self, laberinto, tamaño_cluster=16):
+        self.laberinto = laberinto
+        grilla = Grilla.desde(laberinto)
+        self.filas, self.columnas = grilla.filas, grilla.columnas
+        self.transitable = grilla.mascara_libre()
+        self.tamaño = tamaño_cluster
+        self.clusters_x = -(-self.columnas // tamaño_cluster)
+        self.entradas = {}
+        self.puentes = {}
+        self._aristas = {}
+        # Entrada -> [(vecina, costo)]: aristas del bloque más su puente
+        self._adyacencia = {}
+        self._detectar_entradas()
+
+    def cluster(self, indice):
+        x, y = indice % self.columnas, indice // self.columnas
+        return (y // self.tamaño) * self.clusters_x + x // self.tamaño
+
+    def _limites(self, cluster):
+        x0 = (cluster % self.clusters_x) * self.tamaño
+        y0 = (cluster // self.clusters_x) * self.tamaño
+        return x0, y0, min(x0 + self.tamaño, self.columnas), min(y0 + self.tamaño, self.filas)
+
+    def _agregar_puente(self, a, b):
+        for desde, hacia in ((a, b), (b, a)):
+            self.entradas.setdefault(self.cluster(desde), {})[desde] = None
+            self.puentes.setdefault(desde, []).append(hacia)
+
+    def _detectar_entradas(self):
+        columnas, filas, tamaño = self.columnas, self.filas, self.tamaño
+        transitable = self.transitable
+        # (celdas a lo largo del borde, paso entre el par de celdas que lo cruzan)
+        bordes = [
+            ([y * columnas + x for y in range(filas)], 1)
+            for x in range(tamaño - 1, columnas - 1, tamaño)
+        ] + [
+            ([y * columnas + x for x in range(columnas)], columnas)
+            for y in range(tamaño - 1, filas - 1, tamaño)
+        ]
+        for celdas, cruce in bordes:
+            tramo = []
+            for posicion, indice in enumerate(celdas):
+                abierto = transitable[indice] and transitable[indice + cruce]
+                # Un tramo también se corta donde empieza otro bloque a lo largo del borde
+                if tramo and (not abierto or posicion % tamaño == 0):
+                    medio = tramo[len(tramo) // 2]
+                    self._agregar_puente(medio, medio + cruce)
+                    tramo = []
+                if abierto:
+                    tramo.append(indice)
+            if tramo:
+                medio = tramo[len(tramo) // 2]
+                self._agregar_puente(medio, medio + cruce)
+
+    def _distancias_locales(self, cluster, inicio):
+        # BFS sin salir del bloque
+        x0, y0, x1, y1 = self._limites(cluster)
+        columnas, transitable = self.columnas, self.transitable
+        distancias = {inicio: 0}
+        cola = deque([inicio])
+        while cola:
+            actual = cola.popleft()
+            cx, cy = actual % columnas, actual // columnas
+            for dx, dy in VECINOS:
+                nx, ny = cx + dx, cy + dy
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    vecino = ny * columnas + nx
+                    if transitable[vecino] and vecino not in distancias:
+                        distancias[vecino] = distancias[actual] + 1
+                        cola.append(vecino)
+        return distancias
+
+    def _aristas_cluster(self, cluster):
+        aristas = self._aristas.get(cluster)
+        if aristas is None:
+            entradas = self.entradas.get(cluster, {})
+            aristas = {}
+            for entrada in entradas:
+                distancias = self._distancias_locales(cluster, entrada)
+                aristas[entrada] = [
+                    (otra, distancias[otra])
+                    for otra in entradas
+                    if otra != entrada and otra in distancias
+                ]
+            self._aristas[cluster] = aristas
+        return aristas
+
+    def camino(self, inicio, fin):
+        """Índices del camino de `inicio` a `fin` (sin `inicio`), o None si no hay."""
+        if not (self.transitable[inicio] and self.transitable[fin]):
+            return None
+        limites = self._limites
+        cluster_inicio, cluster_fin = self.cluster(inicio), self.cluster(fin)
+        if cluster_inicio == cluster_fin:
+            local = _a_estrella(
+                self.transitable, self.columnas, self.filas, inicio, fin, limites(cluster_inicio)
+            )
+            if local is not None:
+                return local
+        abstracto = self._buscar_abstracto(inicio, fin, cluster_inicio, cluster_fin)
+        if abstracto is None:
+            return None
+        # Refinamiento: cada tramo es un cruce de borde o un A* dentro de un bloque
+        camino = []
+        anterior = inicio
+        for nodo in abstracto:
+            if nodo in self.puentes.get(anterior, ()):
+                camino.append(nodo)
+            else:
+                camino.extend(_a_estrella(
+                    self.transitable, self.columnas, self.filas,
+                    anterior, nodo, limites(self.cluster(nodo)),
+                ))
+            anterior = nodo
+        return camino
+
+    def _buscar_abstracto(self, inicio, fin, cluster_inicio, cluster_fin):
+        columnas = self.columnas
+        fx, fy = fin % columnas, fin // columnas
+        desde_inicio = self._distancias_locales(cluster_inicio, inicio)
+        hasta_fin = self._distancias_locales(cluster_fin, fin)
+        salidas_fin = {
+            entrada: hasta_fin[entrada]
+            for entrada in self.entradas.get(cluster_fin, ())
+            if entrada in hasta_fin
+        }
+        adyacencia = self._adyacencia
+        costos = {inicio: 0}
+        padres = {inicio: None}
+        abiertos = [(0, 0, inicio)]
+        while abiertos:
+            _, costo, actual = heappop(abiertos)
+            if actual == fin:
+                abstracto = []
+                while actual != inicio:
+                    abstracto.append(actual)
+                    actual = padres[actual]
+                abstracto.reverse()
+                return abstracto
+            if costo > costos[actual]:
+                continue
+            if actual == inicio:
+                # Si el inicio ya es una entrada, también puede cruzar su puente
+                vecinos = [
+                    (entrada, desde_inicio[entrada])
+                    for entrada in self.entradas.get(cluster_inicio, ())
+                    if entrada in desde_inicio
+                ] + [(puente, 1) for puente in self.puentes.get(inicio, ())]
+            else:
+                vecinos = adyacencia.get(actual)
+                if vecinos is None:
+                    vecinos = self._aristas_cluster(self.cluster(actual)).get(actual, []) + [
+                        (puente, 1) for puente in self.puentes.get(actual, ())
+                    ]
+                    adyacencia[actual] = vecinos
+                if actual in salidas_fin:
+                    vecinos = vecinos + [(fin, salidas_fin[actual])]
+            for vecino, paso in vecinos:
+                nuevo = costo + paso
+                if nuevo < costos.get(vecino, nuevo + 1):
+                    costos[vecino] = nuevo
+                    padres[vecino] = actual
+                    vx, vy = vecino % columnas, vecino // columnas
+                    heappush(abiertos, (nuevo + abs(vx - fx) + abs(vy - fy), nuevo, vecino))
+        return None
+
+
+class CacheCaminos:
+    """
+    Camino completo guardado por enemigo. Mientras el objetivo no cambie y
+    el enemigo siga donde el camino lo dejó, cada paso es un pop; si no, se
+    busca de nuevo con A* o, con `jerarquico`, sobre un MapaJerarquico.
+    Un cambio de laberinto se detecta por identidad, como en CampoDistancias.
+    """
+
+    def __init__(self, laberinto, jerarquico=False, tamaño_cluster=16):
+        self.laberinto = laberinto
+        self.jerarquico = jerarquico
+        grilla = Grilla.desde(laberinto)
+        self.filas, self.columnas = grilla.filas, grilla.columnas
+        self.transitable = grilla.mascara_libre()
+        self.jerarquia = MapaJerarquico(grilla, tamaño_cluster) if jerarquico else None
+        self._caminos = {}
+        self.reutilizados = 0
+        self.calculados = 0
+
+    def _calcular(self, posicion, objetivo):
+        columnas = self.columnas
+        inicio = posicion[1] * columnas + posicion[0]
+        fin = objetivo[1] * columnas + objetivo[0]
+        if self.jerarquia is not None:
+            camino = self.jerarquia.camino(inicio, fin)
+        elif self.transitable[inicio] and self.transitable[fin]:
+            camino = _a_estrella(self.transitable, columnas, self.filas, inicio, fin)
+        else:
+            camino = None
+        if camino is None:
+            return None
+        # Invertido: el próximo paso queda al final y se saca con pop()
+        return [(indice % columnas, indice // columnas) for indice in reversed(camino)]
+
+    def siguiente_paso(self, clave, posicion, objetivo):
+        """Próxima celda del enemigo `clave` hacia `objetivo`; la misma si no hay camino."""
+        posicion, objetivo = tuple(posicion), tuple(objetivo)
+        if posicion == objetivo:
+            return posicion
+        guardado = self._caminos.get(clave)
+        if guardado is not None and guardado[0] == objetivo and guardado[1] == posicion:
+            pasos = guardado[2]
+            self.reutilizados += 1
+        else:
+            x, y = objetivo
+            pasos = (
+                self._calcular(posicion, objetivo)
+                if 0 <= x < self.columnas and 0 <= y < self.filas
+                else None
+            )
+            self.calculados += 1
+        if not pasos:
+            # Sin camino: se recuerda para no repetir la búsqueda en cada tick
+            self._caminos[clave] = (objetivo, posicion, pasos)
+            return posicion
+        siguiente = pasos.pop()
+        self._caminos[clave] = (objetivo, siguiente, pasos)
+        return siguiente
+
+    def olvidar(self):
+        self._caminos.clear()
@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+from array import array
+from time import perf_counter_ns
+
+
+class PerfiladorNulo:
+    """Perfilador desactivado: mismas llamadas que Perfilador, sin trabajo."""
+
+    activo = False
+
+    def reloj(self):
+        return 0
+
+    def registrar(self, fase, inicio):
+        pass
+
+    def cerrar_cuadro(self):
+        pass
+
+
+PERFILADOR_NULO = PerfiladorNulo()
+
+
+class Perfilador:
+    """
+    Tiempos por fase de cada cuadro en nanosegundos. Cada fase guarda los
+    últimos `capacidad` cuadros en un buffer circular alineado con el resto,
+    de modo que la fila i de todas las fases corresponde al mismo cuadro.
+
+    Uso:
+        inicio = perfilador.reloj()
+        ...
+        perfilador.registrar("fase", inicio)
+        perfilador.cerrar_cuadro()
+    """
+
+    activo = True
+
+    def __init__(self, capacidad=600):
+        self.capacidad = capacidad
+        self.fases = {}
+        self.cuadros = 0
+        self._actual = {}
+        self._inicio_cuadro = perf_counter_ns()
+
+    def reloj(self):
+        return perf_counter_ns()
+
+    def registrar(self, fase, inicio):
+        if not inicio:
+            # La fase empezó con el perfilador nulo (F3 a mitad de cuadro):
+            # su reloj() da 0 y la resta sería el valor absoluto del reloj
+            return
+        # Una fase puede medirse varias veces en el mismo cuadro: se suma
+        self._actual[fase] = self._actual.get(fase, 0) + perf_counter_ns() - inicio
+
+    def cerrar_cuadro(self):
+        ahora = perf_counter_ns()
+        self._actual["cuadro"] = ahora - self._inicio_cuadro
+        self._inicio_cuadro = ahora
+        posicion = self.cuadros % self.capacidad
+        for fase in self._actual:
+            if fase not in self.fases:
+                self.fases[fase] = array("q", bytes(8 * self.capacidad))
+        for fase, buffer in self.fases.items():
+            buffer[posicion] = self._actual.get(fase, 0)
+        self._actual.clear()
+        self.cuadros += 1
+
+    def _muestras(self, fase):
+        buffer = self.fases.get(fase)
+        if buffer is None:
+            return []
+        total = min(self.cuadros, self.capacidad)
+        if self.cuadros <= self.capacidad:
+            return list(buffer[:total])
+        # Orden cronológico: desde el más antiguo que sigue en el buffer
+        posicion = self.cuadros % self.capacidad
+        return list(buffer[posicion:]) + list(buffer[:posicion])
+
+    def percentiles(self, fase, cuantiles=(50, 95, 99)):
+        """Percentiles de la fase en milisegundos (0.0 si aún no hay datos)."""
+        muestras = sorted(self._muestras(fase))
+        if not muestras:
+            return tuple(0.0 for _ in cuantiles)
+        ultimo = len(muestras) - 1
+        return tuple(muestras[ultimo * c // 100] / 1e6 for c in cuantiles)
+
+    def resumen(self):
+        return {
+            fase: dict(zip(("p50", "p95", "p99"), self.percentiles(fase)))
+            for fase in self.fases
+        }
+
+    def exportar(self, ruta):
+        """Escribe la traza en CSV (una fila por cuadro) o JSON según la extensión."""
+        fases = list(self.fases)
+        columnas = [self._muestras(fase) for fase in fases]
+        primero = max(0, self.cuadros - self.capacidad)
+        if os.path.splitext(ruta)[1].lower() == ".json":
+            datos = {
+                "cuadros": self.cuadros,
+                "unidad": "ns",
+                "resumen_ms": self.resumen(),
+                "traza": {fase: columna for fase, columna in zip(fases, columnas)},
+            }
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump(datos, archivo, indent=2)
+            return ruta
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["cuadro"] + [f"{fase}_ns" for fase in fases])
+            for i, fila in enumerate(zip(*columnas)):
+                escritor.writerow([primero + i, *fila])
+        return ruta
@@ -0,0 +1,139 @@
+"""
+Escritura a disco en un hilo aparte para que el bucle de cuadros no espere
+a json.dump ni a fsync.
+
+Las peticiones pasan por una cola y se atienden en orden. Las escrituras
+completas de un mismo archivo se fusionan: si llega otra antes de que la
+anterior empiece, solo se escribe la última. Los anexos a un mismo archivo
+pendientes se escriben juntos con un único fsync.
+"""
+import json
+import os
+import queue
+import threading
+
+
+def escribir_json_atomico(ruta, datos, **opciones):
+    # Escribe en un temporal y lo renombra: el archivo nunca queda a medias
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w") as f:
+        json.dump(datos, f, **opciones)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class EscritorPersistente:
+    """
+    Hilo de escritura. guardar() reemplaza un archivo JSON completo; si
+    `datos` es invocable se evalúa en el hilo, justo antes de escribir, así
+    la copia del estado tampoco se hace en el bucle de cuadros.
+    """
+
+    def __init__(self):
+        self._cola = queue.Queue()
+        self._bloqueo = threading.Lock()
+        # ruta -> (datos, opciones) de la escritura completa aún no empezada
+        self._guardados = {}
+        # ruta -> líneas por anexar
+        self._anexos = {}
+        self.escrituras = 0
+        self.fusionadas = 0
+        self.errores = 0
+        self._hilo = threading.Thread(target=self._trabajar, name="persistencia", daemon=True)
+        self._hilo.start()
+
+    def guardar(self, ruta, datos, **opciones):
+        with self._bloqueo:
+            pendiente = ruta in self._guardados
+            self._guardados[ruta] = (datos, opciones)
+            if pendiente:
+                self.fusionadas += 1
+                return
+        self._cola.put(("guardar", ruta))
+
+    def anexar(self, ruta, texto):
+        with self._bloqueo:
+            lineas = self._anexos.get(ruta)
+            if lineas is not None:
+                lineas.append(texto)
+                return
+            self._anexos[ruta] = [texto]
+        self._cola.put(("anexar", ruta))
+
+    def ejecutar(self, funcion):
+        """Corre `funcion` en el hilo, en orden con las escrituras ya pedidas."""
+        self._cola.put(("ejecutar", funcion))
+
+    def flush(self):
+        """Bloquea hasta que todo lo pedido hasta ahora esté en disco."""
+        self._cola.join()
+
+    def pendientes(self):
+        return self._cola.unfinished_tasks
+
+    def _trabajar(self):
+        while True:
+            operacion, argumento = self._cola.get()
+            try:
+                if operacion == "guardar":
+                    with self._bloqueo:
+                        datos, opciones = self._guardados.pop(argumento)
+                    escribir_json_atomico(argumento, datos() if callable(datos) else datos, **opciones)
+                elif operacion == "anexar":
+                    with self._bloqueo:
+                        lineas = self._anexos.pop(argumento)
+                    with open(argumento, "a") as f:
+                        f.writelines(lineas)
+                        f.flush()
+                        os.fsync(f.fileno())
+                else:
+                    argumento()
+                self.escrituras += 1
+            except Exception as excepcion:
+                # Un error de disco no debe matar el hilo: las siguientes escrituras siguen
+                self.errores += 1
+                print(f"Error de persistencia ({operacion}): {excepcion}")
+            finally:
+                self._cola.task_done()
+
+
+class CargaPerezosa:
+    """
+    Representa a un objeto caro de crear (un salón con todo su historial)
+    y lo construye con `fabrica` en el primer acceso a un atributo.
+    cerrar() no fuerza la carga: si nunca se usó, no hay nada que cerrar.
+    """
+
+    def __init__(self, fabrica):
+        self._fabrica = fabrica
+        self._objeto = None
+
+    @property
+    def cargado(self):
+        return self._objeto is not None
+
+    def cargar(self):
+        if self._objeto is None:
+            self._objeto = self._fabrica()
+        return self._objeto
+
+    def cerrar(self):
+        if self._objeto is not None:
+            self._objeto.cerrar()
+
+    def __getattr__(self, nombre):
+        return getattr(self.cargar(), nombre)
+
+
+_escritor = None
+_bloqueo_escritor = threading.Lock()
+
+
+def escritor_por_defecto():
+    """Escritor compartido por el salón y la lista de usuarios."""
+    global _escritor
+    with _bloqueo_escritor:
+        if _escritor is None:
+            _escritor = EscritorPersistente()
+        return _escritor
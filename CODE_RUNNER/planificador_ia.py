@@ -0,0 +1,129 @@
+"""
+Planificador de la IA de enemigos.
+
+Cada enemigo se mueve una vez cada `intervalo` ticks, pero con su propia
+fase: los enemigos quedan repartidos entre los ticks en lugar de moverse
+todos en el mismo. Como con el contador que reemplaza, nadie se mueve
+antes del tick número `intervalo` después de reiniciar: el enemigo 0 lo
+hace justo en ese tick y los demás, repartidos en los siguientes. Con un presupuesto en microsegundos, los enemigos que
+no alcanzan a moverse en un tick quedan pendientes para el siguiente;
+primero se mueven los más cercanos al jugador y, a igual distancia, los
+que más esperaron.
+
+El trabajo compartido del tick (el mapa de distancias de la estrategia
+"campo") también corre dentro del presupuesto, antes de mover a nadie, y
+solo en los ticks en que algún enemigo tiene que moverse.
+
+Sin presupuesto (None) se mueven siempre todos los que tocan y el
+resultado no depende de la máquina: es lo que usan el motor sin pantalla,
+el analizador y las grabaciones.
+"""
+from time import perf_counter_ns
+
+# Cada tick de espera pesa como estas celdas de distancia: nadie queda sin moverse
+PESO_ESPERA = 2
+
+
+class PlanificadorIA:
+    def __init__(self, intervalo=1, presupuesto_us=None):
+        self.intervalo = max(1, intervalo)
+        self.presupuesto_us = presupuesto_us
+        self.tick = 0
+        self.cantidad = 0
+        # fase -> índices de enemigos que se mueven en los ticks número
+        # intervalo + fase, 2 * intervalo + fase, ... (contando desde 1)
+        self._turnos = [[] for _ in range(self.intervalo)]
+        # índice -> tick en que le tocó moverse
+        self.pendientes = {}
+        self.movidos = 0
+        self.excesos = 0
+        self.ticks_con_arrastre = 0
+        self.max_pendientes = 0
+        self.max_us = 0.0
+        self.ultimo_us = 0.0
+
+    def preparar(self, cantidad, intervalo):
+        """Reparte las fases si cambió la cantidad de enemigos o el intervalo."""
+        intervalo = max(1, intervalo)
+        if cantidad == self.cantidad and intervalo == self.intervalo:
+            return
+        self.cantidad = cantidad
+        self.intervalo = intervalo
+        self._turnos = [[] for _ in range(intervalo)]
+        for indice in range(cantidad):
+            # Fases equiespaciadas: cada tick recibe cantidad / intervalo enemigos
+            self._turnos[indice * intervalo // cantidad].append(indice)
+        self.pendientes.clear()
+
+    def reiniciar(self):
+        self.tick = 0
+        self.pendientes.clear()
+
+    def ejecutar(self, posiciones, objetivo, mover, antes=None):
+        """
+        Si algún enemigo tiene que moverse, llama a antes(limite_ns) y después
+        a mover(indice) con los que tocan en este tick, por prioridad, hasta
+        agotar el presupuesto. `limite_ns` es el perf_counter_ns en que se
+        acaba el presupuesto (None sin presupuesto). Devuelve cuántos se
+        movieron.
+        """
+        inicio = perf_counter_ns()
+        tick = self.tick
+        self.tick += 1
+        pendientes = self.pendientes
+        if self.tick >= self.intervalo:
+            for indice in self._turnos[self.tick % self.intervalo]:
+                pendientes.setdefault(indice, tick)
+        if not pendientes:
+            self.ultimo_us = 0.0
+            return 0
+        presupuesto = self.presupuesto_us
+        limite = None if presupuesto is None else inicio + presupuesto * 1000
+        if antes is not None:
+            antes(limite)
+        if limite is not None and perf_counter_ns() >= limite:
+            # El trabajo compartido ya gastó el presupuesto
+            orden = ()
+        elif presupuesto is None:
+            # Se mueven todos: el orden no cambia el resultado
+            orden = list(pendientes)
+        else:
+            objetivo_x, objetivo_y = objetivo
+            orden = sorted(
+                pendientes,
+                key=lambda i: (
+                    abs(posiciones[i][0] - objetivo_x) + abs(posiciones[i][1] - objetivo_y)
+                    - PESO_ESPERA * (tick - pendientes[i]),
+                    i,
+                ),
+            )
+        movidos = 0
+        for indice in orden:
+            # Al menos uno por tick si queda presupuesto, aunque sea muy chico
+            if limite is not None and movidos and perf_counter_ns() >= limite:
+                break
+            mover(indice)
+            del pendientes[indice]
+            movidos += 1
+        duracion = (perf_counter_ns() - inicio) / 1000
+        self.ultimo_us = duracion
+        self.max_us = max(self.max_us, duracion)
+        self.movidos += movidos
+        if presupuesto is not None and duracion > presupuesto:
+            self.excesos += 1
+        if pendientes:
+            self.ticks_con_arrastre += 1
+            self.max_pendientes = max(self.max_pendientes, len(pendientes))
+        return movidos
+
+    def estadisticas(self):
+        return {
+            "ticks": self.tick,
+            "movidos": self.movidos,
+            "pendientes": len(self.pendientes),
+            "max_pendientes": self.max_pendientes,
+            "ticks_con_arrastre": self.ticks_con_arrastre,
+            "excesos": self.excesos,
+            "ultimo_us": self.ultimo_us,
+            "max_us": self.max_us,
+        }
@@ -1,29 +1,272 @@
 import json
 import os
+import threading
 from datetime import datetime
 
+from lista_ordenada import ListaOrdenada
+from persistencia import escribir_json_atomico, escritor_por_defecto
+
+
+def _registro_valido(registro):
+    return (
+        isinstance(registro, dict)
+        and isinstance(registro.get("seq"), int)
+        and isinstance(registro.get("usuario"), str)
+        and (
+            registro.get("op") == "eliminar"
+            or (registro.get("op") == "registrar" and isinstance(registro.get("partida"), dict))
+        )
+    )
+
+
+def _aplicar_registro(puntuaciones, registro):
+    usuario = registro["usuario"]
+    if registro["op"] == "registrar":
+        puntuaciones.setdefault(usuario, []).append(registro["partida"])
+    elif registro["op"] == "eliminar":
+        puntuaciones.pop(usuario, None)
+
+
+def secuencia_base(puntuaciones):
+    """Mayor secuencia de diario ya incluida en una instantánea."""
+    base = 0
+    for partidas in puntuaciones.values():
+        for partida in partidas if isinstance(partidas, list) else []:
+            if isinstance(partida, dict):
+                base = max(base, partida.get("seq", 0))
+    return base
+
+
+def analizar_diario(contenido):
+    """
+    Separa el contenido (bytes) de un diario en sus registros válidos, sin
+    tocar el disco. Devuelve (registros, dañados, valido): los números de
+    línea dañados en medio del diario y los bytes hasta el final del último
+    registro completo; si `valido` es menor que el contenido, la cola quedó
+    truncada por un cierre abrupto.
+    """
+    lineas = contenido.splitlines(keepends=True)
+    registros = []
+    danados = []
+    valido = 0
+    for numero, linea in enumerate(lineas, 1):
+        try:
+            if not linea.endswith(b"\n"):
+                raise ValueError("registro incompleto")
+            registro = json.loads(linea)
+        except ValueError:
+            registro = None
+        if not _registro_valido(registro):
+            if numero == len(lineas):
+                break
+            # Una línea dañada en medio no invalida las que la siguen
+            danados.append(numero)
+        else:
+            registros.append(registro)
+        valido += len(linea)
+    return registros, danados, valido
+
+
+def leer_puntuaciones(archivo, ruta_diario=None):
+    """
+    Lee la instantánea y, si se indica, reproduce su diario; sin efectos
+    sobre los archivos. A diferencia del salón, un archivo ilegible o una
+    línea dañada en medio del diario lanzan ValueError en lugar de apartarse
+    o ignorarse; solo se descarta una cola truncada.
+    """
+    puntuaciones = {}
+    if os.path.exists(archivo):
+        with open(archivo, "r") as f:
+            datos = json.load(f)
+        if isinstance(datos, dict):
+            puntuaciones = datos
+        elif datos != []:
+            raise ValueError(f"{archivo}: se esperaba un objeto JSON y hay {type(datos).__name__}")
+    if ruta_diario is not None and os.path.exists(ruta_diario):
+        with open(ruta_diario, "rb") as f:
+            registros, danados, _ = analizar_diario(f.read())
+        if danados:
+            raise ValueError(f"{ruta_diario}: registros dañados en las líneas {danados}")
+        base = secuencia_base(puntuaciones)
+        for registro in registros:
+            if registro["seq"] > base:
+                _aplicar_registro(puntuaciones, registro)
+    return puntuaciones
+
+
 class SalonDeLaFama:
-    def __init__(self, archivo="puntuaciones.json"):
+    def __init__(self, archivo="puntuaciones.json", diario=False, umbral_compactacion=500, escritor=None, almacen=None):
         self.archivo = archivo
+        # Con un AlmacenSQLite las puntuaciones viven en la base y no en memoria
+        self.almacen = almacen
+        # Modo diario: cada partida se anexa como un registro a archivo.diario
+        # y la instantánea completa solo se reescribe al compactar
+        self.diario = diario and almacen is None
+        self.ruta_diario = f"{archivo}.diario"
+        self.umbral_compactacion = umbral_compactacion
+        # Todo acceso al disco después de cargar pasa por el hilo del escritor
+        self.escritor = escritor or escritor_por_defecto()
+        self._bloqueo = threading.Lock()
+        self._compactacion_pendiente = False
+        self._registros_diario = 0
+        self._secuencia = 0
+        if almacen is not None:
+            return
         self.puntuaciones = self._cargar_puntuaciones()
+        if self.diario:
+            self._reproducir_diario()
+        self._reconstruir_indice()
 
     def _cargar_puntuaciones(self):
         if os.path.exists(self.archivo):
             try:
                 with open(self.archivo, "r") as f:
-                    return json.load(f)
-            except:
+                    datos = json.load(f)
+            except (OSError, ValueError) as excepcion:
+                # No se sobrescribe un archivo ilegible: se aparta para revisarlo
+                self._apartar_archivo(excepcion)
                 return {}
+            if isinstance(datos, dict):
+                return datos
+            # La lista vacía "[]" que trae el repositorio es una tabla vacía; otra
+            # forma puede ser un archivo ajeno con datos: se aparta antes de que
+            # el próximo guardado o compactación lo reemplace
+            if datos != []:
+                self._apartar_archivo(f"se esperaba un objeto JSON y hay {type(datos).__name__}")
         return {}
 
+    def _apartar_archivo(self, motivo):
+        destino = f"{self.archivo}.corrupto"
+        try:
+            os.replace(self.archivo, destino)
+        except OSError as excepcion:
+            print(f"Error cargando puntuaciones: {motivo}; no se pudo mover a {destino}: {excepcion}")
+            return
+        print(f"Error cargando puntuaciones: {motivo}; se movió a {destino}")
+
+    def _reproducir_diario(self):
+        # Los registros con secuencia <= a la mayor de la instantánea ya están
+        # incluidos en ella (una compactación pudo interrumpirse a mitad)
+        base = secuencia_base(self.puntuaciones)
+        self._secuencia = base
+        if not os.path.exists(self.ruta_diario):
+            return
+        with open(self.ruta_diario, "rb") as f:
+            contenido = f.read()
+        registros, danados, valido = analizar_diario(contenido)
+        for numero in danados:
+            print(f"Diario de puntuaciones: se ignora el registro {numero}, dañado")
+        if valido < len(contenido):
+            # Cola truncada por un cierre abrupto: se descarta
+            print(f"Diario de puntuaciones truncado en el byte {valido}")
+            with open(self.ruta_diario, "r+b") as f:
+                f.truncate(valido)
+        for registro in registros:
+            self._registros_diario += 1
+            self._secuencia = max(self._secuencia, registro["seq"])
+            if registro["seq"] > base:
+                _aplicar_registro(self.puntuaciones, registro)
+
+    def _anexar_registro(self, registro):
+        with self._bloqueo:
+            self._secuencia += 1
+            registro["seq"] = self._secuencia
+            if "partida" in registro:
+                registro["partida"]["seq"] = self._secuencia
+            self._registros_diario += 1
+            _aplicar_registro(self.puntuaciones, registro)
+            pendiente = self._registros_diario >= self.umbral_compactacion
+        # La memoria ya está al día; el anexo y su fsync quedan para el escritor
+        self.escritor.anexar(self.ruta_diario, json.dumps(registro) + "\n")
+        if pendiente:
+            self.compactar()
+
+    def compactar(self, esperar=False):
+        """Reescribe la instantánea en segundo plano y recorta el diario."""
+        if not self.diario:
+            return
+        with self._bloqueo:
+            encolar = not self._compactacion_pendiente
+            self._compactacion_pendiente = True
+        if encolar:
+            self.escritor.ejecutar(self._compactar)
+        if esperar:
+            self.escritor.flush()
+
+    def _compactar(self):
+        # Corre en el hilo del escritor: ningún anexo puede colarse mientras tanto
+        with self._bloqueo:
+            copia = {usuario: list(partidas) for usuario, partidas in self.puntuaciones.items()}
+            secuencia = self._secuencia
+            self._compactacion_pendiente = False
+        escribir_json_atomico(self.archivo, copia, indent=4)
+        # Conserva solo lo anexado después de la copia
+        restantes = []
+        if os.path.exists(self.ruta_diario):
+            with open(self.ruta_diario, "r") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except ValueError:
+                        continue
+                    # Los registros dañados ya se ignoraron al cargar: no se conservan
+                    if _registro_valido(registro) and registro["seq"] > secuencia:
+                        restantes.append(linea)
+        temporal = f"{self.ruta_diario}.tmp"
+        with open(temporal, "w") as f:
+            f.writelines(restantes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta_diario)
+        with self._bloqueo:
+            # Las secuencias son consecutivas: cuenta también lo que sigue en la cola
+            self._registros_diario = self._secuencia - secuencia
+
+    def cerrar(self):
+        """Espera a que todo lo registrado esté en disco y cierra la base."""
+        self.escritor.flush()
+        if self.almacen is not None:
+            # Al cerrar la última conexión SQLite vuelca el WAL a la base
+            self.almacen.cerrar()
+
+    def _reconstruir_indice(self):
+        # Mejor puntuación por usuario y lista ordenada de (-puntuacion, usuario)
+        self.mejores = {}
+        for usuario, partidas in self.puntuaciones.items():
+            if not isinstance(partidas, list):
+                continue
+            valores = [
+                p.get("puntuacion", 0) for p in partidas if isinstance(p, dict)
+            ]
+            if valores:
+                self.mejores[usuario] = max(valores)
+        self.orden = ListaOrdenada((-mejor, usuario) for usuario, mejor in self.mejores.items())
+
+    def _actualizar_indice(self, usuario, puntuacion):
+        anterior = self.mejores.get(usuario)
+        if anterior is not None:
+            if puntuacion <= anterior:
+                return
+            self._quitar_del_indice(usuario)
+        self.mejores[usuario] = puntuacion
+        self.orden.agregar((-puntuacion, usuario))
+
+    def _quitar_del_indice(self, usuario):
+        anterior = self.mejores.pop(usuario, None)
+        if anterior is None:
+            return
+        self.orden.quitar((-anterior, usuario))
+
+    def _copiar_puntuaciones(self):
+        with self._bloqueo:
+            return {usuario: list(partidas) for usuario, partidas in self.puntuaciones.items()}
+
     def _guardar_puntuaciones(self):
-        with open(self.archivo, "w") as f:
-            json.dump(self.puntuaciones, f, indent=4)
+        # La copia se hace en el hilo del escritor, una vez por ráfaga de cambios
+        self.escritor.guardar(self.archivo, self._copiar_puntuaciones, indent=4)
 
     # ACEPTA NIVEL Y NOMBRE_LABERINTO
     def registrar_puntuacion(self, usuario, puntuacion, nivel, nombre_laberinto, tiempo=None):
-        if usuario not in self.puntuaciones:
-            self.puntuaciones[usuario] = []
         data = {
             "puntuacion": puntuacion,
             "nivel": nivel,
@@ -32,30 +275,51 @@ class SalonDeLaFama:
         }
         if tiempo is not None:
             data["tiempo"] = tiempo
-        self.puntuaciones[usuario].append(data)
-        self._guardar_puntuaciones()
+        if self.almacen is not None:
+            self.escritor.ejecutar(lambda: self.almacen.registrar_partida(usuario, data))
+            return
+        if self.diario:
+            self._anexar_registro({"op": "registrar", "usuario": usuario, "partida": data})
+        else:
+            with self._bloqueo:
+                self.puntuaciones.setdefault(usuario, []).append(data)
+            self._guardar_puntuaciones()
+        self._actualizar_indice(usuario, puntuacion)
 
-    def obtener_ranking_global(self):
-        ranking = []
-        for usuario, partidas in self.puntuaciones.items():
-            if partidas:
-                mejor_puntuacion = max(p["puntuacion"] for p in partidas)
-                ranking.append((usuario, mejor_puntuacion))
+    def obtener_ranking_global(self, limite=10):
+        if self.almacen is not None:
+            return self.almacen.ranking_global(limite)
+        # Filas ya ordenadas desde el índice en memoria, sin tocar el disco
+        filas = self.orden if limite is None else self.orden.primeros(limite)
+        return [
+            {"usuario": usuario, "puntuacion": -puntuacion}
+            for puntuacion, usuario in filas
+        ]
 
-        ranking.sort(key=lambda x: x[1], reverse=True)
+    def formatear_ranking_global(self, limite=None):
+        ranking = self.obtener_ranking_global(limite)
 
         if not ranking:
             return "No hay puntuaciones registradas."
 
         resultado = "=== RANKING GLOBAL ===\n"
-        for i, (usuario, puntuacion) in enumerate(ranking, 1):
-            resultado += f"{i}. {usuario}: {puntuacion} puntos\n"
+        for i, fila in enumerate(ranking, 1):
+            resultado += f"{i}. {fila['usuario']}: {fila['puntuacion']} puntos\n"
 
         return resultado
 
     def eliminar_puntuaciones_usuario(self, usuario):
+        if self.almacen is not None:
+            # Acción de administración: primero se aplica lo que sigue en la cola
+            self.escritor.flush()
+            return self.almacen.eliminar_partidas(usuario)
         if usuario in self.puntuaciones:
-            del self.puntuaciones[usuario]
-            self._guardar_puntuaciones()
+            if self.diario:
+                self._anexar_registro({"op": "eliminar", "usuario": usuario})
+            else:
+                with self._bloqueo:
+                    del self.puntuaciones[usuario]
+                self._guardar_puntuaciones()
+            self._quitar_del_indice(usuario)
             return True
         return False
@@ -0,0 +1,610 @@
+"""
+Servidor de partidas: muchas sesiones independientes en un único bucle
+asyncio, cada una con su propio MotorJuego y su propia tasa de ticks.
+
+Los clientes se conectan por un socket Unix o TCP local. Tras el saludo
+el servidor manda el laberinto y, en cada tick, solo lo que cambió desde
+el último envío; el cliente manda la máscara de direcciones cuando cambia.
+Los niveles se cargan una vez y todas las sesiones comparten las grillas
+y los índices de aparición.
+
+Mensajes (little-endian): largo de la carga u32, tipo u8 y la carga.
+    cliente -> servidor
+        HOLA          tasa u16, nivel u16, semilla u64 (0: al azar); otra
+                      vez HOLA empieza una partida nueva en la misma sesión
+        ENTRADA       máscara de direcciones u8 (la de grabacion.py)
+        ESTADISTICAS  sin carga; se responde con un JSON
+    servidor -> cliente
+        NIVEL         nivel u16, columnas u16, filas u16, colores de pared,
+                      suelo y enemigo (9 bytes) y las celdas, una por byte
+        DELTA         tick u32, banderas u8 y un bloque por bandera activa
+        FIN           estado u8, puntuación final u32
+        ESTADISTICAS  JSON utf-8
+
+Uso:
+    python servidor.py servir [--unix RUTA | --puerto 7777] [--presupuesto-us 1000]
+    python servidor.py carga --sesiones 50,100,200 [--duracion 5] [--unix RUTA | --puerto 7777]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+from aparicion import IndiceAparicion
+from grabacion import BIT_DIRECCION, ENTRADAS_MASCARA
+from motor import TASA_LOGICA, TIPOS_POTENCIADOR, MotorJuego
+from perfilador import Perfilador
+
+MENSAJE = struct.Struct("<IB")
+HOLA = struct.Struct("<HHQ")
+ENTRADA = struct.Struct("<B")
+NIVEL = struct.Struct("<HHH9s")
+DELTA = struct.Struct("<IB")
+FIN = struct.Struct("<BI")
+CANTIDAD = struct.Struct("<H")
+POSICION = struct.Struct("<HH")
+CAMBIO_ENEMIGO = struct.Struct("<HHH")
+MARCADOR = struct.Struct("<BIB")
+
+TIPO_HOLA = 1
+TIPO_ENTRADA = 2
+TIPO_ESTADISTICAS = 3
+TIPO_NIVEL = 16
+TIPO_DELTA = 17
+TIPO_FIN = 18
+
+# Bloques de un DELTA, en este orden
+JUGADOR = 1
+ENEMIGOS = 2  # cantidad u16 + (índice u16, x u16, y u16) de los que se movieron
+ENEMIGOS_TODOS = 4  # cantidad u16 + (x u16, y u16) de todos
+ESTRELLAS = 8
+POTENCIADORES = 16
+MARCADOR_CAMBIO = 32  # vidas u8, puntuación u32, potenciador activo u8
+
+ESTADOS = ("JUEGO", "GAME_OVER")
+POTENCIADORES_ACTIVOS = (None, *TIPOS_POTENCIADOR)
+
+TASA_POR_DEFECTO = TASA_LOGICA
+TASA_MAXIMA = 240
+# La IA nunca recibe menos de esta fracción (1/PISO_IA) del presupuesto del tick
+PISO_IA = 10
+# Con este atraso (en ticks) la sesión deja de recuperar y salta al presente
+MAX_ATRASO = 5
+# Con más bytes sin enviar al cliente no se encolan más deltas: el siguiente
+# se calcula contra lo último enviado y lleva todos los cambios acumulados
+LIMITE_BUFER = 256 * 1024
+PUERTO = 7777
+
+
+def mensaje(tipo, carga=b""):
+    return MENSAJE.pack(len(carga), tipo) + carga
+
+
+def separar_mensajes(bufer):
+    """Saca de `bufer` (bytearray) los mensajes completos como (tipo, carga)."""
+    mensajes = []
+    posicion = 0
+    while len(bufer) - posicion >= MENSAJE.size:
+        largo, tipo = MENSAJE.unpack_from(bufer, posicion)
+        fin = posicion + MENSAJE.size + largo
+        if fin > len(bufer):
+            break
+        mensajes.append((tipo, bytes(bufer[posicion + MENSAJE.size:fin])))
+        posicion = fin
+    del bufer[:posicion]
+    return mensajes
+
+
+def _posiciones(posiciones):
+    datos = bytearray(CANTIDAD.pack(len(posiciones)))
+    for x, y in posiciones:
+        datos += POSICION.pack(x, y)
+    return datos
+
+
+def _leer_posiciones(carga, posicion):
+    (cantidad,) = CANTIDAD.unpack_from(carga, posicion)
+    posicion += CANTIDAD.size
+    posiciones = [POSICION.unpack_from(carga, posicion + i * POSICION.size) for i in range(cantidad)]
+    return posiciones, posicion + cantidad * POSICION.size
+
+
+class EstadoRemoto:
+    """Copia del estado de una sesión armada con los mensajes del servidor."""
+
+    def __init__(self):
+        self.nivel = None
+        self.columnas = self.filas = 0
+        self.celdas = b""
+        self.colores = ((80, 80, 80), (220, 230, 245), (220, 50, 50))
+        self.tick = 0
+        self.jugador = (0, 0)
+        self.enemigos = []
+        self.estrellas = []
+        self.potenciadores = []
+        self.vidas = 0
+        self.puntuacion = 0
+        self.potenciador_activo = None
+        self.estado = "JUEGO"
+        self.estadisticas = None
+
+    def aplicar(self, tipo, carga):
+        if tipo == TIPO_DELTA:
+            self.tick, banderas = DELTA.unpack_from(carga)
+            posicion = DELTA.size
+            if banderas & JUGADOR:
+                self.jugador = POSICION.unpack_from(carga, posicion)
+                posicion += POSICION.size
+            if banderas & ENEMIGOS:
+                (cantidad,) = CANTIDAD.unpack_from(carga, posicion)
+                posicion += CANTIDAD.size
+                for _ in range(cantidad):
+                    indice, x, y = CAMBIO_ENEMIGO.unpack_from(carga, posicion)
+                    self.enemigos[indice] = (x, y)
+                    posicion += CAMBIO_ENEMIGO.size
+            if banderas & ENEMIGOS_TODOS:
+                self.enemigos, posicion = _leer_posiciones(carga, posicion)
+            if banderas & ESTRELLAS:
+                self.estrellas, posicion = _leer_posiciones(carga, posicion)
+            if banderas & POTENCIADORES:
+                self.potenciadores, posicion = _leer_posiciones(carga, posicion)
+            if banderas & MARCADOR_CAMBIO:
+                self.vidas, self.puntuacion, potenciador = MARCADOR.unpack_from(carga, posicion)
+                self.potenciador_activo = POTENCIADORES_ACTIVOS[potenciador]
+        elif tipo == TIPO_NIVEL:
+            self.nivel, self.columnas, self.filas, colores = NIVEL.unpack_from(carga)
+            self.colores = tuple(tuple(colores[i:i + 3]) for i in range(0, 9, 3))
+            self.celdas = carga[NIVEL.size:]
+            self.estado = "JUEGO"
+        elif tipo == TIPO_FIN:
+            estado, self.puntuacion = FIN.unpack_from(carga)
+            self.estado = ESTADOS[estado]
+        elif tipo == TIPO_ESTADISTICAS:
+            self.estadisticas = json.loads(carga.decode("utf-8"))
+
+
+class DatosCompartidos:
+    """Niveles, grillas e índices de aparición que comparten todas las sesiones."""
+
+    def __init__(self, ruta_niveles="niveles.json"):
+        self.ruta_niveles = ruta_niveles
+        # Un motor solo para leer niveles.json (o su paquete) una vez
+        self.niveles = MotorJuego(ruta_niveles=ruta_niveles).niveles
+        self.grillas = {}
+        self.indices = {}
+
+
+class MotorSesion(MotorJuego):
+    """
+    Motor de una sesión del servidor. Las grillas no cambian durante la
+    partida, así que cada nivel se construye una sola vez para todas.
+    """
+
+    def __init__(self, compartidos, semilla):
+        self.compartidos = compartidos
+        super().__init__(niveles=compartidos.niveles, ruta_niveles=compartidos.ruta_niveles, semilla=semilla)
+
+    def _construir_laberinto(self, nivel):
+        grilla = self.compartidos.grillas.get(self.nivel_actual)
+        if grilla is None:
+            grilla = super()._construir_laberinto(nivel)
+            self.compartidos.grillas[self.nivel_actual] = grilla
+        return grilla
+
+    def _indice_aparicion(self):
+        indices = self.compartidos.indices
+        indice = indices.get(self.nivel_actual)
+        if indice is None:
+            indice = IndiceAparicion(self.LABERINTO, self._obtener_celda_libre_jugador())
+            indices[self.nivel_actual] = indice
+        return indice
+
+
+class Sesion:
+    """
+    Una partida conectada. Avanza a su propia tasa en una tarea del bucle.
+
+    `presupuesto_us` es un tope blando: solo la IA de enemigos se corta a
+    mitad de tick, y recibe lo que el resto del tick anterior (reglas,
+    codificar y enviar) dejó libre. Nada corta el resto del tick, ni la
+    búsqueda A* o HPA de un enemigo. Un tick puede pasarse del tope; el
+    exceso se cuenta en `excesos` y se descuenta alargando la espera hasta
+    el siguiente. Así una sesión pesada se frena sola sin atrasar a las
+    demás.
+    """
+
+    def __init__(self, servidor, escritor):
+        self.servidor = servidor
+        self.escritor = escritor
+        self.motor = None
+        self.tarea = None
+        self.tasa = TASA_POR_DEFECTO
+        self.entradas = ()
+        self.ticks = 0
+        self.excesos = 0
+        self.saltados = 0
+        self.descartados = 0
+        self.max_us = 0.0
+        self._enviado = None
+
+    def empezar(self, tasa, nivel, semilla):
+        self.detener()
+        self.tasa = min(max(1, tasa), TASA_MAXIMA)
+        semilla = semilla or int.from_bytes(os.urandom(8), "little")
+        if self.motor is None:
+            self.motor = MotorSesion(self.servidor.compartidos, semilla)
+        # Al empezar, la mitad del presupuesto para la IA; después, lo que deja
+        # el resto del tick. Los enemigos que no alcanzan pasan al siguiente
+        presupuesto = self.servidor.presupuesto_us
+        self.motor.PRESUPUESTO_IA_US = None if presupuesto is None else presupuesto // 2
+        self.motor.reiniciar(nivel % len(self.motor.niveles), semilla)
+        self.entradas = ()
+        self._enviado = None
+        self._enviar(self._codificar())
+        self.tarea = asyncio.create_task(self._bucle())
+
+    def detener(self):
+        if self.tarea is not None:
+            self.tarea.cancel()
+            self.tarea = None
+
+    def _enviar(self, datos):
+        if datos:
+            self.escritor.write(datos)
+            self.servidor.bytes_enviados += len(datos)
+
+    async def _bucle(self):
+        bucle = asyncio.get_running_loop()
+        servidor = self.servidor
+        perfilador = servidor.perfilador
+        motor = self.motor
+        periodo = 1.0 / self.tasa
+        siguiente = bucle.time()
+        while True:
+            inicio = perfilador.reloj()
+            motor.paso(self.entradas)
+            perfilador.registrar("tick", inicio)
+            inicio_envio = perfilador.reloj()
+            if self.escritor.transport.get_write_buffer_size() > LIMITE_BUFER:
+                self.descartados += 1
+                servidor.descartados += 1
+            else:
+                self._enviar(self._codificar())
+            perfilador.registrar("envio", inicio_envio)
+            perfilador.cerrar_cuadro()
+            duracion_us = (perfilador.reloj() - inicio) / 1000
+            self.ticks += 1
+            servidor.ticks += 1
+            self.max_us = max(self.max_us, duracion_us)
+            if motor.estado != "JUEGO":
+                self._enviar(mensaje(TIPO_FIN, FIN.pack(ESTADOS.index(motor.estado), motor.puntuacion_final)))
+                self.tarea = None
+                return
+            siguiente += periodo
+            presupuesto = servidor.presupuesto_us
+            if presupuesto is not None:
+                resto_us = max(0.0, duracion_us - motor.controlador_enemigos.planificador.ultimo_us)
+                motor.PRESUPUESTO_IA_US = max(presupuesto // PISO_IA, int(presupuesto - resto_us))
+                if duracion_us > presupuesto:
+                    self.excesos += 1
+                    servidor.excesos += 1
+                    siguiente += (duracion_us - presupuesto) / 1e6
+            espera = siguiente - bucle.time()
+            if espera < -MAX_ATRASO * periodo:
+                saltados = int(-espera / periodo)
+                self.saltados += saltados
+                servidor.saltados += saltados
+                siguiente = bucle.time()
+                espera = 0
+            await asyncio.sleep(max(0.0, espera))
+
+    def _codificar(self):
+        """NIVEL si cambió el laberinto y el DELTA contra lo último enviado."""
+        motor = self.motor
+        anterior = self._enviado
+        partes = []
+        if anterior is None or anterior["laberinto"] is not motor.LABERINTO:
+            partes.append(self._codificar_nivel())
+            anterior = None
+        actual = {
+            "laberinto": motor.LABERINTO,
+            "jugador": (motor.posicion_x, motor.posicion_y),
+            "enemigos": list(motor.enemigos),
+            "estrellas": tuple(motor.estrellas),
+            "potenciadores": tuple(motor.potenciadores),
+            "marcador": (motor.vidas, motor.puntuacion, POTENCIADORES_ACTIVOS.index(motor.potenciador_activo)),
+        }
+        banderas = 0
+        bloques = bytearray()
+        if anterior is None or actual["jugador"] != anterior["jugador"]:
+            banderas |= JUGADOR
+            bloques += POSICION.pack(*actual["jugador"])
+        enemigos = actual["enemigos"]
+        if anterior is None or len(enemigos) != len(anterior["enemigos"]):
+            banderas |= ENEMIGOS_TODOS
+            bloques += _posiciones(enemigos)
+        else:
+            movidos = [
+                indice for indice, (antes, ahora) in enumerate(zip(anterior["enemigos"], enemigos))
+                if antes != ahora
+            ]
+            if len(movidos) * CAMBIO_ENEMIGO.size > len(enemigos) * POSICION.size:
+                # Se movieron casi todos: la lista completa ocupa menos
+                banderas |= ENEMIGOS_TODOS
+                bloques += _posiciones(enemigos)
+            elif movidos:
+                banderas |= ENEMIGOS
+                bloques += CANTIDAD.pack(len(movidos))
+                for indice in movidos:
+                    bloques += CAMBIO_ENEMIGO.pack(indice, *enemigos[indice])
+        if anterior is None or actual["estrellas"] != anterior["estrellas"]:
+            banderas |= ESTRELLAS
+            bloques += _posiciones(actual["estrellas"])
+        if anterior is None or actual["potenciadores"] != anterior["potenciadores"]:
+            banderas |= POTENCIADORES
+            bloques += _posiciones(actual["potenciadores"])
+        if anterior is None or actual["marcador"] != anterior["marcador"]:
+            banderas |= MARCADOR_CAMBIO
+            bloques += MARCADOR.pack(*actual["marcador"])
+        self._enviado = actual
+        if banderas:
+            partes.append(mensaje(TIPO_DELTA, DELTA.pack(motor.ticks, banderas) + bloques))
+        return b"".join(partes)
+
+    def _codificar_nivel(self):
+        motor = self.motor
+        colores = motor.niveles[motor.nivel_actual].get("colores", {})
+        rgb = bytes(
+            componente
+            for clave, por_defecto in (("pared", (80, 80, 80)), ("suelo", (220, 230, 245)), ("enemigo", (220, 50, 50)))
+            for componente in colores.get(clave, por_defecto)
+        )
+        laberinto = motor.LABERINTO
+        return mensaje(
+            TIPO_NIVEL,
+            NIVEL.pack(motor.nivel_actual, laberinto.columnas, laberinto.filas, rgb) + bytes(laberinto.celdas),
+        )
+
+
+class Servidor:
+    def __init__(self, ruta_niveles="niveles.json", presupuesto_us=1000):
+        self.compartidos = DatosCompartidos(ruta_niveles)
+        # Microsegundos por tick de cada sesión (None: sin tope)
+        self.presupuesto_us = presupuesto_us
+        self.sesiones = set()
+        # Una fila por tick de sesión: "tick" es el motor y "envio" el delta
+        self.perfilador = Perfilador(capacidad=8192)
+        self.ticks = 0
+        self.excesos = 0
+        self.saltados = 0
+        self.descartados = 0
+        self.bytes_enviados = 0
+        self.conexiones = 0
+        self.retraso_max_ms = 0.0
+
+    async def atender(self, lector, escritor):
+        sesion = Sesion(self, escritor)
+        self.sesiones.add(sesion)
+        self.conexiones += 1
+        bufer = bytearray()
+        try:
+            while True:
+                datos = await lector.read(4096)
+                if not datos:
+                    break
+                bufer += datos
+                for tipo, carga in separar_mensajes(bufer):
+                    if tipo == TIPO_ENTRADA:
+                        sesion.entradas = ENTRADAS_MASCARA[ENTRADA.unpack(carga)[0] & 0xF]
+                    elif tipo == TIPO_HOLA:
+                        sesion.empezar(*HOLA.unpack(carga))
+                    elif tipo == TIPO_ESTADISTICAS:
+                        escritor.write(mensaje(TIPO_ESTADISTICAS, json.dumps(self.estadisticas()).encode("utf-8")))
+        except (ConnectionError, struct.error):
+            # Cliente caído o mensaje mal formado: se cierra solo esta sesión
+            pass
+        finally:
+            sesion.detener()
+            self.sesiones.discard(sesion)
+            escritor.close()
+
+    async def vigilar_bucle(self, intervalo=0.05):
+        # Cuánto se atrasa una espera corta: mide si el bucle está saturado
+        bucle = asyncio.get_running_loop()
+        while True:
+            inicio = bucle.time()
+            await asyncio.sleep(intervalo)
+            self.retraso_max_ms = max(self.retraso_max_ms, (bucle.time() - inicio - intervalo) * 1000)
+
+    def estadisticas(self):
+        """Contadores acumulados; el retraso máximo del bucle se reinicia al leerlo."""
+        tick_ms = self.perfilador.percentiles("tick")
+        envio_ms = self.perfilador.percentiles("envio")
+        activas = [sesion for sesion in self.sesiones if sesion.tarea is not None]
+        resultado = {
+            "sesiones": len(activas),
+            "conexiones": self.conexiones,
+            "tasa_objetivo": sum(sesion.tasa for sesion in activas),
+            "ticks": self.ticks,
+            "excesos": self.excesos,
+            "saltados": self.saltados,
+            "descartados": self.descartados,
+            "bytes_enviados": self.bytes_enviados,
+            "cpu_s": time.process_time(),
+            "reloj_s": time.perf_counter(),
+            "tick_us": dict(zip(("p50", "p95", "p99"), (valor * 1000 for valor in tick_ms))),
+            "envio_us": dict(zip(("p50", "p95", "p99"), (valor * 1000 for valor in envio_ms))),
+            "retraso_max_ms": self.retraso_max_ms,
+        }
+        self.retraso_max_ms = 0.0
+        return resultado
+
+
+async def servir(args):
+    servidor = Servidor(args.niveles, args.presupuesto_us or None)
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        servicio = await asyncio.start_unix_server(servidor.atender, path=args.unix)
+        direccion = args.unix
+    else:
+        servicio = await asyncio.start_server(servidor.atender, "127.0.0.1", args.puerto)
+        direccion = f"127.0.0.1:{args.puerto}"
+    print(f"Sirviendo {len(servidor.compartidos.niveles)} niveles en {direccion}")
+    asyncio.create_task(servidor.vigilar_bucle())
+    async with servicio:
+        anterior = servidor.estadisticas()
+        while True:
+            await asyncio.sleep(args.informe)
+            actual = servidor.estadisticas()
+            duracion = actual["reloj_s"] - anterior["reloj_s"]
+            print(
+                f"{actual['sesiones']} sesiones  "
+                f"{(actual['ticks'] - anterior['ticks']) / duracion:.0f} ticks/s "
+                f"(objetivo {actual['tasa_objetivo']})  "
+                f"cpu {(actual['cpu_s'] - anterior['cpu_s']) / duracion:.0%}  "
+                f"tick p99 {actual['tick_us']['p99']:.0f} us  "
+                f"excesos {actual['excesos'] - anterior['excesos']}  "
+                f"retraso {actual['retraso_max_ms']:.1f} ms"
+            )
+            anterior = actual
+
+
+async def abrir_conexion(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection("127.0.0.1", args.puerto)
+
+
+async def _cliente_carga(args, rng, recibido):
+    """Juega al azar: cambia de dirección cada tanto y decodifica cada delta."""
+    lector, escritor = await abrir_conexion(args)
+    estado = EstadoRemoto()
+    escritor.write(mensaje(TIPO_HOLA, HOLA.pack(args.tasa, 0, rng.getrandbits(32) + 1)))
+
+    async def mover():
+        while True:
+            await asyncio.sleep(rng.uniform(0.1, 0.5))
+            mascara = BIT_DIRECCION[rng.choice(list(BIT_DIRECCION))] if rng.random() < 0.8 else 0
+            escritor.write(mensaje(TIPO_ENTRADA, ENTRADA.pack(mascara)))
+
+    tarea = asyncio.create_task(mover())
+    bufer = bytearray()
+    try:
+        while True:
+            datos = await lector.read(65536)
+            if not datos:
+                break
+            recibido["bytes"] += len(datos)
+            bufer += datos
+            for tipo, carga in separar_mensajes(bufer):
+                estado.aplicar(tipo, carga)
+                recibido["mensajes"] += 1
+                if tipo == TIPO_FIN:
+                    # Partida terminada: otra enseguida para mantener la carga
+                    escritor.write(mensaje(TIPO_HOLA, HOLA.pack(args.tasa, 0, rng.getrandbits(32) + 1)))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        tarea.cancel()
+        escritor.close()
+
+
+async def _consultar(lector, escritor):
+    escritor.write(mensaje(TIPO_ESTADISTICAS))
+    estado = EstadoRemoto()
+    bufer = bytearray()
+    while estado.estadisticas is None:
+        datos = await lector.read(65536)
+        if not datos:
+            raise ConnectionError("el servidor cerró la conexión")
+        bufer += datos
+        for tipo, carga in separar_mensajes(bufer):
+            estado.aplicar(tipo, carga)
+    return estado.estadisticas
+
+
+async def carga(args):
+    """
+    Abre sesiones por escalones y mide en el servidor los ticks logrados
+    frente a los pedidos. Un escalón se sostiene si logra al menos el 95 %
+    y el bucle no se atrasa más que un periodo de tick.
+    """
+    escalones = [int(n) for n in args.sesiones.split(",")]
+    rng = random.Random(args.semilla)
+    recibido = {"bytes": 0, "mensajes": 0}
+    control = await abrir_conexion(args)
+    clientes = []
+    sostenidas = 0
+    print(f"{'sesiones':>8} {'logrado':>8} {'cpu':>5} {'tick p99':>9} {'envío p99':>10} {'retraso':>8} {'excesos':>8} {'kB/s':>8}")
+    for cantidad in escalones:
+        while len(clientes) < cantidad:
+            clientes.append(asyncio.create_task(_cliente_carga(args, rng, recibido)))
+        # Medio segundo para que las sesiones nuevas arranquen antes de medir
+        await asyncio.sleep(0.5)
+        anterior = await _consultar(*control)
+        bytes_antes = recibido["bytes"]
+        await asyncio.sleep(args.duracion)
+        actual = await _consultar(*control)
+        duracion = actual["reloj_s"] - anterior["reloj_s"]
+        logrado = (actual["ticks"] - anterior["ticks"]) / duracion / max(1, actual["tasa_objetivo"])
+        cpu = (actual["cpu_s"] - anterior["cpu_s"]) / duracion
+        print(
+            f"{actual['sesiones']:>8} {logrado:>8.1%} {cpu:>5.0%} {actual['tick_us']['p99']:>6.0f} us "
+            f"{actual['envio_us']['p99']:>7.0f} us {actual['retraso_max_ms']:>5.1f} ms "
+            f"{actual['excesos'] - anterior['excesos']:>8} {(recibido['bytes'] - bytes_antes) / duracion / 1024:>8.1f}"
+        )
+        if logrado >= 0.95 and actual["retraso_max_ms"] <= 1000.0 / args.tasa:
+            sostenidas = actual["sesiones"]
+        else:
+            break
+    for cliente in clientes:
+        cliente.cancel()
+    await asyncio.gather(*clientes, return_exceptions=True)
+    control[1].close()
+    print(
+        f"Sostenidas: {sostenidas} sesiones a {args.tasa} ticks/s "
+        f"({recibido['mensajes']} mensajes recibidos en total)"
+    )
+    return sostenidas
+
+
+def agregar_conexion(parser):
+    parser.add_argument("--unix", help="ruta del socket Unix (por defecto, TCP local)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de partidas de Maze-Run y generador de carga")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    servir_parser = subcomandos.add_parser("servir", help="aceptar sesiones")
+    agregar_conexion(servir_parser)
+    servir_parser.add_argument("--niveles", default="niveles.json")
+    servir_parser.add_argument("--presupuesto-us", type=int, default=1000, help="por tick y sesión, tope blando (ver Sesion); 0 = sin tope")
+    servir_parser.add_argument("--informe", type=float, default=5.0, help="segundos entre resúmenes")
+    carga_parser = subcomandos.add_parser("carga", help="abrir sesiones que juegan al azar")
+    agregar_conexion(carga_parser)
+    carga_parser.add_argument("--sesiones", default="10,50,100,200,400", help="escalones separados por comas")
+    carga_parser.add_argument("--duracion", type=float, default=5.0, help="segundos medidos por escalón")
+    carga_parser.add_argument("--tasa", type=int, default=TASA_POR_DEFECTO)
+    carga_parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        if args.comando == "servir":
+            asyncio.run(servir(args))
+        else:
+            asyncio.run(carga(args))
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f"Sin conexión con el servidor: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Los módulos del juego se importan por nombre, como al correrlos desde CODE_RUNNER
+DIRECTORIO_JUEGO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_JUEGO)
+RUTA_NIVELES = os.path.join(DIRECTORIO_JUEGO, "niveles.json")
+
+
+@pytest.fixture
+def ruta_niveles():
+    return RUTA_NIVELES
+
+
+@pytest.fixture
+def niveles():
+    with open(RUTA_NIVELES, "r", encoding="utf-8") as archivo:
+        return json.load(archivo)["niveles"]
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from almacen_sqlite import AlmacenSQLite, importar_json
+from persistencia import EscritorPersistente
+from salon_de_la_fama import SalonDeLaFama
+
+
+@pytest.fixture
+def almacen():
+    almacen = AlmacenSQLite(":memory:")
+    yield almacen
+    almacen.cerrar()
+
+
+def test_ranking_y_tops(almacen):
+    salon = SalonDeLaFama(almacen=almacen, escritor=EscritorPersistente())
+    salon.registrar_puntuacion("ANA", 30, 1, "Uno")
+    salon.registrar_puntuacion("BETO", 50, 2, "Dos")
+    salon.registrar_puntuacion("ANA", 70, 2, "Dos")
+    salon.escritor.flush()
+    assert almacen.ranking_global() == [
+        {"usuario": "ANA", "puntuacion": 70},
+        {"usuario": "BETO", "puntuacion": 50},
+    ]
+    assert [p["puntuacion"] for p in almacen.top_nivel(2)] == [70, 50]
+    assert almacen.percentil(50) == 50.0
+
+
+def test_importar_json_con_diario(tmp_path, almacen):
+    archivo = str(tmp_path / "puntuaciones.json")
+    salon = SalonDeLaFama(archivo, diario=True, escritor=EscritorPersistente())
+    salon.registrar_puntuacion("ANA", 30, 1, "Uno")
+    salon.compactar(esperar=True)
+    # BETO queda solo en el diario
+    salon.registrar_puntuacion("BETO", 50, 2, "Dos")
+    salon.cerrar()
+    usuarios = str(tmp_path / "usuarios.json")
+    with open(usuarios, "w") as f:
+        json.dump(["ana", "beto"], f)
+    assert importar_json(almacen, archivo, usuarios) == (2, 2)
+    assert almacen.usuarios_registrados() == ["ANA", "BETO"]
+    assert almacen.ranking_global() == [
+        {"usuario": "BETO", "puntuacion": 50},
+        {"usuario": "ANA", "puntuacion": 30},
+    ]
+
+
+def test_importar_json_solo_diario_no_toca_el_origen(tmp_path, almacen):
+    archivo = str(tmp_path / "puntuaciones.json")
+    salon = SalonDeLaFama(archivo, diario=True, escritor=EscritorPersistente())
+    salon.registrar_puntuacion("ANA", 30, 1, "Uno")
+    salon.registrar_puntuacion("BETO", 50, 2, "Dos")
+    salon.cerrar()
+    ruta_diario = f"{archivo}.diario"
+    with open(ruta_diario, "ab") as f:
+        f.write(b'{"op": "reg')
+    with open(ruta_diario, "rb") as f:
+        antes = f.read()
+    assert importar_json(almacen, archivo) == (2, 0)
+    with open(ruta_diario, "rb") as f:
+        assert f.read() == antes
+    assert not os.path.exists(archivo)
+
+
+def test_importar_json_ilegible_falla_sin_mover_el_archivo(tmp_path, almacen):
+    archivo = str(tmp_path / "puntuaciones.json")
+    with open(archivo, "w") as f:
+        f.write("[1, 2")
+    with pytest.raises(ValueError):
+        importar_json(almacen, archivo)
+    assert os.path.exists(archivo)
+    assert almacen.ranking_global() == []
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from aparicion import IndiceAparicion
+from grilla import Grilla
+from motor import MotorJuego
+from pathfinding import CampoDistancias, INALCANZABLE
+
+# La columna x = 5 separa una zona a la que no se llega desde la entrada
+LABERINTO = [
+    [1, 1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 1, 0, 0, 1],
+    [1, 0, 1, 1, 0, 1, 0, 1, 1],
+    [1, 0, 0, 0, 0, 1, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1, 1],
+]
+ENTRADA = (1, 1)
+
+
+def distancias_desde(laberinto, origen):
+    campo = CampoDistancias(laberinto)
+    campo.actualizar_objetivo(origen)
+    return campo
+
+
+def test_indice_solo_tiene_celdas_alcanzables_ordenadas_por_distancia():
+    indice = IndiceAparicion(Grilla.desde_lista(LABERINTO), ENTRADA)
+    campo = distancias_desde(LABERINTO, ENTRADA)
+    assert len(indice) == 10
+    assert all(celda[0] < 5 for celda in indice.celdas)
+    assert indice.distancias == sorted(indice.distancias)
+    assert all(indice.distancia[c] == campo.distancia(c) for c in indice.celdas)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_muestra_respeta_distancia_minima_y_exclusiones(semilla):
+    rng = random.Random(semilla)
+    indice = IndiceAparicion(Grilla.desde_lista(LABERINTO), ENTRADA)
+    elegidas = indice.muestrear(rng, 3, exclusiones=[(4, 3)], distancia_minima=3)
+    assert len(set(elegidas)) == 3
+    assert (4, 3) not in elegidas
+    assert all(indice.distancia[c] >= 3 for c in elegidas)
+
+
+def test_sin_celdas_lejanas_se_completa_con_las_cercanas():
+    indice = IndiceAparicion(Grilla.desde_lista(LABERINTO), ENTRADA)
+    lejanas = [c for c in indice.celdas if indice.distancia[c] >= 5]
+    elegidas = indice.muestrear(random.Random(1), len(lejanas) + 2, distancia_minima=5)
+    assert len(set(elegidas)) == len(lejanas) + 2
+    assert set(lejanas) <= set(elegidas)
+    # Ni así se usa la zona inalcanzable
+    assert len(indice.muestrear(random.Random(1), 50)) == len(indice)
+
+
+def test_entrada_encerrada_usa_todas_las_celdas_libres():
+    grilla = Grilla.desde_lista(LABERINTO)
+    indice = IndiceAparicion(grilla, (0, 0))
+    assert sorted(indice.celdas) == sorted(grilla.celdas_libres())
+
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_apariciones_del_motor_alcanzables_y_lejos_de_la_entrada(niveles, semilla):
+    motor = MotorJuego(niveles=niveles)
+    for nivel in range(len(niveles)):
+        motor.reiniciar(nivel, semilla)
+        entrada = (motor.posicion_x, motor.posicion_y)
+        laberinto = niveles[nivel]["laberinto"]
+        campo = distancias_desde(laberinto, entrada)
+        apariciones = [*motor.estrellas, *motor.enemigos, *motor.potenciadores]
+        assert len(set(apariciones)) == len(apariciones)
+        assert entrada not in apariciones
+        for x, y in apariciones:
+            assert motor.LABERINTO.es_transitable(x, y)
+            assert campo.distancia((x, y)) != INALCANZABLE
+        assert all(campo.distancia(e) >= motor.DISTANCIA_MINIMA_ENEMIGOS for e in motor.enemigos)
+
+
+def test_indice_se_reutiliza_entre_reinicios(niveles):
+    motor = MotorJuego(niveles=niveles)
+    motor.reiniciar(0, 1)
+    indice = motor.indices_aparicion[0]
+    for semilla in range(2, 6):
+        motor.reiniciar(0, semilla)
+        assert motor.indices_aparicion[0] is indice
+    motor.reiniciar(1, 1)
+    assert motor.indices_aparicion[0] is indice
+    assert motor.indices_aparicion[1] is not indice
@@ -0,0 +1,43 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from cache_texto import CacheTexto
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fuentes():
+    pygame.font.init()
+    yield
+    pygame.font.quit()
+
+
+def test_misma_clave_devuelve_la_misma_superficie():
+    cache = CacheTexto()
+    superficie = cache.renderizar("Vidas: 3", 32, (255, 255, 255))
+    assert cache.renderizar("Vidas: 3", 32, [255, 255, 255]) is superficie
+    assert cache.renderizar("Vidas: 3", 32, (255, 0, 0)) is not superficie
+    assert cache.renderizar("Vidas: 3", 20, (255, 255, 255)) is not superficie
+    # La fuente se crea una vez por tamaño
+    assert sorted(cache.fuentes) == [20, 32]
+
+
+def test_desaloja_la_menos_usada_al_pasar_la_capacidad():
+    cache = CacheTexto(capacidad=2)
+    a = cache.renderizar("a", 20)
+    b = cache.renderizar("b", 20)
+    # Usar "a" la deja como la más reciente: sale "b"
+    assert cache.renderizar("a", 20) is a
+    cache.renderizar("c", 20)
+    assert len(cache.superficies) == 2
+    assert cache.renderizar("a", 20) is a
+    assert cache.renderizar("b", 20) is not b
+
+
+def test_limpiar_vacia_las_superficies_y_conserva_las_fuentes():
+    cache = CacheTexto()
+    superficie = cache.renderizar("x", 20)
+    cache.limpiar()
+    assert not cache.superficies
+    assert 20 in cache.fuentes
+    assert cache.renderizar("x", 20) is not superficie
@@ -0,0 +1,80 @@
+from evento import AdministradorDeEventos, Evento, EventoMoverJugador
+
+
+class EventoCorrer(EventoMoverJugador):
+    __slots__ = ()
+
+
+class Escucha:
+    def __init__(self, administrador=None, reencolar=0):
+        self.recibidos = []
+        self.administrador = administrador
+        self.reencolar = reencolar
+
+    def notificar(self, evento):
+        self.recibidos.append(evento)
+        # Cada evento encola otro mientras dure la cadena
+        if self.reencolar:
+            self.reencolar -= 1
+            self.administrador.encolar(EventoMoverJugador(len(self.recibidos)))
+
+
+def test_escucha_de_una_clase_recibe_sus_subclases():
+    administrador = AdministradorDeEventos()
+    base, mover, correr = Escucha(), Escucha(), Escucha()
+    administrador.registrar(Evento, base)
+    administrador.registrar(EventoMoverJugador, mover)
+    administrador.registrar(EventoCorrer, correr)
+    evento = EventoCorrer("derecha")
+    administrador.publicar(evento)
+    administrador.publicar(EventoMoverJugador("arriba"))
+    assert correr.recibidos == [evento]
+    assert len(mover.recibidos) == 2
+    assert len(base.recibidos) == 2
+
+
+def test_escucha_registrado_dos_veces_recibe_una():
+    administrador = AdministradorDeEventos()
+    escucha = Escucha()
+    administrador.registrar(EventoMoverJugador, escucha)
+    administrador.registrar(Evento, escucha)
+    administrador.publicar(EventoCorrer("abajo"))
+    assert len(escucha.recibidos) == 1
+
+
+def test_registrar_invalida_el_despacho_guardado():
+    administrador = AdministradorDeEventos()
+    primero, segundo = Escucha(), Escucha()
+    administrador.registrar(EventoMoverJugador, primero)
+    administrador.publicar(EventoCorrer("derecha"))
+    # El despacho de EventoCorrer ya está guardado; un escucha nuevo de la base lo cambia
+    administrador.registrar(Evento, segundo)
+    administrador.publicar(EventoCorrer("izquierda"))
+    assert len(primero.recibidos) == 2
+    assert [e.direccion for e in segundo.recibidos] == ["izquierda"]
+
+
+def test_cola_se_despacha_al_procesar():
+    administrador = AdministradorDeEventos()
+    escucha = Escucha()
+    administrador.registrar(EventoMoverJugador, escucha)
+    administrador.encolar(EventoMoverJugador("arriba"))
+    administrador.encolar(EventoMoverJugador("abajo"))
+    assert escucha.recibidos == []
+    assert administrador.procesar_cola() == 2
+    assert [e.direccion for e in escucha.recibidos] == ["arriba", "abajo"]
+    assert administrador.procesar_cola() == 0
+
+
+def test_encolados_al_procesar_pasan_al_tick_siguiente_despues_de_max_lotes():
+    administrador = AdministradorDeEventos()
+    lotes = AdministradorDeEventos.MAX_LOTES
+    escucha = Escucha(administrador, reencolar=lotes + 3)
+    administrador.registrar(EventoMoverJugador, escucha)
+    administrador.encolar(EventoMoverJugador(0))
+    # Un lote por ronda: la cadena se corta después de MAX_LOTES
+    assert administrador.procesar_cola() == lotes
+    assert len(administrador._cola) == 1
+    assert administrador.procesar_cola() == 4
+    assert len(escucha.recibidos) == lotes + 4
+    assert not administrador._cola
@@ -0,0 +1,63 @@
+from collections import deque
+
+import pytest
+
+import generador
+from generador import ALGORITMOS, generar_nivel, generar_niveles
+from paquete_niveles import validar_nivel
+
+# El más grande pasa AREA_VECTORIZADA: con NumPy toma la ruta vectorizada
+TAMAÑOS = [(7, 9), (15, 21), (16, 22), (81, 81)]
+
+
+def alcanzables(laberinto, entrada):
+    filas, columnas = len(laberinto), len(laberinto[0])
+    vistas = {tuple(entrada)}
+    cola = deque(vistas)
+    while cola:
+        x, y = cola.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < columnas and 0 <= ny < filas and laberinto[ny][nx] != 1 and (nx, ny) not in vistas:
+                vistas.add((nx, ny))
+                cola.append((nx, ny))
+    return vistas
+
+
+@pytest.mark.parametrize("filas, columnas", TAMAÑOS)
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+def test_toda_celda_libre_es_alcanzable_desde_la_entrada(algoritmo, filas, columnas):
+    for semilla in range(3):
+        nivel = generar_nivel(semilla, filas, columnas, algoritmo)
+        laberinto = nivel["laberinto"]
+        assert validar_nivel(nivel) is None
+        assert len(laberinto) == filas and all(len(fila) == columnas for fila in laberinto)
+        libres = {(x, y) for y in range(filas) for x in range(columnas) if laberinto[y][x] != 1}
+        assert alcanzables(laberinto, nivel["entrada"]) == libres
+        assert tuple(nivel["salida"]) in libres
+
+
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+def test_misma_semilla_mismo_nivel(algoritmo):
+    assert generar_nivel(5, 21, 31, algoritmo) == generar_nivel(5, 21, 31, algoritmo)
+    assert generar_nivel(5, 21, 31, algoritmo) != generar_nivel(6, 21, 31, algoritmo)
+
+
+def test_generar_niveles_en_paralelo_da_lo_mismo():
+    assert generar_niveles(8, semilla=3, procesos=2) == generar_niveles(8, semilla=3)
+
+
+@pytest.mark.parametrize("filas, columnas", TAMAÑOS)
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+def test_mismo_nivel_con_y_sin_numpy(monkeypatch, algoritmo, filas, columnas):
+    pytest.importorskip("numpy")
+    for semilla in range(3):
+        con_numpy = generar_nivel(semilla, filas, columnas, algoritmo)
+        with monkeypatch.context() as parche:
+            parche.setattr(generador, "np", None)
+            puro = generar_nivel(semilla, filas, columnas, algoritmo)
+        assert con_numpy == puro
+
+
+def test_comprobar_no_encuentra_diferencias():
+    pytest.importorskip("numpy")
+    assert generador.comprobar(semilla=1) == []
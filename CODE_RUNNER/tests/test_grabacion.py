@@ -0,0 +1,51 @@
+import random
+
+from grabacion import Grabacion, reproducir
+from motor import DIRECCIONES, MotorJuego
+
+
+def grabar(ruta_niveles, semilla, ticks=2000, estrategia="campo"):
+    rng = random.Random(semilla)
+    motor = MotorJuego(ruta_niveles=ruta_niveles)
+    motor.ESTRATEGIA_IA = estrategia
+    motor.reiniciar(0, semilla)
+    grabacion = Grabacion.nueva(motor, semilla)
+    for _ in range(ticks):
+        entradas = (rng.choice(DIRECCIONES),) if rng.random() < 0.7 else ()
+        grabacion.registrar(entradas)
+        motor.paso(entradas)
+        grabacion.punto_control(motor)
+        if motor.estado != "JUEGO":
+            break
+    grabacion.terminar(motor)
+    return grabacion, motor
+
+
+def test_reproduccion_no_diverge(ruta_niveles):
+    for semilla in range(3):
+        grabacion, motor = grabar(ruta_niveles, semilla)
+        resultado = reproducir(grabacion)
+        assert resultado["divergencia"] is None
+        assert resultado["ticks"] == motor.ticks
+        assert resultado["puntuacion"] == motor.puntuacion
+        assert resultado["controles"] == len(grabacion.controles)
+
+
+def test_reproduccion_con_a_estrella(ruta_niveles):
+    grabacion, _ = grabar(ruta_niveles, 5, estrategia="astar")
+    assert reproducir(grabacion)["divergencia"] is None
+
+
+def test_guardar_y_cargar_conserva_la_partida(tmp_path, ruta_niveles):
+    grabacion, motor = grabar(ruta_niveles, 11)
+    cargada = Grabacion.cargar(grabacion.guardar(str(tmp_path / "partida.mrrp")))
+    assert list(cargada.entradas()) == list(grabacion.entradas())
+    assert cargada.controles == grabacion.controles
+    assert reproducir(cargada)["divergencia"] is None
+
+
+def test_divergencia_se_detecta(ruta_niveles):
+    grabacion, _ = grabar(ruta_niveles, 3)
+    tick, _ = grabacion.controles[1]
+    grabacion.controles[1] = (tick, bytes(8))
+    assert reproducir(grabacion)["divergencia"] == tick
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+import grilla as modulo_grilla
+from grilla import Grilla
+
+
+def laberinto_al_azar(semilla, filas, columnas):
+    rng = random.Random(semilla)
+    # Incluye entrada y salida (2, 3): cuentan como transitables
+    return [[rng.choice((0, 0, 1, 1, 2, 3)) for _ in range(columnas)] for _ in range(filas)]
+
+
+def vecinos_esperados(grilla):
+    return bytearray(
+        sum(grilla.es_transitable(x + dx, y + dy) for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)))
+        for y in range(grilla.filas)
+        for x in range(grilla.columnas)
+    )
+
+
+TAMAÑOS = [(1, 1), (1, 7), (6, 1), (9, 13), (24, 32)]
+
+
+@pytest.mark.parametrize("filas, columnas", TAMAÑOS)
+def test_contar_vecinos_en_python(monkeypatch, filas, columnas):
+    monkeypatch.setattr(modulo_grilla, "np", None)
+    grilla = Grilla.desde_lista(laberinto_al_azar(filas * columnas, filas, columnas))
+    assert grilla.matriz is None
+    assert grilla.contar_vecinos() == vecinos_esperados(grilla)
+
+
+@pytest.mark.parametrize("filas, columnas", TAMAÑOS)
+def test_contar_vecinos_igual_con_y_sin_numpy(monkeypatch, filas, columnas):
+    pytest.importorskip("numpy")
+    laberinto = laberinto_al_azar(filas * columnas, filas, columnas)
+    con_numpy = Grilla.desde_lista(laberinto).contar_vecinos()
+    monkeypatch.setattr(modulo_grilla, "np", None)
+    assert con_numpy == Grilla.desde_lista(laberinto).contar_vecinos()
+
+
+def test_fila_es_una_vista_sin_copia():
+    grilla = Grilla.desde_lista([[1, 0, 2], [0, 3, 1]], limpiar_especiales=True)
+    fila = grilla[1]
+    assert list(fila) == [0, 0, 1]
+    grilla.celdas[3] = 1
+    assert fila[0] == 1
+    assert grilla[0][2] == grilla.valor(2, 0) == 0
+    with pytest.raises(IndexError):
+        grilla[2]
+
+
+def test_celdas_libres_y_mascara():
+    grilla = Grilla.desde_lista([[1, 0, 2], [0, 3, 1]])
+    assert grilla.celdas_libres() == [(1, 0), (2, 0), (0, 1), (1, 1)]
+    assert grilla.mascara_libre() == bytearray([0, 1, 1, 1, 1, 0])
+    assert not grilla.es_transitable(-1, 0) and not grilla.es_transitable(3, 0)
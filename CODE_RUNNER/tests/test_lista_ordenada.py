@@ -0,0 +1,46 @@
+import random
+from bisect import insort
+
+import pytest
+
+from lista_ordenada import ListaOrdenada
+
+
+class ListaChica(ListaOrdenada):
+    # Tramos chicos: las pruebas parten y vacían tramos a menudo
+    CARGA = 4
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_igual_a_una_lista_ordenada(semilla):
+    rng = random.Random(semilla)
+    iniciales = [rng.randrange(50) for _ in range(rng.randrange(30))]
+    lista = ListaChica(iniciales)
+    referencia = sorted(iniciales)
+    for _ in range(2000):
+        if referencia and rng.random() < 0.45:
+            elemento = rng.choice(referencia)
+            lista.quitar(elemento)
+            referencia.remove(elemento)
+        else:
+            elemento = rng.randrange(50)
+            lista.agregar(elemento)
+            insort(referencia, elemento)
+        assert len(lista) == len(referencia)
+    assert list(lista) == referencia
+    assert lista.primeros(7) == referencia[:7]
+    assert all(len(tramo) <= 2 * ListaChica.CARGA for tramo in lista._tramos)
+    assert lista._maximos == [tramo[-1] for tramo in lista._tramos]
+
+
+def test_quitar_lo_que_no_esta():
+    lista = ListaChica([1, 3, 5])
+    for ausente in (0, 2, 6):
+        with pytest.raises(ValueError):
+            lista.quitar(ausente)
+    assert list(lista) == [1, 3, 5]
+    for elemento in (1, 3, 5):
+        lista.quitar(elemento)
+    assert list(lista) == [] and len(lista) == 0
+    lista.agregar(2)
+    assert list(lista) == [2]
@@ -0,0 +1,92 @@
+import random
+
+from motor import DIRECCIONES, MotorJuego
+
+NIVEL = {
+    "nombre": "Prueba",
+    "laberinto": [
+        [1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 0, 0, 0, 0, 1],
+        [1, 0, 1, 1, 1, 0, 1],
+        [1, 0, 0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1, 1, 1],
+    ],
+    "vel_enemigos": 14,
+    "enemigos": 1,
+    "powerups": 0,
+    "entrada": [1, 1],
+}
+
+
+def crear_motor():
+    motor = MotorJuego(niveles=[NIVEL], semilla=1)
+    # Un enemigo lejos y ninguna estrella en el camino de las pruebas
+    motor.enemigos = [(5, 3)]
+    motor.estrellas = [(1, 3)]
+    return motor
+
+
+def test_paso_avanza_un_tick():
+    motor = crear_motor()
+    estado = motor.paso()
+    assert estado["tick"] == 1
+    assert estado["jugador"] == (1, 1)
+
+
+def test_direccion_nueva_mueve_en_el_mismo_tick():
+    motor = crear_motor()
+    assert motor.paso(["derecha"])["jugador"] == (2, 1)
+
+
+def test_pared_bloquea_el_movimiento():
+    motor = crear_motor()
+    assert motor.paso(["arriba"])["jugador"] == (1, 1)
+
+
+def test_direccion_mantenida_respeta_el_retraso():
+    motor = crear_motor()
+    motor.paso(["derecha"])
+    for _ in range(motor.RETRASO_PASO_JUGADOR - 1):
+        assert motor.paso(["derecha"])["jugador"] == (2, 1)
+    assert motor.paso(["derecha"])["jugador"] == (3, 1)
+
+
+def test_recoger_estrella_suma_puntos():
+    motor = crear_motor()
+    motor.estrellas = [(2, 1), (1, 3)]
+    estado = motor.paso(["derecha"])
+    assert estado["puntuacion"] == 10
+    assert estado["estrellas"] == [(1, 3)]
+
+
+def test_ultima_estrella_termina_la_partida_en_el_ultimo_nivel():
+    motor = crear_motor()
+    motor.estrellas = [(2, 1)]
+    assert motor.paso(["derecha"])["estado"] == "GAME_OVER"
+
+
+def test_colision_quita_una_vida_y_vuelve_a_la_entrada():
+    motor = crear_motor()
+    # Lejos de la entrada: el enemigo no alcanza al jugador otra vez en el mismo tick
+    motor.posicion_x = 3
+    motor.enemigos = [(4, 1)]
+    estado = motor.paso(["derecha"])
+    assert estado["vidas"] == 2
+    assert estado["jugador"] == (1, 1)
+
+
+def test_sin_estado_de_juego_no_avanza():
+    motor = crear_motor()
+    motor.estado = "GAME_OVER"
+    assert motor.paso(["derecha"])["tick"] == 0
+
+
+def test_misma_semilla_y_entradas_dan_la_misma_partida(niveles):
+    rng = random.Random(7)
+    entradas = [(rng.choice(DIRECCIONES),) if rng.random() < 0.7 else () for _ in range(1500)]
+    partidas = []
+    for _ in range(2):
+        motor = MotorJuego(niveles=niveles)
+        motor.reiniciar(0, semilla=1234)
+        partidas.append([motor.paso(e) for e in entradas])
+    assert partidas[0] == partidas[1]
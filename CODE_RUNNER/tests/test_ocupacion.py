@@ -0,0 +1,60 @@
+import random
+from collections import Counter
+
+import pytest
+
+from motor import DIRECCIONES, MotorJuego
+from ocupacion import MapaOcupacion
+
+
+def comprobar(motor):
+    """El mapa coincide con las listas de entidades, celda por celda."""
+    mapa = motor.ocupacion
+    columnas = mapa.columnas
+    assert mapa.enemigos._conteo == Counter(y * columnas + x for x, y in motor.enemigos)
+    estrellas, potenciadores = set(motor.estrellas), set(motor.potenciadores)
+    assert len(estrellas) == len(motor.estrellas)
+    assert len(potenciadores) == len(motor.potenciadores)
+    for y in range(mapa.filas):
+        for x in range(columnas):
+            assert ((x, y) in motor.estrellas) == ((x, y) in estrellas)
+            assert ((x, y) in motor.potenciadores) == ((x, y) in potenciadores)
+            assert ((x, y) in motor.enemigos) == ((x, y) in mapa.enemigos._posiciones)
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_mapa_sigue_a_las_entidades_en_cada_tick(niveles, semilla):
+    rng = random.Random(semilla)
+    motor = MotorJuego(niveles=niveles)
+    motor.reiniciar(0, semilla)
+    for _ in range(3000):
+        motor.paso((rng.choice(DIRECCIONES),) if rng.random() < 0.8 else ())
+        comprobar(motor)
+        if motor.estado != "JUEGO":
+            break
+
+
+def test_mover_un_enemigo_actualiza_el_conteo():
+    mapa = MapaOcupacion(4, 3)
+    mapa.enemigos.reemplazar([(1, 1), (1, 1), (2, 1)])
+    mapa.enemigos[0] = (3, 2)
+    assert (1, 1) in mapa.enemigos
+    mapa.enemigos[1] = [3, 2]
+    assert (1, 1) not in mapa.enemigos
+    assert list(mapa.enemigos) == [(3, 2), (3, 2), (2, 1)]
+    assert mapa.enemigos._conteo == {2 * 4 + 3: 2, 1 * 4 + 2: 1}
+    with pytest.raises(ValueError):
+        mapa.enemigos[2] = (4, 0)
+    assert list(mapa.enemigos) == [(3, 2), (3, 2), (2, 1)]
+
+
+def test_celdas_ocupadas_como_lista():
+    mapa = MapaOcupacion(4, 3)
+    mapa.estrellas.reemplazar([(1, 1), [2, 1], (3, 2)])
+    assert list(mapa.estrellas) == [(1, 1), (2, 1), (3, 2)]
+    mapa.estrellas.remove([2, 1])
+    assert (2, 1) not in mapa.estrellas and (9, 9) not in mapa.estrellas
+    with pytest.raises(ValueError):
+        mapa.estrellas.remove((2, 1))
+    assert sorted(mapa.estrellas.en_rectangulo(0, 0, 2, 2)) == [(1, 1)]
+    assert mapa.estrellas.en_rectangulo(-5, -5, 10, 10) == [(1, 1), (3, 2)]
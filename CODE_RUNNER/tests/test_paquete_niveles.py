@@ -0,0 +1,85 @@
+import json
+import shutil
+
+import pytest
+
+from motor import MotorJuego
+from paquete_niveles import PaqueteNiveles, compilar, huella_nivel, ruta_paquete_para
+
+
+@pytest.fixture
+def copia_niveles(tmp_path, ruta_niveles):
+    destino = tmp_path / "niveles.json"
+    shutil.copy(ruta_niveles, destino)
+    return str(destino)
+
+
+def escribir(ruta, niveles):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"niveles": niveles}, f)
+
+
+def test_nivel_decodificado_es_igual_a_su_origen(copia_niveles, niveles):
+    paquete = PaqueteNiveles(compilar(copia_niveles))
+    try:
+        assert len(paquete) == len(niveles)
+        assert list(paquete) == niveles
+        assert [huella_nivel(nivel) for nivel in paquete] == [huella_nivel(n) for n in niveles]
+    finally:
+        paquete.cerrar()
+
+
+def test_huellas_del_indice_sin_decodificar(copia_niveles, niveles):
+    paquete = PaqueteNiveles(compilar(copia_niveles))
+    try:
+        assert paquete.huellas() == [huella_nivel(n) for n in niveles]
+        assert not paquete._decodificados
+    finally:
+        paquete.cerrar()
+
+
+def test_claves_opcionales_ausentes_no_aparecen(tmp_path):
+    nivel = {"laberinto": [[1, 1, 1], [1, 0, 1], [1, 1, 1]], "entrada": [1, 1]}
+    ruta = str(tmp_path / "niveles.json")
+    escribir(ruta, [nivel])
+    paquete = PaqueteNiveles(compilar(ruta))
+    try:
+        assert paquete[0] == nivel
+    finally:
+        paquete.cerrar()
+
+
+@pytest.mark.parametrize(
+    "cambio",
+    [
+        {"musica": "tema.ogg"},
+        {"estrellas": 3.0},
+        {"enemigos": True},
+        {"colores": {"pared": [0, 0, 300]}},
+        {"colores": {"fondo": [0, 0, 0]}},
+        {"entrada": [40, 1]},
+        {"laberinto": [[1, 4], [1, 1]]},
+    ],
+)
+def test_conversor_rechaza_lo_que_no_puede_reproducir(tmp_path, niveles, cambio):
+    ruta = str(tmp_path / "niveles.json")
+    escribir(ruta, [dict(niveles[0], **cambio)])
+    with pytest.raises(ValueError):
+        compilar(ruta)
+
+
+def test_motor_usa_el_paquete_vigente(copia_niveles, niveles):
+    compilar(copia_niveles)
+    motor = MotorJuego(ruta_niveles=copia_niveles)
+    assert isinstance(motor.niveles, PaqueteNiveles)
+    assert motor.huellas_niveles() == [huella_nivel(n) for n in niveles]
+    motor.niveles.cerrar()
+
+
+def test_paquete_desactualizado_se_ignora(copia_niveles, niveles):
+    compilar(copia_niveles)
+    niveles[0]["vel_enemigos"] = 30
+    escribir(copia_niveles, niveles)
+    motor = MotorJuego(ruta_niveles=copia_niveles)
+    assert motor.niveles == niveles
+    assert ruta_paquete_para(copia_niveles).endswith(".mrlp")
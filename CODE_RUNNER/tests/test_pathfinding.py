@@ -0,0 +1,158 @@
+import random
+
+import pytest
+
+from pathfinding import (
+    CacheCaminos,
+    CampoDistancias,
+    INALCANZABLE,
+    a_estrella_siguiente_paso,
+    bfs_siguiente_paso,
+)
+
+
+def laberinto_al_azar(semilla, filas=24, columnas=32, paredes=0.25):
+    rng = random.Random(semilla)
+    laberinto = [
+        [1 if rng.random() < paredes else 0 for _ in range(columnas)] for _ in range(filas)
+    ]
+    libres = [(x, y) for y in range(filas) for x in range(columnas) if laberinto[y][x] == 0]
+    return laberinto, libres, rng
+
+
+def recorrido(rng, libres, pasos):
+    # Objetivo que casi siempre avanza una celda (corrección incremental) y a
+    # veces salta lejos (recálculo completo)
+    conjunto = set(libres)
+    posicion = libres[0]
+    for _ in range(pasos):
+        vecinas = [
+            (posicion[0] + dx, posicion[1] + dy)
+            for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0))
+            if (posicion[0] + dx, posicion[1] + dy) in conjunto
+        ]
+        posicion = rng.choice(vecinas) if vecinas and rng.random() < 0.9 else rng.choice(libres)
+        yield posicion
+
+
+@pytest.mark.parametrize("limite_ns", [None, 0])
+@pytest.mark.parametrize("semilla", range(4))
+def test_campo_incremental_igual_a_recalculo(semilla, limite_ns):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    campo = CampoDistancias(laberinto)
+    for objetivo in recorrido(rng, libres, 150):
+        # Con límite 0 cada llamada avanza un lote y corta: se insiste hasta terminar
+        while not campo.actualizar_objetivo(objetivo, limite_ns):
+            pass
+        assert campo.objetivo == objetivo
+        nuevo = CampoDistancias(laberinto)
+        nuevo.actualizar_objetivo(objetivo)
+        assert [campo.distancia(c) for c in libres] == [nuevo.distancia(c) for c in libres]
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_siguiente_paso_del_campo_igual_a_bfs(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    campo = CampoDistancias(laberinto)
+    for objetivo in recorrido(rng, libres, 40):
+        campo.actualizar_objetivo(objetivo)
+        for origen in rng.sample(libres, 20):
+            assert campo.siguiente_paso(origen) == bfs_siguiente_paso(laberinto, origen, objetivo)
+
+
+def test_campo_a_medias_sigue_apuntando_al_objetivo_anterior():
+    laberinto, libres, _ = laberinto_al_azar(0, filas=80, columnas=80, paredes=0.1)
+    campo = CampoDistancias(laberinto)
+    campo.actualizar_objetivo(libres[0])
+    assert not campo.actualizar_objetivo(libres[-1], limite_ns=0)
+    assert campo.objetivo == libres[0]
+    assert campo.distancia(libres[0]) == 0
+
+
+def test_campo_marca_celdas_sin_camino():
+    laberinto = [
+        [0, 1, 0],
+        [0, 1, 0],
+    ]
+    campo = CampoDistancias(laberinto)
+    campo.actualizar_objetivo((0, 0))
+    assert campo.distancia((2, 0)) == INALCANZABLE
+    assert campo.siguiente_paso((2, 0)) == (2, 0)
+
+
+def campo_hacia(laberinto, destino):
+    campo = CampoDistancias(laberinto)
+    campo.actualizar_objetivo(destino)
+    return campo
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_a_estrella_avanza_por_un_camino_minimo(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    for _ in range(100):
+        origen, destino = rng.choice(libres), rng.choice(libres)
+        campo = campo_hacia(laberinto, destino)
+        paso = a_estrella_siguiente_paso(laberinto, origen, destino)
+        if origen == destino or campo.distancia(origen) == INALCANZABLE:
+            assert paso == origen
+        else:
+            assert campo.distancia(paso) == campo.distancia(origen) - 1
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_camino_reutilizado_llega_por_un_camino_minimo(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    caminos = CacheCaminos(laberinto)
+    for _ in range(20):
+        posicion, destino = rng.choice(libres), rng.choice(libres)
+        campo = campo_hacia(laberinto, destino)
+        if campo.distancia(posicion) == INALCANZABLE:
+            assert caminos.siguiente_paso(0, posicion, destino) == posicion
+            continue
+        while posicion != destino:
+            siguiente = caminos.siguiente_paso(0, posicion, destino)
+            assert campo.distancia(siguiente) == campo.distancia(posicion) - 1
+            posicion = siguiente
+    assert caminos.reutilizados > caminos.calculados
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_a_estrella_elige_el_mismo_paso_que_bfs(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    for _ in range(200):
+        origen, destino = rng.choice(libres), rng.choice(libres)
+        assert a_estrella_siguiente_paso(laberinto, origen, destino) == bfs_siguiente_paso(
+            laberinto, origen, destino
+        )
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_camino_reutilizado_sigue_a_bfs_paso_a_paso(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla)
+    caminos = CacheCaminos(laberinto)
+    for _ in range(20):
+        posicion, destino = rng.choice(libres), rng.choice(libres)
+        while True:
+            siguiente = caminos.siguiente_paso(0, posicion, destino)
+            assert siguiente == bfs_siguiente_paso(laberinto, posicion, destino)
+            if siguiente == posicion:
+                break
+            posicion = siguiente
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_camino_jerarquico_es_valido(semilla):
+    laberinto, libres, rng = laberinto_al_azar(semilla, filas=48, columnas=48, paredes=0.2)
+    caminos = CacheCaminos(laberinto, jerarquico=True, tamaño_cluster=8)
+    for _ in range(30):
+        origen, destino = rng.choice(libres), rng.choice(libres)
+        posicion = origen
+        for _ in range(len(libres)):
+            siguiente = caminos.siguiente_paso(0, posicion, destino)
+            if siguiente == posicion:
+                break
+            assert abs(siguiente[0] - posicion[0]) + abs(siguiente[1] - posicion[1]) == 1
+            assert laberinto[siguiente[1]][siguiente[0]] == 0
+            posicion = siguiente
+        # Si no llegó es porque no hay camino
+        assert posicion == destino or bfs_siguiente_paso(laberinto, origen, destino) == origen
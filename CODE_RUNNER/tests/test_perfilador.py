@@ -0,0 +1,31 @@
+import csv
+
+from perfilador import PERFILADOR_NULO, Perfilador
+
+
+def test_activar_a_mitad_de_cuadro_no_registra_el_reloj_absoluto():
+    # Así corre el bucle de Juego cuando F3 llega durante los eventos
+    perfilador = PERFILADOR_NULO
+    inicio = perfilador.reloj()
+    perfilador = Perfilador()
+    perfilador.registrar("eventos", inicio)
+    inicio = perfilador.reloj()
+    perfilador.registrar("logica", inicio)
+    perfilador.cerrar_cuadro()
+    assert perfilador.percentiles("eventos") == (0.0, 0.0, 0.0)
+    assert perfilador.percentiles("logica")[2] < 100
+    assert perfilador.percentiles("cuadro")[2] < 100
+
+
+def test_buffer_circular_y_exportacion(tmp_path):
+    perfilador = Perfilador(capacidad=4)
+    for _ in range(6):
+        inicio = perfilador.reloj()
+        perfilador.registrar("logica", inicio)
+        perfilador.cerrar_cuadro()
+    assert len(perfilador._muestras("logica")) == 4
+    ruta = perfilador.exportar(str(tmp_path / "perfil.csv"))
+    with open(ruta, newline="") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == ["cuadro", "logica_ns", "cuadro_ns"]
+    assert [fila[0] for fila in filas[1:]] == ["2", "3", "4", "5"]
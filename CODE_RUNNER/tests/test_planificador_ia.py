@@ -0,0 +1,86 @@
+from time import perf_counter_ns
+
+import pytest
+
+from planificador_ia import PlanificadorIA
+
+
+def correr(planificador, ticks, posiciones=None, objetivo=(0, 0), espera_us=0):
+    """Ejecuta `ticks` ticks; devuelve, por tick, los índices movidos y si corrió antes()."""
+    posiciones = posiciones or [(0, 0)] * planificador.cantidad
+    registro = []
+    for _ in range(ticks):
+        movidos, antes = [], []
+
+        def mover(indice):
+            movidos.append(indice)
+            fin = perf_counter_ns() + espera_us * 1000
+            while perf_counter_ns() < fin:
+                pass
+
+        planificador.ejecutar(posiciones, objetivo, mover, antes.append)
+        registro.append((movidos, bool(antes)))
+    return registro
+
+
+def test_un_enemigo_se_mueve_cada_intervalo_como_antes_del_planificador():
+    planificador = PlanificadorIA()
+    planificador.preparar(1, 5)
+    registro = correr(planificador, 16)
+    # Ticks número 5, 10 y 15: nadie se mueve en el primero
+    assert [i for i, (movidos, _) in enumerate(registro, 1) if movidos] == [5, 10, 15]
+
+
+@pytest.mark.parametrize("cantidad, intervalo", [(4, 8), (8, 4), (5, 14), (3, 3)])
+def test_fases_repartidas_sin_adelantarse_al_intervalo(cantidad, intervalo):
+    planificador = PlanificadorIA()
+    planificador.preparar(cantidad, intervalo)
+    registro = correr(planificador, 4 * intervalo)
+    movimientos = {}
+    for numero, (movidos, _) in enumerate(registro, 1):
+        for indice in movidos:
+            movimientos.setdefault(indice, []).append(numero)
+        # Repartidos: nunca más que los que tocan por tick
+        assert len(movidos) <= -(-cantidad // intervalo)
+    assert sorted(movimientos) == list(range(cantidad))
+    assert movimientos[0][0] == intervalo
+    for numeros in movimientos.values():
+        assert intervalo <= numeros[0] < 2 * intervalo
+        # Uno por intervalo, siempre con la misma fase
+        assert all(b - a == intervalo for a, b in zip(numeros, numeros[1:]))
+
+
+def test_trabajo_compartido_solo_cuando_alguien_se_mueve():
+    planificador = PlanificadorIA()
+    planificador.preparar(2, 10)
+    registro = correr(planificador, 40)
+    assert [bool(movidos) for movidos, _ in registro] == [antes for _, antes in registro]
+    # Enemigo 0 en los ticks 10, 20, 30 y 40; enemigo 1 en 15, 25 y 35
+    assert sum(antes for _, antes in registro) == 7
+
+
+def test_reiniciar_vuelve_a_esperar_el_intervalo():
+    planificador = PlanificadorIA()
+    planificador.preparar(1, 4)
+    correr(planificador, 6)
+    planificador.reiniciar()
+    registro = correr(planificador, 4)
+    assert [bool(movidos) for movidos, _ in registro] == [False, False, False, True]
+
+
+def test_sin_presupuesto_para_todos_quedan_pendientes_y_nadie_se_queda_atras():
+    # Tocan dos por tick y cada movimiento gasta el presupuesto entero: se mueve uno
+    planificador = PlanificadorIA(presupuesto_us=5000)
+    planificador.preparar(4, 2)
+    posiciones = [(0, 0), (1, 0), (9, 9), (20, 20)]
+    registro = correr(planificador, 40, posiciones, objetivo=(0, 0), espera_us=6000)
+    activos = registro[1:]
+    assert all(len(movidos) == 1 for movidos, _ in activos)
+    assert planificador.ticks_con_arrastre > 0
+    # Los cuatro esperan a la vez; al final del tick queda uno menos
+    assert planificador.max_pendientes == 3
+    cuentas = [sum(movidos.count(i) for movidos, _ in activos) for i in range(4)]
+    # Los cercanos van primero, pero la espera hace que el más lejano también avance
+    assert cuentas[0] >= cuentas[3] > 0
+    # Lo que queda pendiente conserva el tick en que le tocó
+    assert all(tick < planificador.tick for tick in planificador.pendientes.values())
@@ -0,0 +1,113 @@
+import copy
+import json
+import os
+
+import pytest
+
+from motor import MotorJuego
+
+
+@pytest.fixture
+def archivo_niveles(tmp_path, niveles):
+    ruta = tmp_path / "niveles.json"
+    ruta.write_text(json.dumps({"niveles": niveles}), encoding="utf-8")
+    return ruta
+
+
+def reescribir(ruta, niveles):
+    ruta.write_text(json.dumps({"niveles": niveles}), encoding="utf-8")
+    # Otra firma aunque el sistema de archivos tenga poca resolución de mtime
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+
+
+def avanzar(motor):
+    # Una partida a medias: puntos, una estrella menos y ticks corridos
+    motor.puntuacion = 70
+    motor.estrellas = list(motor.estrellas)[1:]
+    for _ in range(5):
+        motor.paso(set())
+    return estado(motor)
+
+
+def estado(motor):
+    return (
+        motor.ticks, motor.puntuacion, motor.vidas, (motor.posicion_x, motor.posicion_y),
+        list(motor.estrellas), list(motor.enemigos), list(motor.potenciadores),
+    )
+
+
+def test_sin_cambios_no_recarga(archivo_niveles):
+    motor = MotorJuego(ruta_niveles=str(archivo_niveles), semilla=1)
+    assert motor.recargar_en_caliente() == []
+
+
+def test_solo_colores_conserva_la_partida(archivo_niveles, niveles):
+    motor = MotorJuego(ruta_niveles=str(archivo_niveles), semilla=1)
+    antes = avanzar(motor)
+    editados = copy.deepcopy(niveles)
+    editados[0]["colores"]["pared"] = [1, 2, 3]
+    editados[0]["vel_enemigos"] = 20
+    reescribir(archivo_niveles, editados)
+    assert motor.recargar_en_caliente() == [0]
+    assert estado(motor) == antes
+    assert motor.niveles[0]["colores"]["pared"] == [1, 2, 3]
+    assert motor.VELOCIDAD_ENEMIGOS == 20
+    # Un nivel que no se está jugando cambia sin tocar la partida
+    editados[1]["colores"]["suelo"] = [9, 9, 9]
+    reescribir(archivo_niveles, editados)
+    assert motor.recargar_en_caliente() == [1]
+    assert estado(motor) == antes
+
+
+def test_cambio_de_geometria_reinicia_el_nivel(archivo_niveles, niveles):
+    motor = MotorJuego(ruta_niveles=str(archivo_niveles), semilla=1)
+    avanzar(motor)
+    indice_anterior = motor._indice_aparicion()
+    editados = copy.deepcopy(niveles)
+    laberinto = editados[0]["laberinto"]
+    libres = [(x, y) for y, fila in enumerate(laberinto) for x, celda in enumerate(fila) if celda == 0]
+    x, y = libres[-1]
+    laberinto[y][x] = 1
+    reescribir(archivo_niveles, editados)
+    assert motor.recargar_en_caliente() == [0]
+    assert not motor.LABERINTO.es_transitable(x, y)
+    # El nivel vuelve a empezar: vuelven todas las estrellas
+    assert len(motor.estrellas) == len(MotorJuego(niveles=editados, semilla=1).estrellas)
+    assert (motor.posicion_x, motor.posicion_y) == tuple(editados[0]["entrada"])
+    # El índice de apariciones del nivel se reconstruye con la nueva geometría
+    assert motor.indices_aparicion[0] is not indice_anterior
+    assert (x, y) not in motor.indices_aparicion[0].distancia
+
+
+def test_edicion_invalida_se_rechaza(archivo_niveles, niveles, capsys):
+    motor = MotorJuego(ruta_niveles=str(archivo_niveles), semilla=1)
+    antes = avanzar(motor)
+    editados = copy.deepcopy(niveles)
+    editados[0]["laberinto"][0] = editados[0]["laberinto"][0][:-1]
+    reescribir(archivo_niveles, editados)
+    assert motor.recargar_en_caliente() == []
+    assert "se conserva el anterior" in capsys.readouterr().out
+    assert motor.niveles[0] == niveles[0]
+    assert estado(motor) == antes
+    # JSON roto: se informa y no cambia nada
+    archivo_niveles.write_text("{", encoding="utf-8")
+    os.utime(archivo_niveles, ns=(0, 1))
+    assert motor.recargar_en_caliente() == []
+    assert "Error recargando niveles" in capsys.readouterr().out
+    assert estado(motor) == antes
+
+
+def test_los_niveles_se_emparejan_por_indice_del_json(archivo_niveles, niveles, capsys):
+    invalido = {"nombre": "Roto"}
+    reescribir(archivo_niveles, [niveles[0], invalido, niveles[1], niveles[2]])
+    motor = MotorJuego(ruta_niveles=str(archivo_niveles), semilla=1)
+    capsys.readouterr()
+    assert len(motor.niveles) == 3
+    editados = copy.deepcopy([niveles[0], invalido, niveles[1], niveles[2]])
+    editados[3]["colores"]["pared"] = [4, 5, 6]
+    reescribir(archivo_niveles, editados)
+    # Solo cambia el tercer nivel cargado, que vino del cuarto del JSON
+    assert motor.recargar_en_caliente() == [2]
+    assert motor.niveles[1] == niveles[1]
+    assert motor.niveles[2]["colores"]["pared"] == [4, 5, 6]
@@ -0,0 +1,200 @@
+import json
+import os
+import random
+
+import pytest
+
+from salon_de_la_fama import SalonDeLaFama, analizar_diario, leer_puntuaciones
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    return str(tmp_path / "puntuaciones.json")
+
+
+def abrir(archivo, **opciones):
+    return SalonDeLaFama(archivo, diario=True, **opciones)
+
+
+def llenar(salon):
+    salon.registrar_puntuacion("ANA", 30, 1, "Uno")
+    salon.registrar_puntuacion("BETO", 50, 2, "Dos")
+    salon.registrar_puntuacion("ANA", 70, 2, "Dos")
+    salon.cerrar()
+
+
+def test_diario_reproduce_las_partidas(archivo):
+    llenar(abrir(archivo))
+    salon = abrir(archivo)
+    assert salon.obtener_ranking_global() == [
+        {"usuario": "ANA", "puntuacion": 70},
+        {"usuario": "BETO", "puntuacion": 50},
+    ]
+    assert len(salon.puntuaciones["ANA"]) == 2
+
+
+def test_cola_truncada_se_descarta_y_se_recorta(archivo):
+    llenar(abrir(archivo))
+    ruta_diario = f"{archivo}.diario"
+    intacto = os.path.getsize(ruta_diario)
+    with open(ruta_diario, "ab") as f:
+        f.write(b'{"op": "registrar", "usuario": "CA')
+    salon = abrir(archivo)
+    assert os.path.getsize(ruta_diario) == intacto
+    assert sorted(salon.puntuaciones) == ["ANA", "BETO"]
+    # Lo que se registre después queda en una línea propia
+    salon.registrar_puntuacion("CARLA", 90, 1, "Uno")
+    salon.cerrar()
+    assert abrir(archivo).obtener_ranking_global(1) == [{"usuario": "CARLA", "puntuacion": 90}]
+
+
+@pytest.mark.parametrize("danada", [b"basura\n", b'{"op": "registrar", "usuario": "X", "seq": 9}\n'])
+def test_linea_danada_en_medio_no_pierde_las_siguientes(archivo, danada):
+    llenar(abrir(archivo))
+    ruta_diario = f"{archivo}.diario"
+    with open(ruta_diario, "rb") as f:
+        lineas = f.readlines()
+    with open(ruta_diario, "wb") as f:
+        f.writelines([lineas[0], danada, *lineas[1:]])
+    salon = abrir(archivo)
+    assert sum(len(partidas) for partidas in salon.puntuaciones.values()) == 3
+    # La compactación tampoco la conserva
+    salon.compactar(esperar=True)
+    salon.cerrar()
+    with open(ruta_diario, "rb") as f:
+        assert danada not in f.read()
+    assert sum(len(p) for p in abrir(archivo).puntuaciones.values()) == 3
+
+
+def test_compactar_pasa_el_diario_a_la_instantanea(archivo):
+    salon = abrir(archivo)
+    llenar(salon)
+    salon.compactar(esperar=True)
+    assert os.path.getsize(f"{archivo}.diario") == 0
+    with open(archivo) as f:
+        assert sum(len(partidas) for partidas in json.load(f).values()) == 3
+    assert abrir(archivo).obtener_ranking_global() == salon.obtener_ranking_global()
+
+
+def test_compactacion_automatica_no_duplica_partidas(archivo):
+    salon = abrir(archivo, umbral_compactacion=4)
+    for puntuacion in range(10):
+        salon.registrar_puntuacion("ANA", puntuacion, 1, "Uno")
+    salon.cerrar()
+    assert len(abrir(archivo).puntuaciones["ANA"]) == 10
+
+
+def test_eliminar_queda_en_el_diario(archivo):
+    salon = abrir(archivo)
+    llenar(salon)
+    assert salon.eliminar_puntuaciones_usuario("ANA")
+    salon.cerrar()
+    assert list(abrir(archivo).puntuaciones) == ["BETO"]
+
+
+@pytest.mark.parametrize("diario", [True, False])
+def test_lista_vacia_del_repositorio_es_una_tabla_vacia(archivo, diario):
+    with open(archivo, "w") as f:
+        f.write("[]")
+    salon = SalonDeLaFama(archivo, diario=diario)
+    assert salon.puntuaciones == {}
+    assert salon.obtener_ranking_global() == []
+    assert not os.path.exists(f"{archivo}.corrupto")
+    salon.registrar_puntuacion("ANA", 30, 1, "Uno")
+    salon.cerrar()
+    assert SalonDeLaFama(archivo, diario=diario).obtener_ranking_global() == [
+        {"usuario": "ANA", "puntuacion": 30}
+    ]
+
+
+@pytest.mark.parametrize("contenido", ["{no es json", '[{"usuario": "ANA"}]', "42"])
+@pytest.mark.parametrize("diario", [True, False])
+def test_archivo_ilegible_o_ajeno_se_aparta(archivo, contenido, diario):
+    with open(archivo, "w") as f:
+        f.write(contenido)
+    salon = SalonDeLaFama(archivo, diario=diario)
+    assert salon.puntuaciones == {}
+    with open(f"{archivo}.corrupto") as f:
+        assert f.read() == contenido
+
+
+def test_analizar_diario_separa_cola_truncada():
+    registro = json.dumps({"op": "eliminar", "usuario": "ANA", "seq": 1}).encode() + b"\n"
+    registros, danados, valido = analizar_diario(registro + b"xx\n" + registro + b'{"op"')
+    assert len(registros) == 2
+    assert danados == [2]
+    assert valido == 2 * len(registro) + 3
+
+
+def test_leer_puntuaciones_no_toca_los_archivos(archivo):
+    llenar(abrir(archivo))
+    ruta_diario = f"{archivo}.diario"
+    with open(ruta_diario, "ab") as f:
+        f.write(b'{"op": "regis')
+    with open(ruta_diario, "rb") as f:
+        antes = f.read()
+    puntuaciones = leer_puntuaciones(archivo, ruta_diario)
+    assert sum(len(partidas) for partidas in puntuaciones.values()) == 3
+    with open(ruta_diario, "rb") as f:
+        assert f.read() == antes
+
+
+@pytest.mark.parametrize("contenido", ["{no es json", "[1]"])
+def test_leer_puntuaciones_falla_con_archivo_ilegible(archivo, contenido):
+    with open(archivo, "w") as f:
+        f.write(contenido)
+    with pytest.raises(ValueError):
+        leer_puntuaciones(archivo)
+    # No se aparta como haría el salón
+    assert os.path.exists(archivo)
+    assert not os.path.exists(f"{archivo}.corrupto")
+
+
+def test_leer_puntuaciones_falla_con_linea_danada_en_medio(archivo):
+    llenar(abrir(archivo))
+    ruta_diario = f"{archivo}.diario"
+    with open(ruta_diario, "rb") as f:
+        lineas = f.readlines()
+    with open(ruta_diario, "wb") as f:
+        f.writelines([lineas[0], b"basura\n", *lineas[1:]])
+    with pytest.raises(ValueError):
+        leer_puntuaciones(archivo, ruta_diario)
+
+
+def test_indice_ordena_por_puntuacion_y_desempata_por_nombre(archivo):
+    salon = abrir(archivo)
+    for usuario, puntuacion in [("BETO", 50), ("ANA", 50), ("CARLA", 80), ("DANI", 20), ("ANA", 10)]:
+        salon.registrar_puntuacion(usuario, puntuacion, 1, "Uno")
+    assert salon.obtener_ranking_global() == [
+        {"usuario": "CARLA", "puntuacion": 80},
+        {"usuario": "ANA", "puntuacion": 50},
+        {"usuario": "BETO", "puntuacion": 50},
+        {"usuario": "DANI", "puntuacion": 20},
+    ]
+    # Mejorar mueve al usuario; una puntuación peor no cambia su mejor marca
+    salon.registrar_puntuacion("DANI", 60, 1, "Uno")
+    salon.registrar_puntuacion("CARLA", 5, 1, "Uno")
+    salon.eliminar_puntuaciones_usuario("ANA")
+    assert salon.obtener_ranking_global(2) == [
+        {"usuario": "CARLA", "puntuacion": 80},
+        {"usuario": "DANI", "puntuacion": 60},
+    ]
+    assert [fila["usuario"] for fila in salon.obtener_ranking_global(None)] == ["CARLA", "DANI", "BETO"]
+    salon.cerrar()
+    assert abrir(archivo).obtener_ranking_global(None) == salon.obtener_ranking_global(None)
+
+
+def test_indice_igual_al_recalculo_tras_muchas_partidas(archivo):
+    rng = random.Random(4)
+    salon = abrir(archivo)
+    for _ in range(3000):
+        usuario = f"U{rng.randrange(400)}"
+        if rng.random() < 0.02:
+            salon.eliminar_puntuaciones_usuario(usuario)
+        else:
+            salon.registrar_puntuacion(usuario, rng.randrange(1000), 1, "Uno")
+    esperado = sorted(
+        ((-max(p["puntuacion"] for p in partidas), usuario) for usuario, partidas in salon.puntuaciones.items())
+    )
+    assert [(-fila["puntuacion"], fila["usuario"]) for fila in salon.obtener_ranking_global(None)] == esperado
+    salon.cerrar()
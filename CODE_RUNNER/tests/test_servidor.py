@@ -0,0 +1,40 @@
+import random
+
+from motor import DIRECCIONES
+from servidor import DatosCompartidos, EstadoRemoto, MotorSesion, Sesion, separar_mensajes
+
+
+def test_deltas_reconstruyen_el_estado_del_motor(ruta_niveles):
+    motor = MotorSesion(DatosCompartidos(ruta_niveles), semilla=3)
+    motor.reiniciar(0, 3)
+    # Solo se codifica: no hace falta un servidor ni una conexión
+    sesion = Sesion(None, None)
+    sesion.motor = motor
+    remoto = EstadoRemoto()
+    rng = random.Random(3)
+    bufer = bytearray()
+    for _ in range(1500):
+        bufer += sesion._codificar()
+        for tipo, carga in separar_mensajes(bufer):
+            remoto.aplicar(tipo, carga)
+        assert remoto.nivel == motor.nivel_actual
+        assert remoto.celdas == bytes(motor.LABERINTO.celdas)
+        assert remoto.jugador == (motor.posicion_x, motor.posicion_y)
+        assert remoto.enemigos == list(motor.enemigos)
+        assert sorted(remoto.estrellas) == sorted(motor.estrellas)
+        assert sorted(remoto.potenciadores) == sorted(motor.potenciadores)
+        assert (remoto.vidas, remoto.puntuacion) == (motor.vidas, motor.puntuacion)
+        assert remoto.potenciador_activo == motor.potenciador_activo
+        if motor.estado != "JUEGO":
+            break
+        motor.paso((rng.choice(DIRECCIONES),) if rng.random() < 0.7 else ())
+    assert not bufer
+
+
+def test_sin_cambios_no_se_envia_nada(ruta_niveles):
+    motor = MotorSesion(DatosCompartidos(ruta_niveles), semilla=1)
+    motor.reiniciar(0, 1)
+    sesion = Sesion(None, None)
+    sesion.motor = motor
+    assert sesion._codificar()
+    assert sesion._codificar() == b""
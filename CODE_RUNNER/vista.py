@@ -1,57 +1,188 @@
 import pygame
+from collections import OrderedDict
 from constantes import color_jugador,color_computadora
+from cache_texto import CacheTexto
+from grilla import Grilla
+from perfilador import PERFILADOR_NULO
+# Lado en celdas de cada trozo prerenderizado del laberinto
+TAMAÑO_TROZO = 16
 class Vista:
     def __init__(self, ancho, alto, titulo=""):
         pygame.display.set_caption(titulo)
         self.pantalla=pygame.display.set_mode((ancho, alto))
         self.ancho=ancho
         self.alto=alto
-        self.fuente_interfaz= pygame.font.SysFont(None, 32)
+        self.cache_texto= CacheTexto()
+        self.fuente_interfaz= self.cache_texto.fuente(32)
         self.desplazamiento_x= 0
         self.desplazamiento_y =0
+        # Área de pantalla del tablero; la cámara decide qué parte del laberinto se ve
+        self.area_tablero = pygame.Rect(0, 0, ancho, alto)
+        self.tamaño_tablero = (ancho, alto)
+        self.capacidad_trozos = 64
+        self.perfilador = PERFILADOR_NULO
+        self.mostrar_perfil = False
+        self._lineas_perfil = []
+        self.invalidar_fondo()
     def limpiar_pantalla(self, color):
         self.pantalla.fill(color)
     def actualizar(self):
+        inicio = self.perfilador.reloj()
         pygame.display.flip()
+        self.perfilador.registrar("flip", inicio)
+    def invalidar_fondo(self):
+        # Obliga a reconstruir la capa estática en el próximo dibujado
+        self._trozos = OrderedDict()
+        self._laberinto_fondo = None
+        self._clave_fondo = None
+    def configurar_camara(self, ancho_tablero, alto_tablero, area):
+        self.tamaño_tablero = (ancho_tablero, alto_tablero)
+        self.area_tablero = pygame.Rect(area)
+    def seguir(self, x, y):
+        # Centra la cámara en el punto (x, y) del tablero sin salirse de sus bordes;
+        # en el eje en que el tablero cabe entero se lo centra en el área
+        area = self.area_tablero
+        ancho_tablero, alto_tablero = self.tamaño_tablero
+        if ancho_tablero <= area.width:
+            self.desplazamiento_x = area.x + (area.width - ancho_tablero) // 2
+        else:
+            self.desplazamiento_x = area.x - int(min(max(x - area.width // 2, 0), ancho_tablero - area.width))
+        if alto_tablero <= area.height:
+            self.desplazamiento_y = area.y + (area.height - alto_tablero) // 2
+        else:
+            self.desplazamiento_y = area.y - int(min(max(y - area.height // 2, 0), alto_tablero - area.height))
+    def visible(self, x, y, tamaño):
+        area = self.area_tablero
+        pantalla_x, pantalla_y = self.desplazamiento_x + x, self.desplazamiento_y + y
+        return (
+            pantalla_x + tamaño > area.left and pantalla_x < area.right
+            and pantalla_y + tamaño > area.top and pantalla_y < area.bottom
+        )
+    def celdas_visibles(self, tamaño_celda, margen=1):
+        # Rectángulo (x0, y0, x1, y1) de celdas, con x1 e y1 excluidos, que cae en
+        # el área del tablero; el margen cubre a quien se interpola desde fuera
+        area = self.area_tablero
+        return (
+            (area.left - self.desplazamiento_x) // tamaño_celda - margen,
+            (area.top - self.desplazamiento_y) // tamaño_celda - margen,
+            (area.right - 1 - self.desplazamiento_x) // tamaño_celda + 1 + margen,
+            (area.bottom - 1 - self.desplazamiento_y) // tamaño_celda + 1 + margen,
+        )
+    def terminar_tablero(self):
+        self.pantalla.set_clip(None)
+    def _color_celda(self, celda, color_pared, color_suelo):
+        if celda==1:
+            return color_pared
+        elif celda== 2:
+            return (255, 150, 0)
+        elif celda== 3:
+            return (0, 255, 0)
+        return color_suelo
+    def _pintar_celda(self, superficie, x, y, celda, tamaño_celda, color_pared, color_suelo, mostrar_rejilla):
+        # (x, y) relativos al trozo
+        rectangulo = pygame.Rect(x*tamaño_celda, y*tamaño_celda, tamaño_celda, tamaño_celda)
+        pygame.draw.rect(superficie, self._color_celda(celda, color_pared, color_suelo), rectangulo)
+        if mostrar_rejilla:
+            pygame.draw.rect(superficie, (40,40,40), rectangulo, 1)
+    def _construir_trozo(self, grilla, trozo_x, trozo_y, tamaño_celda, color_pared, color_suelo, mostrar_rejilla):
+        x0, y0 = trozo_x*TAMAÑO_TROZO, trozo_y*TAMAÑO_TROZO
+        columnas = min(TAMAÑO_TROZO, grilla.columnas - x0)
+        filas = min(TAMAÑO_TROZO, grilla.filas - y0)
+        superficie = pygame.Surface((columnas*tamaño_celda, filas*tamaño_celda)).convert()
+        for y in range(filas):
+            for x in range(columnas):
+                self._pintar_celda(superficie, x, y, grilla.valor(x0 + x, y0 + y), tamaño_celda, color_pared, color_suelo, mostrar_rejilla)
+        return superficie
     def dibujar_laberinto(self, laberinto, tamaño_celda, color_pared=(80,80,80), color_suelo=(220,220,220), mostrar_rejilla=True):
-        for y, fila in enumerate(laberinto):
-            for x, celda in enumerate(fila):
-                posicion_x = self.desplazamiento_x + x*tamaño_celda
-                posicion_y = self.desplazamiento_y + y*tamaño_celda
-                rectangulo = pygame.Rect(posicion_x, posicion_y, tamaño_celda, tamaño_celda)
-                if celda==1:
-                    color= color_pared
-                elif celda== 2:
-                    color =(255, 150, 0)
-                elif celda== 3:
-                    color= (0, 255, 0)
+        inicio = self.perfilador.reloj()
+        clave = (tamaño_celda, tuple(color_pared), tuple(color_suelo), mostrar_rejilla)
+        if laberinto is not self._laberinto_fondo or clave != self._clave_fondo:
+            self.invalidar_fondo()
+            self._laberinto_fondo = laberinto
+            self._clave_fondo = clave
+        grilla = Grilla.desde(laberinto)
+        area = self.area_tablero
+        self.pantalla.set_clip(area)
+        # Solo los trozos que se cruzan con el área visible; se prerenderizan al aparecer
+        lado = TAMAÑO_TROZO*tamaño_celda
+        primero_x = max(0, (area.left - self.desplazamiento_x) // lado)
+        primero_y = max(0, (area.top - self.desplazamiento_y) // lado)
+        ultimo_x = min((grilla.columnas - 1) // TAMAÑO_TROZO, (area.right - 1 - self.desplazamiento_x) // lado)
+        ultimo_y = min((grilla.filas - 1) // TAMAÑO_TROZO, (area.bottom - 1 - self.desplazamiento_y) // lado)
+        trozos = self._trozos
+        # Con celdas chicas entran muchos trozos en pantalla: la caché nunca es menor que eso
+        capacidad = max(self.capacidad_trozos, 2*(ultimo_x - primero_x + 1)*(ultimo_y - primero_y + 1))
+        for trozo_y in range(primero_y, ultimo_y + 1):
+            for trozo_x in range(primero_x, ultimo_x + 1):
+                superficie = trozos.get((trozo_x, trozo_y))
+                if superficie is None:
+                    superficie = self._construir_trozo(grilla, trozo_x, trozo_y, *clave)
+                    trozos[(trozo_x, trozo_y)] = superficie
+                    if len(trozos) > capacidad:
+                        trozos.popitem(last=False)
                 else:
-                    color= color_suelo
-                pygame.draw.rect(self.pantalla, color, rectangulo)
-                if mostrar_rejilla:
-                    pygame.draw.rect(self.pantalla, (40,40,40), rectangulo, 1)
+                    trozos.move_to_end((trozo_x, trozo_y))
+                self.pantalla.blit(superficie, (self.desplazamiento_x + trozo_x*lado, self.desplazamiento_y + trozo_y*lado))
+        self.perfilador.registrar("laberinto", inicio)
     def dibujar_jugador(self, x, y, tamaño):
+        if not self.visible(x, y, tamaño):
+            return
         pygame.draw.circle(self.pantalla, color_jugador, (self.desplazamiento_x + x + tamaño//2, self.desplazamiento_y + y + tamaño//2), tamaño//2)
 
     def dibujar_enemigo(self, x, y, tamaño, color=color_computadora):
+        if not self.visible(x, y, tamaño):
+            return
         pygame.draw.circle(self.pantalla, color, (self.desplazamiento_x + x + tamaño//2, self.desplazamiento_y + y + tamaño//2), tamaño//2)
 
     def dibujar_estrella(self, x, y, tamaño):
+        if not self.visible(x, y, tamaño):
+            return
         rectangulo = pygame.Rect(self.desplazamiento_x + x + tamaño*0.25, self.desplazamiento_y + y + tamaño*0.25, tamaño*0.5, tamaño*0.5)
         pygame.draw.rect(self.pantalla, (255, 215, 0), rectangulo)
 
     def dibujar_interfaz(self, vidas, puntos, x=30, y=24):
         # Permitir posicionamiento configurable para evitar solapamientos
-        texto_vidas = self.fuente_interfaz.render(f"Vidas: {vidas}", True, (255, 255, 255))
-        texto_puntos = self.fuente_interfaz.render(f"Puntos:  {puntos}", True, (255, 255, 255))
+        inicio = self.perfilador.reloj()
+        texto_vidas = self.cache_texto.renderizar(f"Vidas: {vidas}", 32, (255, 255, 255))
+        texto_puntos = self.cache_texto.renderizar(f"Puntos:  {puntos}", 32, (255, 255, 255))
         self.pantalla.blit(texto_vidas, (x, y))
         self.pantalla.blit(texto_puntos, (self.ancho - texto_puntos.get_width() - 30, y))
+        self.perfilador.registrar("texto", inicio)
     def dibujar_potenciador(self, x, y, tamaño):
+        if not self.visible(x, y, tamaño):
+            return
         dimension=tamaño*0.5
         desplazamiento=(tamaño - dimension)/2
         rectangulo=pygame.Rect(self.desplazamiento_x + x + desplazamiento, self.desplazamiento_y + y + desplazamiento, dimension, dimension)
         pygame.draw.rect(self.pantalla, (255, 255, 0), rectangulo)
     def dibujar_texto(self, texto, x, y, tamaño_fuente, color=(255,255,255)):
-        fuente = pygame.font.SysFont(None, tamaño_fuente)
-        superficie = fuente.render(texto, True, color)
-        self.pantalla.blit(superficie, (x, y))
\ No newline at end of file
+        inicio = self.perfilador.reloj()
+        superficie = self.cache_texto.renderizar(texto, tamaño_fuente, color)
+        self.pantalla.blit(superficie, (x, y))
+        self.perfilador.registrar("texto", inicio)
+    def dibujar_perfil(self, enemigos, planificador=None):
+        # Superposición F3; los percentiles se recalculan dos veces por segundo
+        perfilador = self.perfilador
+        if not self.mostrar_perfil or not perfilador.activo:
+            return
+        if perfilador.cuadros % 25 == 0 or not self._lineas_perfil:
+            p50, p95, p99 = perfilador.percentiles("cuadro")
+            fps = 1000.0 / p50 if p50 else 0.0
+            self._lineas_perfil = [
+                f"cuadro {p50:.1f}/{p95:.1f}/{p99:.1f} ms  {fps:.0f} FPS  enemigos {enemigos}"
+            ] + [
+                f"{fase:<10} p95 {perfilador.percentiles(fase, (95,))[0]:.2f} ms"
+                for fase in perfilador.fases if fase != "cuadro"
+            ]
+            if planificador is not None:
+                ia = planificador.estadisticas()
+                self._lineas_perfil.append(
+                    f"ia max {ia['max_us']:.0f} us  excesos {ia['excesos']}  arrastre {ia['ticks_con_arrastre']}"
+                )
+        fondo = pygame.Surface((360, 18 * len(self._lineas_perfil) + 8))
+        fondo.set_alpha(180)
+        self.pantalla.blit(fondo, (self.ancho - 370, self.alto - fondo.get_height() - 10))
+        y = self.alto - fondo.get_height() - 6
+        for linea in self._lineas_perfil:
+            self.pantalla.blit(self.cache_texto.renderizar(linea, 20, (0, 255, 0)), (self.ancho - 366, y))
+            y += 18
\ No newline at end of file